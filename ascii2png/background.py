@@ -0,0 +1,177 @@
+import random
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+from PIL import Image, ImageDraw
+
+try:
+    import numpy as np
+except ImportError:  # optional: pure-Python fallback for the gradient column
+    np = None
+
+GRADIENT_GREEN = ((240, 253, 244), (220, 252, 231))
+
+# Pattern tiles are stacked into blocks of at least this many rows before pasting
+_BLOCK_ROWS = 512
+# Full-canvas layers (circle) are only cached below this many pixels
+_MAX_LAYER_PIXELS = 8_000_000
+
+
+class LayerCache:
+    """
+    Bounded LRU of generated background layers, limited by total pixel bytes.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[Tuple, Image.Image]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple, build) -> Image.Image:
+        with self._lock:
+            layer = self._items.get(key)
+            if layer is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return layer
+            self.misses += 1
+        layer = build()
+        size = _nbytes(layer)
+        with self._lock:
+            if key not in self._items and size <= self.max_bytes:
+                self._items[key] = layer
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, old = self._items.popitem(last=False)
+                    self._bytes -= _nbytes(old)
+        return layer
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._items), "bytes": self._bytes}
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+def _nbytes(img: Image.Image) -> int:
+    return img.width * img.height * len(img.getbands())
+
+
+_cache = LayerCache()
+
+
+def get_layer_cache() -> LayerCache:
+    return _cache
+
+
+def draw_background(img: Image.Image, style: str, cfg: Dict[str, Any], bg, W: int, H: int, oy: int, scale: float):
+    """
+    Paint the background decoration for rows [oy, oy + img.height) of a
+    W x H supersampled canvas onto img (already filled with bg).
+    """
+    Hr = img.height
+    if style == "grid":
+        grid_color = cfg.get("grid_color", (220, 220, 220))
+        step = int(40 * scale)
+        block = _cache.get(("grid", W, step, bg, tuple(grid_color)), lambda: _grid_block(W, step, bg, grid_color))
+        _paste_repeated(img, block, step, oy, min(H, oy + Hr))
+
+    elif style == "dots":
+        dot_color = cfg.get("dot_color", (200, 200, 200))
+        step = int(30 * scale)
+        radius = int(2 * scale)
+        block = _cache.get(("dots", W, step, radius, bg, tuple(dot_color)), lambda: _dots_block(W, step, radius, bg, dot_color))
+        _paste_repeated(img, block, step, oy, min(H, oy + Hr))
+        # A dot whose centre falls past the canvas is not drawn at all
+        last = (H - 1) // step * step
+        if last + step // 2 >= H and last < oy + Hr:
+            img.paste(bg, (0, max(0, last - oy), W, Hr))
+
+    elif style == "circle":
+        colors = [tuple(c) for c in cfg.get("circle_colors", [(240, 240, 240)])]
+        if W * H <= _MAX_LAYER_PIXELS:
+            layer = _cache.get(("circle", W, H, scale, bg, tuple(colors)), lambda: _circle_layer(W, H, scale, bg, colors))
+            img.paste(layer.crop((0, oy, W, oy + Hr)), (0, 0))
+        else:
+            _draw_circles(ImageDraw.Draw(img), W, H, scale, colors, oy)
+
+    elif style == "gradient_green":
+        column = _cache.get(("gradient_green", H), lambda: _gradient_column(H, *GRADIENT_GREEN))
+        # Widen the column into a narrow strip once, then tile it across
+        strip = column.crop((0, oy, 1, oy + Hr)).resize((min(W, 64), Hr), Image.NEAREST)
+        for x in range(0, W, strip.width):
+            img.paste(strip, (x, 0))
+
+
+def _paste_repeated(img: Image.Image, block: Image.Image, step: int, top: int, bottom: int):
+    """Paste a block whose pattern repeats every step rows, aligned to global row 0."""
+    y = top - top % step
+    while y < bottom:
+        img.paste(block, (0, y - top))
+        y += block.height
+
+
+def _repeat_rows(tile: Image.Image) -> Image.Image:
+    count = max(1, -(-_BLOCK_ROWS // tile.height))
+    block = Image.new(tile.mode, (tile.width, tile.height * count))
+    for i in range(count):
+        block.paste(tile, (0, i * tile.height))
+    return block
+
+
+def _grid_block(W: int, step: int, bg, grid_color, mode: str = "RGB") -> Image.Image:
+    tile = Image.new(mode, (W, step), bg)
+    draw = ImageDraw.Draw(tile)
+    for x in range(0, W, step):
+        draw.line([(x, 0), (x, step)], fill=grid_color, width=1)
+    draw.line([(0, 0), (W, 0)], fill=grid_color, width=1)
+    return _repeat_rows(tile)
+
+
+def _dots_block(W: int, step: int, radius: int, bg, dot_color, mode: str = "RGB") -> Image.Image:
+    tile = Image.new(mode, (W, step), bg)
+    draw = ImageDraw.Draw(tile)
+    y = step // 2
+    for x in range(step // 2, W, step):
+        draw.ellipse([(x-radius, y-radius), (x+radius, y+radius)], fill=dot_color)
+    return _repeat_rows(tile)
+
+
+def _draw_circles(draw, W: int, H: int, scale: float, colors, oy: int = 0):
+    # Seeded so every render of the theme gets the same decoration
+    rng = random.Random(42)
+    for _ in range(5):
+        cx = rng.randint(0, W)
+        cy = rng.randint(0, H) - oy
+        r = rng.randint(int(100 * scale), int(400 * scale))
+        c = colors[rng.randint(0, len(colors)-1)]
+        draw.ellipse([(cx-r, cy-r), (cx+r, cy+r)], fill=c)
+
+
+def _circle_layer(W: int, H: int, scale: float, bg, colors) -> Image.Image:
+    layer = Image.new("RGB", (W, H), bg)
+    _draw_circles(ImageDraw.Draw(layer), W, H, scale, colors)
+    return layer
+
+
+def _gradient_column(H: int, top_c, bot_c) -> Image.Image:
+    """1 x H vertical gradient, matching int(top + (bottom - top) * y / H)."""
+    if np is not None:
+        ratio = np.arange(H, dtype=np.float64) / H
+        top = np.array(top_c, dtype=np.float64)
+        delta = np.array(bot_c, dtype=np.float64) - top
+        rows = (top + delta * ratio[:, None]).astype(np.uint8)
+        return Image.frombytes("RGB", (1, H), rows.tobytes())
+    data = bytearray()
+    for y in range(H):
+        ratio = y / H
+        data.extend(int(top_c[i] + (bot_c[i] - top_c[i]) * ratio) for i in range(3))
+    return Image.frombytes("RGB", (1, H), bytes(data))
@@ -0,0 +1,218 @@
+"""
+Command-line batch converter.
+
+    python -m ascii2png docs/ diagrams/*.txt -o build/diagrams -j 8
+    cat tree.txt | python -m ascii2png - > tree.png
+
+Directories are searched recursively for --pattern (default *.txt) and
+mirrored under the output directory. A manifest in the output directory
+records the render key of every output, so re-runs only convert inputs
+whose text or options changed.
+"""
+import argparse
+import fnmatch
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+from .core import OUTPUT_FORMATS, CoreService, output_extension
+from .encoder import DEFAULT_MAX_BYTES
+from .fonts import warm_fonts
+from .render import DEFAULT_SUPERSAMPLE
+from .store import atomic_write_bytes, render_key
+
+MANIFEST_NAME = ".ascii2png-manifest.json"
+MANIFEST_VERSION = 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="ascii2png", description="Convert ASCII tree diagrams to PNG or SVG images.")
+    ap.add_argument("inputs", nargs="*", help="files, globs or directories; '-' reads stdin and writes the image to stdout")
+    ap.add_argument("-o", "--output-dir", default="output", help="output directory (default: output)")
+    ap.add_argument("-j", "--jobs", type=int, default=0, help="worker processes (default: one per CPU)")
+    ap.add_argument("--pattern", default="*.txt", help="file pattern inside directories (default: *.txt)")
+    ap.add_argument("--theme", default="wechat")
+    ap.add_argument("--width", type=int, default=1080)
+    ap.add_argument("--font-size", type=int, default=24)
+    ap.add_argument("--font-path", default=None)
+    ap.add_argument("--layout-mode", default=None, choices=("horizontal", "vertical"))
+    ap.add_argument("--line-style", default=None, choices=("solid", "dotted", "dashed", "wave", "cloud"))
+    ap.add_argument("--supersample", type=float, default=DEFAULT_SUPERSAMPLE)
+    ap.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES, help="PNG size budget; 0 disables it")
+    ap.add_argument("--format", default="png", choices=OUTPUT_FORMATS, help="output format (default: png)")
+    ap.add_argument("-f", "--force", action="store_true", help="convert every input, ignoring the manifest")
+    ap.add_argument("-q", "--quiet", action="store_true")
+    return ap
+
+
+def render_options(args) -> Dict[str, Any]:
+    """CoreService.convert_bytes keyword arguments for the parsed command line."""
+    layout_options = {}
+    if args.layout_mode:
+        layout_options["layout_mode"] = args.layout_mode
+    if args.line_style:
+        layout_options["line_style"] = args.line_style
+    supersample = args.supersample
+    options = {
+        "width": args.width,
+        "theme": args.theme,
+        "font_size": args.font_size,
+        "font_path": args.font_path,
+        "layout_options": layout_options or None,
+        "max_bytes": args.max_bytes or None,
+        "supersample": int(supersample) if float(supersample).is_integer() else supersample,
+    }
+    # Only non-default formats enter the options, so PNG manifests stay valid
+    if args.format != "png":
+        options["output_format"] = args.format
+    return options
+
+
+def collect_inputs(inputs: List[str], pattern: str, ext: str = ".png") -> List[Tuple[str, str]]:
+    """
+    Expand files, globs and directories into (source path, output name)
+    pairs. Output names keep the path below a directory argument.
+    """
+    found: Dict[str, str] = {}
+    for arg in inputs:
+        if os.path.isdir(arg):
+            for dirpath, dirnames, filenames in os.walk(arg):
+                dirnames.sort()
+                for name in sorted(fnmatch.filter(filenames, pattern)):
+                    src = os.path.join(dirpath, name)
+                    found.setdefault(os.path.abspath(src), _output_name(os.path.relpath(src, arg), ext))
+            continue
+        matches = sorted(glob.glob(arg, recursive=True)) if glob.has_magic(arg) else [arg]
+        if not matches:
+            raise FileNotFoundError(f"No input matches {arg}")
+        for src in matches:
+            if os.path.isfile(src):
+                found.setdefault(os.path.abspath(src), _output_name(os.path.basename(src), ext))
+            elif not glob.has_magic(arg):
+                raise FileNotFoundError(f"No such file or directory: {arg}")
+    return [(src, name) for src, name in found.items()]
+
+
+def _output_name(rel: str, ext: str) -> str:
+    return os.path.splitext(rel)[0].replace(os.sep, "/") + ext
+
+
+def _read_text(path: str) -> str:
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return f.read()
+
+
+def load_manifest(path: str) -> Dict[str, str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != MANIFEST_VERSION:
+        return {}
+    return dict(data.get("outputs", {}))
+
+
+def save_manifest(path: str, outputs: Dict[str, str]):
+    data = {"version": MANIFEST_VERSION, "outputs": dict(sorted(outputs.items()))}
+    atomic_write_bytes(path, json.dumps(data, indent=1, ensure_ascii=False).encode("utf-8"))
+
+
+def _convert_file(text: str, dst: str, options: Dict[str, Any]) -> str:
+    """Worker: render the text of one input file to dst."""
+    data = CoreService.convert_bytes(text, **options)
+    atomic_write_bytes(dst, data)
+    return dst
+
+
+def _warm(font_size: int, supersample: float, font_path: Optional[str]):
+    warm_fonts([font_size], scale=supersample, font_path=font_path)
+
+
+def run(args) -> int:
+    options = render_options(args)
+
+    if args.inputs == ["-"]:
+        text = sys.stdin.read()
+        data = CoreService.convert_bytes(text, **options)
+        sys.stdout.buffer.write(data)
+        sys.stdout.flush()
+        return 0
+    if "-" in args.inputs:
+        raise ValueError("'-' (stdin) cannot be combined with other inputs")
+    if not args.inputs:
+        raise ValueError("no inputs given (use '-' to read stdin)")
+
+    manifest_path = os.path.join(args.output_dir, MANIFEST_NAME)
+    manifest = {} if args.force else load_manifest(manifest_path)
+    outputs = dict(manifest)
+
+    todo = []
+    skipped = 0
+    failed = 0
+    for src, name in collect_inputs(args.inputs, args.pattern, output_extension(args.format)):
+        # An unreadable input fails on its own, like a failed conversion
+        try:
+            text = _read_text(src)
+        except (UnicodeDecodeError, OSError) as e:
+            failed += _report(args, src, name, None, e, outputs)
+            continue
+        key = render_key(text, **options)
+        dst = os.path.join(args.output_dir, name)
+        if manifest.get(name) == key and os.path.exists(dst):
+            skipped += 1
+            continue
+        todo.append((text, src, name, dst, key))
+
+    unreadable = failed
+    workers = args.jobs or os.cpu_count() or 1
+    try:
+        if workers == 1 or len(todo) <= 1:
+            for text, src, name, dst, key in todo:
+                error = None
+                try:
+                    _convert_file(text, dst, options)
+                except Exception as e:
+                    error = e
+                failed += _report(args, src, name, key, error, outputs)
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_warm,
+                initargs=(args.font_size, float(args.supersample), args.font_path),
+            ) as pool:
+                futures = {pool.submit(_convert_file, text, dst, options): (src, name, key) for text, src, name, dst, key in todo}
+                for future in as_completed(futures):
+                    src, name, key = futures[future]
+                    failed += _report(args, src, name, key, future.exception(), outputs)
+    finally:
+        # Record what finished even when interrupted
+        if todo or outputs != manifest:
+            save_manifest(manifest_path, outputs)
+
+    if not args.quiet:
+        converted = len(todo) - (failed - unreadable)
+        print(f"{converted} converted, {skipped} unchanged, {failed} failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def _report(args, src: str, name: str, key: Optional[str], error: Optional[BaseException], outputs: Dict[str, str]) -> int:
+    if error is not None:
+        outputs.pop(name, None)
+        print(f"error: {src}: {error}", file=sys.stderr)
+        return 1
+    outputs[name] = key
+    if not args.quiet:
+        print(f"{src} -> {name}", file=sys.stderr)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return run(args)
+    except (ValueError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
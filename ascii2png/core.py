@@ -1,8 +1,34 @@
-from typing import Optional, Dict, Any
+import os
+from concurrent.futures import as_completed
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Tuple
 from . import parser
-from .layout import layout_tree
+from .layout import layout_tree, Scene
 from .theme import get_theme
-from .render import render_scene
+from .render import render_scene, render_scene_to_bytes, DEFAULT_SUPERSAMPLE
+from .store import OutputStore, atomic_write_bytes, render_key
+from .svg import render_scene_svg
+from .encoder import DEFAULT_MAX_BYTES, PROFILES
+from .fonts import warm_fonts
+from .parallel import _get_pool
+
+# convert() options that determine the parsed and laid-out scene
+SCENE_OPTIONS = ("width", "theme", "font_size", "custom_colors", "layout_options")
+
+# Supported output_format values: the raster encoder profiles, plus svg
+OUTPUT_FORMATS = tuple(PROFILES) + ("svg",)
+MIMETYPES = {name: p.mimetype for name, p in PROFILES.items()}
+MIMETYPES["svg"] = "image/svg+xml"
+
+
+def output_extension(output_format: str) -> str:
+    """File extension (with the dot) for an output format."""
+    return ".svg" if _check_format(output_format) == "svg" else PROFILES[output_format].ext
+
+
+def _check_format(output_format: str) -> str:
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format} (expected one of {', '.join(OUTPUT_FORMATS)})")
+    return output_format
 
 class CoreService:
     @staticmethod
@@ -15,13 +41,163 @@ class CoreService:
         custom_colors: Optional[Dict[str, Any]] = None,
         font_path: Optional[str] = None,
         layout_options: Optional[Dict[str, Any]] = None,
-        filename_hint: str = None
+        filename_hint: str = None,
+        use_cache: bool = True,
+        max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+        supersample: float = DEFAULT_SUPERSAMPLE,
+        banded: bool = False,
+        workers: Optional[int] = None,
+        scene: Optional[Scene] = None,
+        output_format: str = "png"
     ) -> str:
         """
         Unified conversion logic for CLI, GUI, and Web.
+        Outputs are content-addressed: an identical request returns the
+        existing artifact instead of rendering again.
+        banded=True renders in horizontal strips straight into a streaming
+        PNG, bounding peak memory for very tall diagrams.
+        workers > 1 rasterizes tiles of the diagram on that many processes.
+        scene may carry an already built scene for text and the layout options.
+        output_format selects the encoder profile ("png", "png-fast",
+        "png-palette", "webp", "webp-lossy", "jpeg"), or "svg" for a vector
+        image, to which the raster options (max_bytes, supersample, banded,
+        workers) do not apply.
+        """
+        store = OutputStore(output_dir)
+        path = CoreService.artifact_path(
+            text, width, theme, font_size, output_dir, custom_colors, font_path,
+            layout_options, filename_hint, max_bytes, supersample, banded, output_format,
+        )
+        if use_cache and store.lookup(path):
+            return path
+
+        if scene is None:
+            scene = CoreService.build_scene(text, width, theme, font_size, custom_colors, layout_options)
+        if output_format == "svg":
+            return atomic_write_bytes(path, render_scene_svg(scene, width, font_path))
+        summary_text = filename_hint if filename_hint else text
+        return render_scene(scene, width, summary_text, output_dir, font_path, filename=os.path.basename(path), max_bytes=max_bytes, supersample=supersample, banded=banded, workers=workers, profile=output_format)
+
+    @staticmethod
+    def artifact_path(
+        text: str,
+        width: int = 1080,
+        theme: str = "wechat",
+        font_size: int = 24,
+        output_dir: str = "output",
+        custom_colors: Optional[Dict[str, Any]] = None,
+        font_path: Optional[str] = None,
+        layout_options: Optional[Dict[str, Any]] = None,
+        filename_hint: str = None,
+        max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+        supersample: float = DEFAULT_SUPERSAMPLE,
+        banded: bool = False,
+        output_format: str = "png",
+        **_ignored
+    ) -> str:
+        """
+        Content-addressed output path convert() uses for these options.
+        """
+        options = {
+            "width": width,
+            "theme": theme,
+            "font_size": font_size,
+            "custom_colors": custom_colors,
+            "font_path": font_path,
+            "layout_options": layout_options,
+        }
+        ext = output_extension(output_format)
+        if output_format == "png":
+            options.update(max_bytes=max_bytes, supersample=supersample, banded=banded)
+        elif output_format == "svg":
+            options["output_format"] = output_format
+        else:
+            options.update(max_bytes=max_bytes, supersample=supersample, output_format=output_format)
+        key = render_key(text, **options)
+        # Use filename_hint (or the text) to give the artifact a readable prefix
+        return OutputStore(output_dir).path_for(key, filename_hint if filename_hint else text, ext=ext)
+
+    @staticmethod
+    def convert_many(
+        items: Iterable[Dict[str, Any]],
+        workers: Optional[int] = None,
+        output_dir: str = "output",
+        executor=None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Convert many requests, yielding results as they complete.
+        Each item is a dict of convert() keyword arguments (text required).
+        Items with the same text and layout options share one parse/layout.
+        Yields {"index", "path", "error"}; a failing item does not abort
+        the batch. workers > 1 spreads the work over a process pool whose
+        workers are pre-warmed with the default fonts; alternatively pass
+        an executor (anything with submit(), e.g. a RenderPool).
+        """
+        groups: Dict[str, Tuple[str, Dict[str, Any], List]] = {}
+        for index, item in enumerate(items):
+            opts = dict(item)
+            opts.setdefault("output_dir", output_dir)
+            text = opts.pop("text", None)
+            scene_opts = {k: opts.pop(k) for k in SCENE_OPTIONS if k in opts}
+            gkey = render_key(text if isinstance(text, str) else repr(text), **scene_opts)
+            groups.setdefault(gkey, (text, scene_opts, []))[2].append((index, opts))
+
+        workers = workers or os.cpu_count() or 1
+        if executor is None and (workers == 1 or len(groups) == 1):
+            for text, scene_opts, variants in groups.values():
+                yield from _convert_group(text, scene_opts, variants)
+            return
+
+        pool = executor or _get_pool("process", workers, initializer=_warm_worker)
+        futures = {}
+        for group in groups.values():
+            try:
+                futures[pool.submit(_convert_group, *group)] = group
+            except Exception as e:
+                # Rejected by the executor (e.g. a saturated RenderPool)
+                yield from _group_errors(group, e)
+        for future in as_completed(futures):
+            try:
+                results = future.result()
+            except Exception as e:
+                # The worker itself failed (e.g. it crashed): fail its items only
+                results = _group_errors(futures[future], e)
+            yield from results
+
+    @staticmethod
+    def convert_bytes(
+        text: str,
+        width: int = 1080,
+        theme: str = "wechat",
+        font_size: int = 24,
+        custom_colors: Optional[Dict[str, Any]] = None,
+        font_path: Optional[str] = None,
+        layout_options: Optional[Dict[str, Any]] = None,
+        max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+        supersample: float = DEFAULT_SUPERSAMPLE,
+        workers: Optional[int] = None,
+        output_format: str = "png"
+    ) -> bytes:
         """
+        Same as convert, but returns the image bytes without writing to disk.
+        """
+        _check_format(output_format)
+        scene = CoreService.build_scene(text, width, theme, font_size, custom_colors, layout_options)
+        if output_format == "svg":
+            return render_scene_svg(scene, width, font_path)
+        return render_scene_to_bytes(scene, width, font_path, max_bytes, supersample, workers, output_format)
+
+    @staticmethod
+    def build_scene(
+        text: str,
+        width: int = 1080,
+        theme: str = "wechat",
+        font_size: int = 24,
+        custom_colors: Optional[Dict[str, Any]] = None,
+        layout_options: Optional[Dict[str, Any]] = None
+    ) -> Scene:
         # 1. Parse
-        root = parser.parse(text)
+        root = parser.parse(text, compact=True)
         
         # 2. Prepare Theme/Colors
         if custom_colors:
@@ -35,11 +211,34 @@ class CoreService:
             colors.update(layout_options)
             
         # 4. Layout
-        scene = layout_tree(root, width, colors["font_size"], colors)
-        
-        # 5. Render
-        # Use filename_hint as the text_for_summary if provided, to influence naming
-        summary_text = filename_hint if filename_hint else text
-        path = render_scene(scene, width, summary_text, output_dir, font_path)
-        
-        return path
+        return layout_tree(root, width, colors["font_size"], colors)
+
+
+def _warm_worker():
+    """Process-pool initializer: load the default faces once per worker."""
+    warm_fonts([24])
+
+
+def _group_errors(group, error: Exception) -> List[Dict[str, Any]]:
+    return [{"index": index, "path": None, "error": str(error) or type(error).__name__}
+            for index, _ in group[2]]
+
+
+def _convert_group(text: str, scene_opts: Dict[str, Any], variants: List[Tuple[int, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Convert every output variant of one text, laying it out at most once.
+    """
+    results = []
+    scene = None
+    for index, opts in variants:
+        try:
+            cached = opts.get("use_cache", True) and OutputStore(opts["output_dir"]).lookup(
+                CoreService.artifact_path(text, **scene_opts, **opts)
+            )
+            if scene is None and not cached:
+                scene = CoreService.build_scene(text, **scene_opts)
+            path = CoreService.convert(text, scene=scene, **scene_opts, **opts)
+            results.append({"index": index, "path": path, "error": None})
+        except Exception as e:
+            results.append({"index": index, "path": None, "error": str(e) or type(e).__name__})
+    return results
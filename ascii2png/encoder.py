@@ -0,0 +1,237 @@
+import io
+import math
+from typing import Any, Callable, Dict, Optional
+from PIL import Image
+
+# Default output budget, sized for sharing in chat apps
+DEFAULT_MAX_BYTES = 1_000_000
+
+# Strip sampling used for size estimates
+_STRIPS = 8
+_STRIP_HEIGHT = 48
+# Fraction of the budget the estimate aims for, leaving room for estimate error
+_SAFETY = 0.92
+# A downscaled result using less than this share of the budget is retried larger
+_FILL = 0.75
+# Palette sizes tried at full scale; the last one is also used when downscaling
+_PALETTES = (256, 128, 64, 32)
+# Largest downscale factor: just below 1, resampling blur makes the image
+# compress worse than at full size
+_MAX_SCALE = 0.95
+# Encodes spent correcting the downscale factor
+_PASSES = 3
+
+
+def encode_png(img: Image.Image, max_bytes: Optional[int] = DEFAULT_MAX_BYTES, compress_level: int = 9, optimize: bool = True, palette: bool = False) -> bytes:
+    """
+    Encode img as PNG, using as much of max_bytes as possible.
+
+    Sizes are estimated from a few sampled strips, and every full encode
+    rescales later estimates by how far off the last one was. Tries, in
+    order: lossless, 256/128/64/32-color palettes at full size, then a
+    32-color palette scaled so the result lands between _FILL and 100% of
+    the budget. Estimates skip candidates that cannot fit, so the common
+    cases cost one or two full encodes; the worst case is 1 + 4 + _PASSES.
+
+    With palette, the full-size candidate is a 256-color palette image
+    instead of img itself. Palette (P) inputs are expanded to RGB before
+    any requantizing or downscaling, so scaled text stays antialiased.
+    """
+    def _save(img: Image.Image) -> bytes:
+        return _save_png(img, compress_level, optimize)
+
+    first = _quantize_fast(img) if palette else img
+    if img.mode == "P":
+        img = img.convert("RGB")
+    if not max_bytes:
+        return _save(first)
+
+    target = max_bytes * _SAFETY
+    calibration = 1.0
+    small = img.height <= _STRIPS * _STRIP_HEIGHT * 2
+    estimate = None if small else _estimate(first, None, 1.0, _save)
+    if estimate is None or estimate <= max_bytes / _SAFETY:
+        data = _save(first)
+        if len(data) <= max_bytes:
+            return data
+        if estimate:
+            calibration = len(data) / estimate
+
+    # Largest palette that fits at full scale
+    for colors in _PALETTES:
+        estimate = _estimate(img, colors, 1.0, _save)
+        if estimate * calibration <= target:
+            data = _save(_quantize(img, colors))
+            if len(data) <= max_bytes:
+                return data
+            calibration = len(data) / estimate
+
+    # Downscale with the smallest palette: binary search the scale on
+    # calibrated estimates, then correct it from real encodes
+    colors = _PALETTES[-1]
+    lo, hi = 0.05, _MAX_SCALE
+    for _ in range(7):
+        mid = (lo + hi) / 2
+        if _estimate(img, colors, mid, _save) * calibration <= target:
+            lo = mid
+        else:
+            hi = mid
+    scale = lo
+    best = b""
+    smallest = None
+    tried: Dict[float, int] = {}
+    for _ in range(_PASSES):
+        data = _save(_quantize(_scaled(img, scale), colors))
+        if len(data) <= max_bytes:
+            if len(data) > len(best):
+                best = data
+            if len(data) >= max_bytes * _FILL:
+                break
+        elif smallest is None or len(data) < len(smallest):
+            smallest = data
+        tried[scale] = len(data)
+        # Sizes are noisy in the scale, so aim for the middle of the accepted range
+        scale = _next_scale(tried, max_bytes * (_FILL + _SAFETY) / 2)
+        if scale in tried:
+            break
+    return best or smallest
+
+
+def _next_scale(tried: Dict[float, int], target: float) -> float:
+    """
+    Scale expected to encode to target bytes, from the (scale, size) pairs
+    encoded so far: interpolated on a log-log line between the closest
+    results under and over target, else assuming size tracks area.
+    """
+    under = max((s for s, n in tried.items() if n <= target), default=None)
+    over = min((s for s, n in tried.items() if n > target), default=None)
+    if under is not None and over is not None and tried[over] > tried[under]:
+        slope = math.log(tried[over] / tried[under]) / math.log(over / under)
+        scale = under * (target / tried[under]) ** (1 / slope)
+    else:
+        last = under if over is None else over
+        scale = last * math.sqrt(target / tried[last])
+    return round(min(_MAX_SCALE, max(0.01, scale)), 4)
+
+
+def _save_png(img: Image.Image, compress_level: int = 9, optimize: bool = True) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", optimize=optimize, compress_level=compress_level)
+    return buf.getvalue()
+
+
+def _quantize(img: Image.Image, colors: int) -> Image.Image:
+    return img.convert("P", palette=Image.ADAPTIVE, colors=colors)
+
+
+def _quantize_fast(img: Image.Image) -> Image.Image:
+    """Palette image of img; exact when it has at most 256 colors."""
+    if img.mode == "P":
+        return img
+    if img.getcolors(256) is not None:
+        return img.quantize(colors=256, method=Image.Quantize.MAXCOVERAGE, dither=Image.Dither.NONE)
+    return img.quantize(colors=256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+
+
+def _scaled(img: Image.Image, scale: float) -> Image.Image:
+    if scale >= 1.0:
+        return img
+    size = (max(1, int(img.width * scale)), max(1, int(img.height * scale)))
+    return img.resize(size, Image.LANCZOS)
+
+
+def _estimate(img: Image.Image, colors: Optional[int], scale: float, save: Callable[[Image.Image], bytes] = _save_png) -> float:
+    """
+    Estimate the encoded size of img (optionally quantized and scaled) by
+    encoding evenly spaced strips and extrapolating by height.
+    """
+    src_h = max(1, int(round(_STRIP_HEIGHT / scale)))
+    if src_h * _STRIPS >= img.height:
+        strips = [(0, img.height)]
+    else:
+        step = img.height / _STRIPS
+        strips = [(int(i * step), int(i * step) + src_h) for i in range(_STRIPS)]
+
+    header = 0
+    sampled_rows = 0
+    payload = 0
+    for top, bottom in strips:
+        strip = img.crop((0, top, img.width, bottom))
+        strip = _scaled(strip, scale)
+        if colors:
+            strip = _quantize(strip, colors)
+        # Each strip carries its own chunks and palette; a 1x1 crop keeps both
+        header = len(save(strip.crop((0, 0, 1, 1))))
+        payload += max(0, len(save(strip)) - header)
+        sampled_rows += bottom - top
+    return header + payload * img.height / sampled_rows
+
+
+# Largest side each container can store
+_MAX_SIDE = {"WEBP": 16383, "JPEG": 65535}
+# Qualities tried in turn when a lossy encode is over the byte budget
+_LOSSY_STEPS = (70, 55, 40)
+
+
+class EncoderProfile:
+    """
+    A named way of encoding the rendered image: container, settings and
+    how the byte budget is met.
+
+    PNG profiles fit max_bytes through encode_png (palette, then downscale);
+    lossy profiles lower the quality; lossless WebP ignores the budget.
+    """
+
+    def __init__(self, name: str, format: str, ext: str, mimetype: str, palette: bool = False, lossy: bool = False, **params: Any):
+        self.name = name
+        self.format = format
+        self.ext = ext
+        self.mimetype = mimetype
+        self.palette = palette
+        self.lossy = lossy
+        self.params = params
+
+    def encode(self, img: Image.Image, max_bytes: Optional[int] = DEFAULT_MAX_BYTES) -> bytes:
+        limit = _MAX_SIDE.get(self.format)
+        if limit and max(img.size) > limit:
+            raise ValueError(f"{self.name} output is limited to {limit} px per side (image is {img.width}x{img.height}); use a PNG format")
+        if self.format == "PNG":
+            return encode_png(img, max_bytes, palette=self.palette, **self.params)
+        if self.palette:
+            img = _quantize_fast(img)
+        data = self._save(img, **self.params)
+        if self.lossy and max_bytes:
+            for quality in _LOSSY_STEPS:
+                if len(data) <= max_bytes:
+                    break
+                if quality < self.params["quality"]:
+                    data = self._save(img, **dict(self.params, quality=quality))
+        return data
+
+    def _save(self, img: Image.Image, **params: Any) -> bytes:
+        buf = io.BytesIO()
+        img.save(buf, format=self.format, **params)
+        return buf.getvalue()
+
+
+PROFILES: Dict[str, EncoderProfile] = {
+    p.name: p for p in (
+        # Smallest lossless PNG; the slowest encode
+        EncoderProfile("png", "PNG", ".png", "image/png", compress_level=9, optimize=True),
+        # Fast zlib level for previews; larger files
+        EncoderProfile("png-fast", "PNG", ".png", "image/png", compress_level=1, optimize=False),
+        # 8-bit palette PNG; flat-color themes lose little to quantization
+        EncoderProfile("png-palette", "PNG", ".png", "image/png", palette=True, compress_level=6, optimize=False),
+        EncoderProfile("webp", "WEBP", ".webp", "image/webp", lossless=True, quality=50, method=4),
+        EncoderProfile("webp-lossy", "WEBP", ".webp", "image/webp", lossy=True, quality=85, method=2),
+        # Photo-like backgrounds (circles, gradients); full chroma keeps text edges clean
+        EncoderProfile("jpeg", "JPEG", ".jpg", "image/jpeg", lossy=True, quality=85, subsampling=0),
+    )
+}
+
+
+def get_profile(name: str) -> EncoderProfile:
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown encoder profile: {name}") from None
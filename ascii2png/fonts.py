@@ -1,5 +1,8 @@
 import os
 import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
 from PIL import ImageFont
 
 # Windows default font paths
@@ -42,26 +45,123 @@ def get_font_paths():
         return MAC_FONT_PATHS
     return WIN_FONT_PATHS
 
-def get_font(style: str = "sans", size: int = 20) -> ImageFont.FreeTypeFont:
+class FontRegistry:
     """
-    Load a font by style (serif/sans/mono) and size.
+    Process-wide cache of loaded FreeType faces.
+
+    Each (style, size, path) is resolved once; loaded faces are kept in a
+    bounded LRU so large diagrams do not reload the same TTC per text item.
     """
-    paths_dict = get_font_paths()
-    candidates = paths_dict.get(style, paths_dict["sans"])
-    
-    for path in candidates:
-        if os.path.exists(path):
+
+    def __init__(self, max_faces: int = 64):
+        self.max_faces = max_faces
+        self.hits = 0
+        self.misses = 0
+        self._faces: "OrderedDict[Tuple[str, int, Optional[str]], ImageFont.FreeTypeFont]" = OrderedDict()
+        self._resolved: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, style: str = "sans", size: int = 20, path: Optional[str] = None) -> ImageFont.FreeTypeFont:
+        key = (style, size, path)
+        with self._lock:
+            font = self._faces.get(key)
+            if font is not None:
+                self._faces.move_to_end(key)
+                self.hits += 1
+                return font
+            self.misses += 1
+        font = self._load(style, size, path)
+        with self._lock:
+            self._faces[key] = font
+            self._faces.move_to_end(key)
+            while len(self._faces) > self.max_faces:
+                self._faces.popitem(last=False)
+        return font
+
+    def warm(self, sizes: Iterable[int], styles: Iterable[str] = ("sans", "serif"), path: Optional[str] = None):
+        """Pre-load faces so the first requests do not pay for font I/O."""
+        for size in sizes:
+            if path:
+                self.get("sans", size, path)
+                continue
+            for style in styles:
+                self.get(style, size)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._faces), "max_faces": self.max_faces}
+
+    def clear(self):
+        with self._lock:
+            self._faces.clear()
+            self._resolved.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _load(self, style: str, size: int, path: Optional[str]) -> ImageFont.FreeTypeFont:
+        if path:
             try:
-                # Try to load with high resolution for better quality
                 return ImageFont.truetype(path, size)
             except Exception:
-                continue
-    
-    # Fallback
-    try:
-        return ImageFont.truetype("arial.ttf", size)
-    except:
-        return ImageFont.load_default()
+                pass
+        resolved = self._resolve(style)
+        if resolved:
+            try:
+                return ImageFont.truetype(resolved, size)
+            except Exception:
+                pass
+        # Fallback
+        try:
+            return ImageFont.truetype("arial.ttf", size)
+        except:
+            return ImageFont.load_default()
+
+    def _resolve(self, style: str) -> Optional[str]:
+        """Return the first usable candidate path for a style (cached)."""
+        with self._lock:
+            if style in self._resolved:
+                return self._resolved[style]
+        paths_dict = get_font_paths()
+        candidates = paths_dict.get(style, paths_dict["sans"])
+        found = None
+        for path in candidates:
+            if os.path.exists(path):
+                try:
+                    ImageFont.truetype(path, 12)
+                except Exception:
+                    continue
+                found = path
+                break
+        with self._lock:
+            self._resolved[style] = found
+        return found
+
+
+_registry = FontRegistry()
+
+
+def get_registry() -> FontRegistry:
+    return _registry
+
+
+def warm_fonts(font_sizes: Iterable[int], scale: float = 2.0, font_path: Optional[str] = None):
+    """
+    Pre-warm the registry for the sizes render_scene will request.
+    Body text uses font_size, root titles use font_size * 1.5.
+    """
+    sizes = set()
+    for fs in font_sizes:
+        sizes.add(int(fs * scale))
+        sizes.add(int(int(fs * 1.5) * scale))
+    _registry.warm(sorted(sizes), path=font_path)
+
+
+def get_font(style: str = "sans", size: int = 20, path: Optional[str] = None) -> ImageFont.FreeTypeFont:
+    """
+    Load a font by style (serif/sans/mono) and size.
+    Faces are served from the process-wide FontRegistry.
+    """
+    return _registry.get(style, size, path)
 
 def get_title_font(size: int) -> ImageFont.FreeTypeFont:
     # Use Sans for title as it usually looks cleaner on screens
@@ -0,0 +1,108 @@
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple
+from PIL import Image, ImageDraw, ImageFont
+
+# Sub-pixel start positions are snapped to FreeType's 26.6 grid
+_SUBPIXEL = 64
+# Private Pillow helper wrapping a core image; render_mask falls back without it
+_wrap_core = getattr(Image.Image, "_new", None)
+
+
+def render_mask(font, text: str, mode: str = "L", start: Tuple[float, float] = (0, 0)) -> Tuple[Image.Image, Tuple[int, int]]:
+    """
+    Coverage mask of text and its offset from the pen position, as
+    font.getmask2 returns them. getmask2 hands back a core image and Pillow
+    has no public way to wrap one, so the private Image._new is used while
+    it exists; otherwise the text is drawn into a fresh image.
+    """
+    if isinstance(font, ImageFont.FreeTypeFont):
+        core, offset = font.getmask2(text, mode, start=start)
+    else:
+        core, offset = font.getmask(text, mode), (0, 0)
+    if _wrap_core is not None:
+        return _wrap_core(Image.Image(), core), offset
+    # Draw at a positive pen position so the fractional start is kept, then cut the mask out
+    pad = max(abs(offset[0]), abs(offset[1])) + 1
+    w, h = core.size
+    img = Image.new(core.mode, (w + 2 * pad, h + 2 * pad), 0)
+    draw = ImageDraw.Draw(img)
+    draw.fontmode = mode
+    draw.text((pad + start[0], pad + start[1]), text, font=font, fill=255 if core.mode == "L" else 1)
+    x, y = pad + offset[0], pad + offset[1]
+    return img.crop((x, y, x + w, y + h)), offset
+
+
+class GlyphAtlas:
+    """
+    Cache of rasterized glyph masks and advance metrics keyed by
+    (font, character, sub-pixel phase). Drawing a cached glyph is a
+    bitmap composite instead of a FreeType rasterization.
+    """
+
+    def __init__(self, max_glyphs: int = 20000):
+        self.max_glyphs = max_glyphs
+        self.hits = 0
+        self.misses = 0
+        self._masks: "OrderedDict[Tuple, Tuple[Image.Image, Tuple[int, int]]]" = OrderedDict()
+        self._metrics: Dict[Tuple, Tuple[Tuple[int, int, int, int], float]] = {}
+        self._lock = threading.Lock()
+
+    def metrics(self, font: ImageFont.FreeTypeFont, char: str) -> Tuple[Tuple[int, int, int, int], float]:
+        """(bbox, advance) of a single character."""
+        key = (font, char)
+        m = self._metrics.get(key)
+        if m is None:
+            m = (font.getbbox(char), font.getlength(char))
+            with self._lock:
+                if len(self._metrics) >= self.max_glyphs:
+                    self._metrics.clear()
+                self._metrics[key] = m
+        return m
+
+    def mask(self, font: ImageFont.FreeTypeFont, char: str, fx: int = 0, fy: int = 0,
+             mode: str = "L") -> Tuple[Image.Image, Tuple[int, int]]:
+        """Glyph coverage mask and its offset from the pen position."""
+        key = (font, char, fx, fy, mode)
+        with self._lock:
+            entry = self._masks.get(key)
+            if entry is not None:
+                self._masks.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        entry = render_mask(font, char, mode, (fx / _SUBPIXEL, fy / _SUBPIXEL))
+        with self._lock:
+            self._masks[key] = entry
+            while len(self._masks) > self.max_glyphs:
+                self._masks.popitem(last=False)
+        return entry
+
+    def draw(self, draw, xy: Tuple[float, float], char: str, font: ImageFont.FreeTypeFont, fill):
+        """Equivalent of draw.text(xy, char, font=font, fill=fill) for one character."""
+        x, y = xy
+        fx, ix = math.modf(x)
+        fy, iy = math.modf(y)
+        mode = getattr(draw, "fontmode", "L")
+        mask, offset = self.mask(font, char, int(round(fx * _SUBPIXEL)), int(round(fy * _SUBPIXEL)), mode)
+        if mask.width and mask.height:
+            draw.bitmap((int(ix) + offset[0], int(iy) + offset[1]), mask, fill=fill)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._masks)}
+
+    def clear(self):
+        with self._lock:
+            self._masks.clear()
+            self._metrics.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_atlas = GlyphAtlas()
+
+
+def get_atlas() -> GlyphAtlas:
+    return _atlas
@@ -0,0 +1,197 @@
+import heapq
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Temp files older than this are leftovers of crashed writers
+_STALE_TMP_SECONDS = 3600
+
+
+class OutputCatalog:
+    """
+    In-memory index of the files in an output directory, oldest first.
+
+    Built once with rebuild() and then kept current through record() /
+    discard(), so quota enforcement only looks at the oldest entries
+    instead of listing and stat-ing the whole directory.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.total_bytes = 0
+        self._entries: Dict[str, Tuple[float, int]] = {}
+        # (mtime, path); entries whose mtime no longer matches are skipped lazily
+        self._heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def rebuild(self) -> int:
+        """Re-index the directory from disk; returns the number of files."""
+        entries = {}
+        now = time.time()
+        try:
+            with os.scandir(self.root) as it:
+                for e in it:
+                    if not e.is_file():
+                        continue
+                    try:
+                        st = e.stat()
+                    except OSError:
+                        continue
+                    if e.name.startswith(".tmp-"):
+                        if now - st.st_mtime > _STALE_TMP_SECONDS:
+                            _remove(e.path)
+                        continue
+                    entries[e.path] = (st.st_mtime, st.st_size)
+        except OSError:
+            pass
+        with self._lock:
+            self._entries = entries
+            self._heap = [(mtime, path) for path, (mtime, _) in entries.items()]
+            heapq.heapify(self._heap)
+            self.total_bytes = sum(size for _, size in entries.values())
+            return len(entries)
+
+    def record(self, path: str, mtime: Optional[float] = None, size: Optional[int] = None):
+        """Add or refresh one file (after it is written or served from cache)."""
+        if mtime is None or size is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                self.discard(path)
+                return
+            mtime, size = st.st_mtime, st.st_size
+        with self._lock:
+            old = self._entries.get(path)
+            if old is not None:
+                self.total_bytes -= old[1]
+            self._entries[path] = (mtime, size)
+            self.total_bytes += size
+            heapq.heappush(self._heap, (mtime, path))
+            if len(self._heap) > 2 * len(self._entries) + 64:
+                self._heap = [(m, p) for p, (m, _) in self._entries.items()]
+                heapq.heapify(self._heap)
+
+    def discard(self, path: str):
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+
+    def oldest(self) -> Optional[Tuple[float, int, str]]:
+        """(mtime, size, path) of the least recently used file."""
+        with self._lock:
+            while self._heap:
+                mtime, path = self._heap[0]
+                entry = self._entries.get(path)
+                if entry is not None and entry[0] == mtime:
+                    return mtime, entry[1], path
+                heapq.heappop(self._heap)
+            return None
+
+    def enforce(
+        self,
+        max_age_seconds: Optional[float] = None,
+        max_total_bytes: Optional[int] = None,
+        max_files: Optional[int] = None,
+    ) -> int:
+        """
+        Delete least recently used files until every quota holds.
+        Returns the number of files removed.
+        """
+        now = time.time()
+        removed = 0
+        while True:
+            oldest = self.oldest()
+            if oldest is None:
+                break
+            mtime, size, path = oldest
+            expired = max_age_seconds is not None and now - mtime > max_age_seconds
+            over_bytes = max_total_bytes is not None and self.total_bytes > max_total_bytes
+            over_count = max_files is not None and len(self._entries) > max_files
+            if not (expired or over_bytes or over_count):
+                break
+            # Another process may have served (touched) or replaced it since indexing
+            try:
+                st = os.stat(path)
+            except OSError:
+                self.discard(path)
+                continue
+            if st.st_mtime != mtime or st.st_size != size:
+                self.record(path, st.st_mtime, st.st_size)
+                continue
+            if _remove(path):
+                removed += 1
+            self.discard(path)
+        return removed
+
+
+def _remove(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+
+class OutputJanitor:
+    """
+    Background thread enforcing output quotas against an OutputCatalog.
+
+    The catalogue is rebuilt once when the thread starts and again every
+    rescan_interval seconds to pick up files written by other processes;
+    in between, each pass only inspects the oldest entries.
+    """
+
+    def __init__(
+        self,
+        catalog: OutputCatalog,
+        max_age_seconds: Optional[float] = None,
+        max_total_bytes: Optional[int] = None,
+        max_files: Optional[int] = None,
+        interval: float = 30.0,
+        rescan_interval: float = 600.0,
+    ):
+        self.catalog = catalog
+        self.max_age_seconds = max_age_seconds
+        self.max_total_bytes = max_total_bytes
+        self.max_files = max_files
+        self.interval = interval
+        self.rescan_interval = rescan_interval
+        self.removed = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_rescan = 0.0
+
+    def run_once(self) -> int:
+        """One enforcement pass (rescanning the directory if due)."""
+        if time.time() - self._last_rescan >= self.rescan_interval:
+            self.catalog.rebuild()
+            self._last_rescan = time.time()
+        n = self.catalog.enforce(self.max_age_seconds, self.max_total_bytes, self.max_files)
+        self.removed += n
+        return n
+
+    def _loop(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception:
+                pass
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="ascii2png-janitor", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,261 @@
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+from .store import atomic_write_bytes
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+def _timed_call(fn: Callable, args, kwargs, started_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Runs in the worker: record when the job actually ran. With started_path
+    set, the start time is also written there as soon as the job starts.
+    """
+    started = time.time()
+    if started_path:
+        try:
+            atomic_write_bytes(started_path, repr(started).encode("ascii"))
+        except OSError:
+            pass
+    result = fn(*args, **kwargs)
+    return {"started_at": started, "finished_at": time.time(), "result": result}
+
+
+class Job:
+    """
+    State of one asynchronous render. `result` is whatever the submitted
+    function returned (for web jobs, the output path).
+    """
+
+    def __init__(self, job_id: str, created_at: float):
+        self.id = job_id
+        self.status = QUEUED
+        self.created_at = created_at
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.future: Optional[Future] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.finished_at or time.time()
+        return {
+            "id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed": round(end - self.created_at, 3),
+            "error": self.error,
+            "result": self.result,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        job = cls(data["id"], data["created_at"])
+        job.status = data["status"]
+        job.started_at = data.get("started_at")
+        job.finished_at = data.get("finished_at")
+        job.result = data.get("result")
+        job.error = data.get("error")
+        return job
+
+
+class JobQueue:
+    """
+    Local job broker on top of an executor (e.g. a RenderPool).
+
+    Jobs are tracked in memory by the process that submitted them. With
+    state_dir set, every state change is also written there as
+    <id>.json, so other server processes can report status and cancel;
+    the owner honours a cancellation recorded in the file. Workers mark
+    the moment a job starts in <id>.started, so a job is only reported
+    running once it really is; without state_dir it counts as running as
+    soon as the executor hands it to a worker. Finished jobs are forgotten
+    ttl seconds after they finish.
+    """
+
+    def __init__(self, executor, ttl: float = 3600, state_dir: Optional[str] = None):
+        self.executor = executor
+        self.ttl = ttl
+        self.state_dir = state_dir
+        self._jobs: Dict[str, Job] = {}
+        # Reentrant: cancelling a future under the lock runs _finish inline
+        self._lock = threading.RLock()
+        self._last_sweep = 0.0
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Job:
+        """Queue fn(*args, **kwargs); executor errors (e.g. PoolBusy) propagate."""
+        self.sweep()
+        job = Job(uuid.uuid4().hex, time.time())
+        job.future = self.executor.submit(_timed_call, fn, args, kwargs, self._path(job.id, ".started"))
+        with self._lock:
+            self._jobs[job.id] = job
+        self._save(job)
+        job.future.add_done_callback(lambda f: self._finish(job, f))
+        return job
+
+    def completed(self, result: Any) -> Job:
+        """Record a job that needed no work (e.g. a cache hit) as already done."""
+        now = time.time()
+        job = Job(uuid.uuid4().hex, now)
+        job.status = DONE
+        job.started_at = job.finished_at = now
+        job.result = result
+        with self._lock:
+            self._jobs[job.id] = job
+        self._save(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            job = self._load(job_id)
+            if job is not None and job.status == QUEUED:
+                # Owned by another process: report the start, leave the file to the owner
+                started = self._started_at(job)
+                if started is not None:
+                    job.status, job.started_at = RUNNING, started
+        if job is None or self._expired(job):
+            return None
+        if job.future is not None:
+            with self._lock:
+                # Re-checked under the lock: _finish may have just recorded the outcome
+                if job.status in FINISHED:
+                    return job
+                if self.state_dir and self._cancelled_elsewhere(job):
+                    job.future.cancel()
+                    job.status = CANCELLED
+                    job.finished_at = job.finished_at or time.time()
+                elif job.status == QUEUED:
+                    started = self._started_at(job)
+                    if started is not None:
+                        job.status, job.started_at = RUNNING, started
+                        self._save(job)
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a job that has not finished. A queued job never runs; a
+        running one completes in its worker but its result is discarded.
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        with self._lock:
+            if job.status in FINISHED:
+                return job
+            if job.future is not None:
+                job.future.cancel()
+            job.status = CANCELLED
+            job.finished_at = job.finished_at or time.time()
+            self._save(job)
+        return job
+
+    def _finish(self, job: Job, future: Future):
+        with self._lock:
+            self._record_outcome(job, future)
+            self._save(job)
+        started = self._path(job.id, ".started")
+        if started:
+            try:
+                os.remove(started)
+            except OSError:
+                pass
+
+    def _record_outcome(self, job: Job, future: Future):
+        if job.status == CANCELLED or self._cancelled_elsewhere(job):
+            job.status = CANCELLED
+            job.finished_at = job.finished_at or time.time()
+        elif future.cancelled():
+            job.status = CANCELLED
+            job.finished_at = time.time()
+        elif future.exception() is not None:
+            job.status = FAILED
+            job.error = str(future.exception()) or type(future.exception()).__name__
+            job.finished_at = time.time()
+        else:
+            timed = future.result()
+            job.status = DONE
+            job.result = timed["result"]
+            job.started_at = timed["started_at"]
+            job.finished_at = timed["finished_at"]
+
+    def _started_at(self, job: Job) -> Optional[float]:
+        """When the job started running, or None while it is still queued."""
+        path = self._path(job.id, ".started")
+        if path:
+            try:
+                with open(path, "rb") as f:
+                    return float(f.read().decode("ascii"))
+            except (OSError, ValueError):
+                return None
+        if job.future is not None and job.future.running():
+            return time.time()
+        return None
+
+    def _expired(self, job: Job) -> bool:
+        return job.status in FINISHED and job.finished_at is not None and time.time() - job.finished_at > self.ttl
+
+    def sweep(self, min_interval: float = 60.0):
+        """Drop finished jobs past their TTL, at most once per min_interval."""
+        now = time.time()
+        if now - self._last_sweep < min_interval:
+            return
+        self._last_sweep = now
+        with self._lock:
+            expired = [j for j in self._jobs.values() if self._expired(j)]
+            for job in expired:
+                del self._jobs[job.id]
+        if not self.state_dir:
+            return
+        try:
+            with os.scandir(self.state_dir) as it:
+                for e in it:
+                    if e.name.endswith(".json") and now - e.stat().st_mtime > self.ttl:
+                        job = self._load(e.name[:-5])
+                        if job is None or self._expired(job):
+                            os.remove(e.path)
+                    elif e.name.endswith(".started") and now - e.stat().st_mtime > self.ttl:
+                        # Left behind by a worker that died mid-job
+                        os.remove(e.path)
+        except OSError:
+            pass
+
+    def _path(self, job_id: str, ext: str = ".json") -> Optional[str]:
+        # Ids are uuid4 hex; anything else cannot name a job file
+        if not self.state_dir or not job_id or not all(c in "0123456789abcdef" for c in job_id):
+            return None
+        return os.path.join(self.state_dir, f"{job_id}{ext}")
+
+    def _save(self, job: Job):
+        path = self._path(job.id)
+        if path:
+            atomic_write_bytes(path, json.dumps(job.to_dict()).encode("utf-8"))
+
+    def _load(self, job_id: str) -> Optional[Job]:
+        path = self._path(job_id)
+        if not path:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return Job.from_dict(json.loads(f.read().decode("utf-8")))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _cancelled_elsewhere(self, job: Job) -> bool:
+        stored = self._load(job.id)
+        return stored is not None and stored.status == CANCELLED
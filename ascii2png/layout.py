@@ -1,25 +1,75 @@
-from typing import List, Tuple
+import json
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List, Tuple, Union
 from .parser import Node
+from .tree import CompactTree, NodeView
+
+# Distinct colors are few per scene; sharing one tuple per color saves a
+# tuple per item. Capped so arbitrary user colors cannot grow it unbounded.
+_COLORS: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+_MAX_INTERNED_COLORS = 4096
+
+
+def intern_color(color) -> Tuple[int, ...]:
+    """The shared tuple equal to color."""
+    color = tuple(color)
+    shared = _COLORS.get(color)
+    if shared is not None:
+        return shared
+    if len(_COLORS) < _MAX_INTERNED_COLORS:
+        _COLORS[color] = color
+    return color
+
 
 class VecText:
+    __slots__ = ("text", "x", "y", "size", "color", "font_style", "spacing")
+
     def __init__(self, text: str, x: float, y: float, size: int, color: Tuple[int, int, int], font_style: str = "sans", spacing: int = 0):
         self.text = text
         self.x = x
         self.y = y
         self.size = size
-        self.color = color
-        self.font_style = font_style
+        self.color = intern_color(color)
+        self.font_style = sys.intern(font_style)
         self.spacing = spacing
 
 class VecLine:
+    __slots__ = ("x1", "y1", "x2", "y2", "width", "color", "style")
+
     def __init__(self, x1: float, y1: float, x2: float, y2: float, width: int, color: Tuple[int, int, int], style: str = "solid"):
         self.x1 = x1
         self.y1 = y1
         self.x2 = x2
         self.y2 = y2
         self.width = width
-        self.color = color
-        self.style = style
+        self.color = intern_color(color)
+        self.style = sys.intern(style)
+
+# Binary scene format: magic, then a length-prefixed JSON header (canvas,
+# config and the color/style tables), then one little-endian array per
+# item field, then the UTF-8 labels joined into a single buffer
+_SCENE_MAGIC = b"A2PSCN\x01"
+_TEXT_FIELDS = (("x", "d"), ("y", "d"), ("size", "i"), ("color", "I"), ("font_style", "I"), ("spacing", "i"), ("text", "I"))
+_LINE_FIELDS = (("x1", "d"), ("y1", "d"), ("x2", "d"), ("y2", "d"), ("width", "i"), ("color", "I"), ("style", "I"))
+
+
+def _from_json(value: Any) -> Any:
+    """Undo JSON's tuple -> list conversion (colors are tuples)."""
+    if isinstance(value, list):
+        items = [_from_json(v) for v in value]
+        return tuple(items) if all(isinstance(v, (int, float)) for v in items) else items
+    if isinstance(value, dict):
+        return {k: _from_json(v) for k, v in value.items()}
+    return value
+
+
+def _le(a: array) -> array:
+    if sys.byteorder != "little":
+        a.byteswap()
+    return a
+
 
 class Scene:
     def __init__(self, width: int, height: int, bg: Tuple[int, int, int], bg_style: str = "plain", extra_config: dict = None):
@@ -31,14 +81,142 @@ class Scene:
         self.texts: List[VecText] = []
         self.lines: List[VecLine] = []
 
-def layout_tree(root: Node, width: int, font_size: int, colors: dict) -> Scene:
+    def __reduce__(self):
+        # Worker processes receive the compact binary form instead of a
+        # pickle of every item object
+        return (Scene.from_bytes, (self.to_bytes(),))
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize to the compact binary format. extra_config must be
+        JSON-serializable (theme dictionaries are).
+        """
+        colors: Dict[Tuple[int, ...], int] = {}
+        styles: Dict[str, int] = {}
+        texts, lines = self.texts, self.lines
+        labels = [t.text.encode("utf-8") for t in texts]
+
+        columns = []
+        for items, fields in ((texts, _TEXT_FIELDS), (lines, _LINE_FIELDS)):
+            for name, code in fields:
+                if name == "text":
+                    values = [len(b) for b in labels]
+                elif name == "color":
+                    values = [colors.setdefault(tuple(x.color), len(colors)) for x in items]
+                elif name in ("font_style", "style"):
+                    values = [styles.setdefault(getattr(x, name), len(styles)) for x in items]
+                else:
+                    values = [getattr(x, name) for x in items]
+                columns.append(_le(array(code, values)).tobytes())
+
+        header = json.dumps({
+            "width": self.width,
+            "height": self.height,
+            "bg": self.bg,
+            "bg_style": self.bg_style,
+            "extra_config": self.extra_config,
+            "colors": list(colors),
+            "styles": list(styles),
+            "texts": len(texts),
+            "lines": len(lines),
+        }, separators=(",", ":")).encode("utf-8")
+        return b"".join([_SCENE_MAGIC, struct.pack("<I", len(header)), header] + columns + labels)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Scene":
+        """Rebuild a scene written by to_bytes()."""
+        if not data.startswith(_SCENE_MAGIC):
+            raise ValueError("Not a serialized scene")
+        pos = len(_SCENE_MAGIC)
+        (n,) = struct.unpack_from("<I", data, pos)
+        pos += 4
+        header = _from_json(json.loads(data[pos:pos + n].decode("utf-8")))
+        pos += n
+        scene = cls(header["width"], header["height"], header["bg"], header["bg_style"], header["extra_config"])
+        colors = [intern_color(c) for c in header["colors"]]
+        styles = [sys.intern(s) for s in header["styles"]]
+
+        view = memoryview(data)
+        tables = []
+        for count, fields in ((header["texts"], _TEXT_FIELDS), (header["lines"], _LINE_FIELDS)):
+            table = {}
+            for name, code in fields:
+                a = array(code)
+                end = pos + count * a.itemsize
+                a.frombytes(view[pos:end])
+                table[name] = _le(a)
+                pos = end
+            tables.append(table)
+        tt, lt = tables
+
+        labels = []
+        for length in tt["text"]:
+            labels.append(data[pos:pos + length].decode("utf-8"))
+            pos += length
+        if pos != len(data):
+            raise ValueError("Corrupt serialized scene")
+
+        scene.texts = [
+            VecText(label, x, y, size, colors[c], styles[f], sp)
+            for label, x, y, size, c, f, sp in zip(labels, tt["x"], tt["y"], tt["size"], tt["color"], tt["font_style"], tt["spacing"])
+        ]
+        scene.lines = [
+            VecLine(x1, y1, x2, y2, w, colors[c], styles[st])
+            for x1, y1, x2, y2, w, c, st in zip(lt["x1"], lt["y1"], lt["x2"], lt["y2"], lt["width"], lt["color"], lt["style"])
+        ]
+        return scene
+
+def layout_tree(root: Union[Node, CompactTree], width: int, font_size: int, colors: dict) -> Scene:
     mode = colors.get("layout_mode", "horizontal")
     if mode == "vertical":
         return layout_tree_rtl(root, width, font_size, colors)
     else:
         return layout_tree_horizontal(root, width, font_size, colors)
 
-def layout_tree_horizontal(root: Node, width: int, font_size: int, colors: dict) -> Scene:
+def _flatten(root) -> Tuple[List[str], List[int], List[int], List[int]]:
+    """
+    Iterative pre-order walk. Returns labels, depths and first-child /
+    next-sibling links as positions in that order (-1 for none).
+    Accepts a parser.Node, a CompactTree or a CompactTree NodeView.
+    """
+    if isinstance(root, CompactTree):
+        return root.flatten()
+    if isinstance(root, NodeView):
+        return root.tree.flatten(root.index)
+    labels: List[str] = []
+    depths: List[int] = []
+    first_child: List[int] = []
+    next_sibling: List[int] = []
+    last_child: List[int] = []
+    stack: List[Tuple[Node, int, int]] = [(root, 0, -1)]
+    while stack:
+        node, depth, parent = stack.pop()
+        pos = len(labels)
+        labels.append(node.label)
+        depths.append(depth)
+        first_child.append(-1)
+        next_sibling.append(-1)
+        last_child.append(-1)
+        if parent >= 0:
+            if last_child[parent] < 0:
+                first_child[parent] = pos
+            else:
+                next_sibling[last_child[parent]] = pos
+            last_child[parent] = pos
+        children = node.children
+        for i in range(len(children) - 1, -1, -1):
+            stack.append((children[i], depth + 1, pos))
+    return labels, depths, first_child, next_sibling
+
+def _children(first_child: List[int], next_sibling: List[int], pos: int) -> List[int]:
+    out = []
+    c = first_child[pos]
+    while c >= 0:
+        out.append(c)
+        c = next_sibling[c]
+    return out
+
+def layout_tree_horizontal(root: Union[Node, CompactTree], width: int, font_size: int, colors: dict) -> Scene:
     """
     Standard Vertical List (File Tree).
     """
@@ -47,21 +225,16 @@ def layout_tree_horizontal(root: Node, width: int, font_size: int, colors: dict)
     line_height = int(font_size * 1.8)
     indent_step = int(font_size * 2.0)
     
-    layout_items: List[Tuple[Node, int, float]] = []
+    labels, depths, first_child, next_sibling = _flatten(root)
+    ys: List[float] = []
     current_y = float(y_margin)
-    
-    def traverse(node: Node, depth: int):
-        nonlocal current_y
-        layout_items.append((node, depth, current_y))
+    for depth in depths:
+        ys.append(current_y)
         # Add extra spacing for root title?
         spacing = line_height
         if depth == 0:
              spacing = int(line_height * 1.5)
         current_y += spacing
-        for child in node.children:
-            traverse(child, depth + 1)
-            
-    traverse(root, 0)
     
     scene_height = int(current_y + y_margin)
     scene = Scene(
@@ -72,15 +245,12 @@ def layout_tree_horizontal(root: Node, width: int, font_size: int, colors: dict)
         extra_config=colors
     )
     
-    def get_node_y(n: Node) -> float:
-        for node, _, y in layout_items:
-            if node is n:
-                return y
-        return 0.0
-
     line_style = colors.get("line_style", "solid")
+    line_width = max(2, font_size // 12)
+    half_font = font_size * 0.5
 
-    for node, depth, y in layout_items:
+    for pos, depth in enumerate(depths):
+        y = ys[pos]
         x_text = x_margin + depth * indent_step
         
         # Font styling
@@ -92,19 +262,15 @@ def layout_tree_horizontal(root: Node, width: int, font_size: int, colors: dict)
         # Title specific: Bold is handled by font selection (usually serif is bolder or we can add bold flag)
         # We'll rely on 'serif' font for title.
         
-        scene.texts.append(VecText(node.label, x_text, y, f_size, colors["text"], font_style=f_style, spacing=f_spacing))
+        scene.texts.append(VecText(labels[pos], x_text, y, f_size, colors["text"], font_style=f_style, spacing=f_spacing))
         
-        if node.children:
+        if first_child[pos] >= 0:
+            children = _children(first_child, next_sibling, pos)
             child_depth = depth + 1
             vline_x = x_margin + (child_depth * indent_step) - (indent_step / 2)
             
-            first_child = node.children[0]
-            last_child = node.children[-1]
-            
-            y_first = get_node_y(first_child)
-            y_last = get_node_y(last_child)
-            
-            half_font = font_size * 0.5
+            y_first = ys[children[0]]
+            y_last = ys[children[-1]]
             
             # Vertical backbone
             scene.lines.append(VecLine(
@@ -112,27 +278,28 @@ def layout_tree_horizontal(root: Node, width: int, font_size: int, colors: dict)
                 y_first + half_font, 
                 vline_x, 
                 y_last + half_font, 
-                max(2, font_size // 12), 
+                line_width, 
                 colors["line"],
                 style=line_style
             ))
             
-            # Horizontal connectors
-            for child in node.children:
-                cy = get_node_y(child)
-                child_text_x = x_margin + child_depth * indent_step
+            # Horizontal connectors (shared coordinate objects keep large scenes small)
+            child_text_x = x_margin + child_depth * indent_step
+            connector_end = child_text_x - (font_size * 0.2)
+            for child in children:
+                cy = ys[child] + half_font
                 scene.lines.append(VecLine(
                     vline_x, 
-                    cy + half_font, 
-                    child_text_x - (font_size * 0.2),
-                    cy + half_font, 
-                    max(2, font_size // 12), 
+                    cy, 
+                    connector_end,
+                    cy, 
+                    line_width, 
                     colors["line"],
                     style=line_style
                 ))
     return scene
 
-def layout_tree_rtl(root: Node, width: int, font_size: int, colors: dict) -> Scene:
+def layout_tree_rtl(root: Union[Node, CompactTree], width: int, font_size: int, colors: dict) -> Scene:
     """
     RTL Vertical Text Layout.
     Columns flow Right-to-Left.
@@ -141,19 +308,14 @@ def layout_tree_rtl(root: Node, width: int, font_size: int, colors: dict) -> Sce
     col_width = int(font_size * 1.8)
     indent_step = int(font_size * 2.0) # Vertical indent for hierarchy
     
-    layout_items = []
+    labels, depths, first_child, next_sibling = _flatten(root)
+    xs: List[float] = []
     current_x = float(width - margin)
-    
-    def traverse(node: Node, depth: int):
-        nonlocal current_x
-        layout_items.append((node, depth, current_x))
+    for _ in depths:
+        xs.append(current_x)
         current_x -= col_width
-        for child in node.children:
-            traverse(child, depth + 1)
-            
-    traverse(root, 0)
     
-    real_min_x = min([item[2] for item in layout_items]) if layout_items else margin
+    real_min_x = min(xs) if xs else margin
     shift = 0
     if real_min_x < margin:
         shift = margin - real_min_x
@@ -173,9 +335,11 @@ def layout_tree_rtl(root: Node, width: int, font_size: int, colors: dict) -> Sce
     )
     
     line_style = colors.get("line_style", "solid")
+    line_width = max(2, font_size // 10)
     
-    for node, depth, x in layout_items:
-        x = x + shift
+    for pos, depth in enumerate(depths):
+        label = labels[pos]
+        x = xs[pos] + shift
         y_start = margin + depth * indent_step
         
         is_root = (depth == 0)
@@ -184,7 +348,7 @@ def layout_tree_rtl(root: Node, width: int, font_size: int, colors: dict) -> Sce
         f_spacing = 8 if is_root else 4
         
         scene.texts.append(VecText(
-            node.label, 
+            label, 
             x, 
             y_start, 
             f_size, 
@@ -193,19 +357,12 @@ def layout_tree_rtl(root: Node, width: int, font_size: int, colors: dict) -> Sce
             spacing=f_spacing
         ))
         
-        text_len = len(node.label)
+        text_len = len(label)
         text_height = text_len * (f_size + f_spacing)
         max_y = max(max_y, y_start + text_height)
         
-        if node.children:
-            child_xs = []
-            for c in node.children:
-                for n_item, d_item, x_item in layout_items:
-                    if n_item is c:
-                        child_xs.append(x_item + shift)
-                        break
-            
-            if not child_xs: continue
+        if first_child[pos] >= 0:
+            child_xs = [xs[c] + shift for c in _children(first_child, next_sibling, pos)]
             
             last_child_x = child_xs[-1] # Leftmost
             
@@ -217,19 +374,20 @@ def layout_tree_rtl(root: Node, width: int, font_size: int, colors: dict) -> Sce
                 backbone_y,
                 last_child_x, 
                 backbone_y, 
-                max(2, font_size // 10), 
+                line_width, 
                 colors["line"],
                 style=line_style
             ))
             
             # Vertical Ticks to Children
+            tick_end = y_start + indent_step
             for cx in child_xs:
                  scene.lines.append(VecLine(
                     cx,
                     backbone_y,
                     cx,
-                    y_start + indent_step, 
-                    max(2, font_size // 10),
+                    tick_end, 
+                    line_width,
                     colors["line"],
                     style=line_style
                 ))
@@ -240,7 +398,7 @@ def layout_tree_rtl(root: Node, width: int, font_size: int, colors: dict) -> Sce
                 y_start,
                 x,
                 backbone_y,
-                max(2, font_size // 10),
+                line_width,
                 colors["line"],
                 style=line_style
             ))
@@ -0,0 +1,140 @@
+import functools
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from PIL import Image, ImageDraw
+
+# Styles drawn from cached pattern masks; solid lines are a single primitive already
+STAMPED_STYLES = ("dotted", "dashed", "wave", "cloud")
+
+# Patterns larger than this many pixels are drawn directly instead of cached
+_MAX_SPRITE_PIXELS = 1_000_000
+
+
+class LineSpriteCache:
+    """
+    Bounded LRU of rasterized line patterns, limited by total mask bytes.
+
+    A pattern is one styled line drawn into an "L" mask, keyed by
+    (style, width, dx, dy, sub-pixel phase of the start point). Tree
+    connectors repeat the same few shapes, so most lines become a single
+    paste of an existing mask instead of dozens of dot/dash/arc primitives.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[Tuple, Tuple[Image.Image, Tuple[int, int]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple, build) -> Tuple[Image.Image, Tuple[int, int]]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return item
+            self.misses += 1
+        item = build()
+        size = item[0].width * item[0].height
+        with self._lock:
+            if key not in self._items and size <= self.max_bytes:
+                self._items[key] = item
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, (old, _) = self._items.popitem(last=False)
+                    self._bytes -= old.width * old.height
+        return item
+
+    def __contains__(self, key: Tuple) -> bool:
+        with self._lock:
+            return key in self._items
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._items), "bytes": self._bytes}
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+_cache = LineSpriteCache()
+
+
+def get_line_cache() -> LineSpriteCache:
+    return _cache
+
+
+@functools.lru_cache(maxsize=256)
+def wave_offsets(width: int, steps: int) -> Tuple[Tuple[float, float], ...]:
+    """(distance along the line, perpendicular offset) for each wave point."""
+    amplitude = width * 2
+    table = []
+    for i in range(steps):
+        dist = i * 2
+        table.append((dist, math.sin(dist * 0.3) * amplitude))
+    return tuple(table)
+
+
+def _pad(width: int) -> int:
+    # Same reach as spatial.line_extent: wave amplitude / cloud bumps plus stroke
+    return width * 5 + 2
+
+
+def _build_sprite(style: str, width: int, dx: float, dy: float, fx: float, fy: float) -> Tuple[Image.Image, Tuple[int, int]]:
+    from .render import draw_line_styled
+
+    pad = _pad(width)
+    left = pad + int(math.ceil(max(0.0, -dx)))
+    top = pad + int(math.ceil(max(0.0, -dy)))
+    size = (left + int(math.ceil(max(0.0, dx))) + pad + 1, top + int(math.ceil(max(0.0, dy))) + pad + 1)
+    mask = Image.new("L", size, 0)
+    sx, sy = left + fx, top + fy
+    draw_line_styled(ImageDraw.Draw(mask), (sx, sy), (sx + dx, sy + dy), style=style, width=width, color=255)
+    # Pasting costs per mask pixel, so keep only the inked box
+    bbox = mask.getbbox() or (0, 0, 1, 1)
+    return mask.crop(bbox), (left - bbox[0], top - bbox[1])
+
+
+def draw_lines(img: Image.Image, lines, scale: float, oy: int = 0, palette: Optional[Dict] = None):
+    """
+    Draw VecLines onto img, the region of a supersampled canvas starting at
+    row oy. Patterned styles are pasted from cached masks once a shape
+    repeats; output matches drawing each line with draw_line_styled.
+    palette maps line colors to the values drawn (e.g. palette indices).
+    """
+    from .render import draw_line_styled
+
+    draw = ImageDraw.Draw(img)
+    seen = set()
+    for line in lines:
+        style = getattr(line, "style", "solid")
+        color = palette[line.color] if palette is not None else line.color
+        width = max(1, int(line.width * scale))
+        x1, y1 = line.x1 * scale, line.y1 * scale - oy
+        x2, y2 = line.x2 * scale, line.y2 * scale - oy
+        dx, dy = x2 - x1, y2 - y1
+        pad = _pad(width)
+        if style not in STAMPED_STYLES or (abs(dx) + 2 * pad) * (abs(dy) + 2 * pad) > _MAX_SPRITE_PIXELS:
+            draw_line_styled(draw, (x1, y1), (x2, y2), style=style, width=width, color=color)
+            continue
+        ix, iy = math.floor(x1), math.floor(y1)
+        fx, fy = x1 - ix, y1 - iy
+        key = (style, width, dx, dy, fx, fy)
+        if key not in seen and key not in _cache:
+            # One-off shapes are cheaper to draw than to cache
+            seen.add(key)
+            draw_line_styled(draw, (x1, y1), (x2, y2), style=style, width=width, color=color)
+            continue
+        mask, (left, top) = _cache.get(key, lambda: _build_sprite(style, width, dx, dy, fx, fy))
+        x0, y0 = ix - left, iy - top
+        if y0 >= img.height or y0 + mask.height <= 0:
+            continue
+        img.paste(color, (x0, y0, x0 + mask.width, y0 + mask.height), mask)
@@ -0,0 +1,184 @@
+from typing import Dict, List, Optional, Tuple
+from PIL import Image, ImageChops
+from .background import _dots_block, _grid_block, _paste_repeated
+from .fonts import get_font
+from .glyphs import render_mask
+from .layout import Scene
+from .lines import draw_lines
+
+# Background styles made of flat colors only
+PALETTE_BACKGROUNDS = ("plain", "grid", "dots")
+# Antialiasing levels between the background and each foreground color
+RAMP_LEVELS = 64
+
+
+class IndexPalette:
+    """
+    Palette for a flat-color scene: the background at index 0, one ramp
+    of RAMP_LEVELS entries from the background to each antialiased color,
+    and single entries for pattern colors.
+
+    strength maps each index to its coverage level (0 for the background
+    and its patterns), so overlapping items can keep the stronger one
+    where an RGB canvas would blend them.
+    """
+
+    def __init__(self, bg):
+        self.colors: List[Tuple[int, int, int]] = [tuple(bg)]
+        self.strength: List[int] = [0] * 256
+        self._flat: Dict[Tuple, int] = {tuple(bg): 0}
+        self._ramps: Dict[Tuple, Tuple[List[int], List[int]]] = {}
+
+    def flat(self, color, strength: int = RAMP_LEVELS - 1) -> int:
+        """Index of the exact color; background patterns pass strength=0."""
+        color = tuple(color)
+        if color in self._ramps:
+            return self._flat[color]
+        index = self._flat.get(color)
+        if index is None:
+            index = self._add([color])
+            self._flat[color] = index
+        self.strength[index] = max(self.strength[index], strength) if index else 0
+        return index
+
+    def ramp(self, color) -> Tuple[List[int], List[int]]:
+        """
+        (index LUT, level LUT) mapping 8-bit coverage of color to a
+        palette index and to its coverage level plus one (0 where empty).
+        """
+        color = tuple(color)
+        luts = self._ramps.get(color)
+        if luts is None:
+            bg = self.colors[0]
+            n = RAMP_LEVELS - 1
+            base = self._add([
+                tuple(int(round(b + (c - b) * k / n)) for b, c in zip(bg, color))
+                for k in range(RAMP_LEVELS)
+            ])
+            self.strength[base:base + RAMP_LEVELS] = range(RAMP_LEVELS)
+            self._flat[color] = base + n
+            level = [(v * n + 127) // 255 for v in range(256)]
+            # Levels are offset by one so a glyph wins ties with what is under it
+            luts = ([base + k if v else 0 for v, k in enumerate(level)], [k + 1 if v else 0 for v, k in enumerate(level)])
+            self._ramps[color] = luts
+        return luts
+
+    def _add(self, colors: List[Tuple[int, int, int]]) -> int:
+        if len(self.colors) + len(colors) > 256:
+            raise ValueError("Scene has too many colors for a palette image")
+        base = len(self.colors)
+        self.colors.extend(colors)
+        return base
+
+    def flatten(self) -> List[int]:
+        return [v for c in self.colors for v in c[:3]]
+
+
+def palette_supported(scene: Scene) -> bool:
+    """Whether render_palette can draw the scene: flat background, few colors."""
+    if scene.bg_style not in PALETTE_BACKGROUNDS:
+        return False
+    colors = {tuple(t.color) for t in scene.texts} | {tuple(l.color) for l in scene.lines}
+    return 1 + 2 + len(colors) * RAMP_LEVELS <= 256
+
+
+_SELECT = [0] + [255] * 255
+
+
+class _IndexDraw:
+    """
+    Drawing target for draw_text_vertical / draw_text_horizontal_spaced
+    that writes palette indices: glyph coverage is mapped through the
+    fill color's ramp instead of being blended.
+    """
+
+    fontmode = "L"
+
+    def __init__(self, canvas: Image.Image, palette: IndexPalette):
+        self.canvas = canvas
+        self.palette = palette
+
+    def bitmap(self, xy, mask: Image.Image, fill):
+        index, level = self.palette.ramp(fill)
+        x, y = int(xy[0]), int(xy[1])
+        box = (x, y, x + mask.width, y + mask.height)
+        # Keep what is already there where it is stronger than the glyph edge
+        under = self.canvas.crop(box).point(self.palette.strength)
+        select = ImageChops.subtract(mask.point(level), under).point(_SELECT)
+        self.canvas.paste(mask.point(index), box, select)
+
+    def text(self, xy, text: str, font, fill):
+        x, y = xy
+        mask, offset = render_mask(font, text)
+        if mask.width and mask.height:
+            self.bitmap((int(x) + offset[0], int(y) + offset[1]), mask, fill)
+
+
+def render_palette(scene: Scene, width: int, font_path: Optional[str] = None) -> Image.Image:
+    """
+    Draw the scene at native resolution straight into a "P" image whose
+    palette is the theme's colors plus antialiasing ramps, so no RGB
+    canvas or quantization is needed. Geometry matches the RGB renderer
+    at supersample=1; antialiased edges take the nearest of RAMP_LEVELS
+    shades against the background.
+    """
+    from .render import _fill_rect_aa, _font, draw_text_horizontal_spaced, draw_text_vertical
+
+    h = max(scene.height, 400)
+    cfg = scene.extra_config
+    palette = IndexPalette(scene.bg)
+    canvas = Image.new("L", (width, h), 0)
+
+    if scene.bg_style == "grid":
+        grid = palette.flat(cfg.get("grid_color", (220, 220, 220)), strength=0)
+        _paste_repeated(canvas, _grid_block(width, 40, 0, grid, "L"), 40, 0, h)
+    elif scene.bg_style == "dots":
+        dot = palette.flat(cfg.get("dot_color", (200, 200, 200)), strength=0)
+        _paste_repeated(canvas, _dots_block(width, 30, 2, 0, dot, "L"), 30, 0, h)
+        last = (h - 1) // 30 * 30
+        if last + 15 >= h:
+            canvas.paste(0, (0, last, width, h))
+
+    batched = []
+    for line in scene.lines:
+        if getattr(line, "style", "solid") == "solid" and (line.x1 == line.x2 or line.y1 == line.y2):
+            _axis_line(canvas, palette, line, _fill_rect_aa)
+        else:
+            batched.append(line)
+    # Patterned lines are aliased at native resolution: one exact color each
+    draw_lines(canvas, batched, 1, 0, palette={l.color: palette.flat(l.color) for l in batched})
+
+    draw = _IndexDraw(canvas, palette)
+    vertical = cfg.get("layout_mode", "horizontal") == "vertical"
+    for t in scene.texts:
+        f = _font(t.size, font_path) if font_path else get_font(getattr(t, "font_style", "sans"), t.size)
+        xy = (int(t.x), int(t.y))
+        if vertical:
+            draw_text_vertical(draw, xy, t.text, f, t.color, spacing=int(getattr(t, "spacing", 4)))
+        else:
+            draw_text_horizontal_spaced(draw, xy, t.text, f, t.color, spacing=int(getattr(t, "spacing", 0)))
+
+    canvas.putpalette(palette.flatten())
+    return canvas
+
+
+def _axis_line(canvas: Image.Image, palette: IndexPalette, line, fill_rect_aa):
+    """Axis-aligned solid line with coverage-antialiased edges, as _draw_axis_line_aa."""
+    half = max(1, line.width) / 2
+    if line.y1 == line.y2:
+        left, right = min(line.x1, line.x2), max(line.x1, line.x2)
+        top, bottom = line.y1 - half, line.y1 + half
+    else:
+        left, right = line.x1 - half, line.x1 + half
+        top, bottom = min(line.y1, line.y2), max(line.y1, line.y2)
+    x0, y0 = int(left) - 1, int(top) - 1
+    w, h = int(right) + 2 - x0, int(bottom) + 2 - y0
+    if w <= 0 or h <= 0:
+        return
+    coverage = Image.new("L", (w, h), 0)
+    fill_rect_aa(coverage, left - x0, top - y0, right - x0, bottom - y0, 255)
+    index, _ = palette.ramp(line.color)
+    # Ramp indices grow with coverage and sit above the background and
+    # pattern entries, so where connectors meet the stronger edge wins
+    box = (x0, y0, x0 + w, y0 + h)
+    canvas.paste(ImageChops.lighter(canvas.crop(box), coverage.point(index)), box)
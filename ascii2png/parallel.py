@@ -0,0 +1,91 @@
+import atexit
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+from PIL import Image
+from .layout import Scene
+from .spatial import SceneIndex
+
+# Pools are reused across renders; process start-up and font loading are paid once
+_pools: Dict[Tuple, Executor] = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(kind: str, workers: int, initializer: Optional[Callable[[], None]] = None) -> Executor:
+    key = (kind, workers, initializer)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            if kind == "process":
+                pool = ProcessPoolExecutor(max_workers=workers, initializer=initializer)
+            elif kind == "thread":
+                pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ascii2png-tile", initializer=initializer)
+            else:
+                raise ValueError(f"Unknown executor: {kind}")
+            _pools[key] = pool
+        return pool
+
+
+def shutdown_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _pools.clear()
+
+
+atexit.register(shutdown_pools)
+
+
+def _tile_scene(scene: Scene, texts, lines) -> Scene:
+    """Shallow copy of scene carrying only the items of one tile."""
+    tile = Scene(scene.width, scene.height, scene.bg, scene.bg_style, scene.extra_config)
+    tile.texts = list(texts)
+    tile.lines = list(lines)
+    return tile
+
+
+def _render_tile(scene: Scene, w: int, h: int, scale: float, top: int, bottom: int, y0: int, y1: int, font_path: Optional[str]):
+    from .render import _rasterize_region
+    region = _rasterize_region(scene, w, h, scale, top, bottom, scene.texts, scene.lines, font_path)
+    tile = region.crop((0, y0 - top, w, y1 - top))
+    return y0, tile.tobytes()
+
+
+def rasterize_parallel(
+    scene: Scene,
+    width: int,
+    font_path: Optional[str] = None,
+    supersample: float = 2,
+    workers: Optional[int] = None,
+    executor: str = "process",
+    tile_height: int = 512,
+    margin: int = 8,
+) -> Image.Image:
+    """
+    Rasterize the scene as horizontal tiles on a thread or process pool and
+    composite them. Tiles are drawn from the items a SceneIndex reports for
+    their rows plus an overlap margin, exactly as the banded renderer does,
+    so the result matches the serial path.
+    """
+    from .render import _check_scale
+    scale = _check_scale(supersample)
+    workers = workers or os.cpu_count() or 1
+    h = max(scene.height, 400)
+    index = SceneIndex(scene, tile_height)
+    pool = _get_pool(executor, workers)
+
+    futures = []
+    for y0 in range(0, h, tile_height):
+        y1 = min(h, y0 + tile_height)
+        top, bottom = max(0, y0 - margin), min(h, y1 + margin)
+        texts, lines = index.query(top, bottom)
+        tile = _tile_scene(scene, texts, lines)
+        futures.append(pool.submit(_render_tile, tile, width, h, scale, top, bottom, y0, y1, font_path))
+
+    out = Image.new("RGB", (width, h))
+    for future in futures:
+        y0, data = future.result()
+        rows = len(data) // (width * 3)
+        out.paste(Image.frombytes("RGB", (width, rows), data), (0, y0))
+    return out
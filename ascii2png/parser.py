@@ -1,5 +1,7 @@
 import re
-from typing import List, Optional
+from itertools import chain, islice
+from typing import Any, Iterable, Iterator, List, Optional, Tuple, Union
+from .tree import CompactTree
 
 
 class Node:
@@ -11,74 +13,167 @@ class Node:
         self.children.append(child)
 
 
-def parse(text: str) -> Node:
-    if not isinstance(text, str) or not text.strip():
-        raise ValueError("输入为空或非文本")
-    lines = [l.rstrip("\n") for l in text.splitlines() if l.strip()]
-    if not lines:
-        raise ValueError("未检测到有效内容")
-    if _has_box_drawing(lines) or _has_tree_connectors(lines):
-        return _parse_tree_style(lines)
-    return _parse_indent_style(lines)
+class _NodeBuilder:
+    """Builds a parser.Node tree; handles are Node objects."""
+
+    def __init__(self, root_label: str):
+        self.top = Node(root_label)
+
+    def add(self, parent: Node, label: str) -> Node:
+        node = Node(label)
+        parent.add_child(node)
+        return node
+
+    def set_root_label(self, label: str):
+        self.top.label = label.strip()
+
+    def has_children(self) -> bool:
+        return bool(self.top.children)
+
+    def result(self) -> Node:
+        return self.top
+
+
+class _CompactBuilder:
+    """Builds a CompactTree; handles are node indices."""
+
+    def __init__(self, root_label: str):
+        self.tree = CompactTree(root_label)
+        self.top = 0
+
+    def add(self, parent: int, label: str) -> int:
+        return self.tree.add(parent, label)
+
+    def set_root_label(self, label: str):
+        self.tree.set_label(0, label)
+
+    def has_children(self) -> bool:
+        return self.tree.first_child[0] >= 0
 
+    def result(self) -> CompactTree:
+        return self.tree.freeze()
 
-def _has_box_drawing(lines: List[str]) -> bool:
-    return any(re.search(r"[├└│─┴┬┼]+", l) for l in lines)
 
+# Number of leading lines used to pick the dialect (tree connectors vs indentation)
+_LOOKAHEAD = 64
 
-def _has_tree_connectors(lines: List[str]) -> bool:
-    return any(("├" in l or "└" in l or "│" in l or "──" in l) for l in lines) or any(
-        re.search(r"^\s*[\|\+\-]+", l) for l in lines
-    )
+_BOX_CHARS = frozenset("├└│─┴┬┼")
+_CONNECTORS = ("├──", "└──", "|-", "+-", "-", "+")
+_CONNECTOR_ONLY = re.compile(r"^[\|\-\+\s│├└─]+$")
+_LEADING_CONNECTORS = re.compile(r"^[\|\-\+\s│├└─]+")
 
 
-def _parse_tree_style(lines: List[str]) -> Node:
-    root_label = _extract_root_label(lines)
-    root = Node(root_label)
-    stack: List[tuple[int, Node]] = [(0, root)]
+def parse(source: Union[str, Iterable[str]], compact: bool = False) -> Union[Node, CompactTree]:
+    """
+    Parse an ASCII tree from a string, an iterable of lines or a text file
+    object. Input is consumed in a single streaming pass; the dialect is
+    decided from the first lines. With compact=True the result is an
+    array-backed CompactTree (use .root for a Node-compatible view).
+    """
+    if isinstance(source, str):
+        if not source.strip():
+            raise ValueError("输入为空或非文本")
+    elif isinstance(source, (bytes, bytearray)) or not hasattr(source, "__iter__"):
+        raise ValueError("输入为空或非文本")
+    lines = _iter_lines(source)
+    head = list(islice(lines, _LOOKAHEAD))
+    if not head:
+        raise ValueError("未检测到有效内容")
+    builder = _CompactBuilder if compact else _NodeBuilder
+    stream = chain(head, lines)
+    if any(_is_tree_line(l) for l in head):
+        return _parse_tree_style(stream, builder)
+    return _parse_indent_style(stream, builder)
+
+
+def _iter_lines(source: Union[str, Iterable[str]]) -> Iterator[str]:
+    """Yield the non-blank lines of source, split the way str.splitlines does."""
+    chunks = (source,) if isinstance(source, str) else source
+    for chunk in chunks:
+        for line in chunk.splitlines():
+            if line.strip():
+                yield line
+
+
+def _is_tree_line(line: str) -> bool:
+    # Box drawing characters, or a line starting with |, + or -
+    return not _BOX_CHARS.isdisjoint(line) or line.lstrip()[:1] in ("|", "+", "-")
+
+
+def _tokenize(line: str) -> Tuple[int, str]:
+    """
+    Split a tree-style line into (depth, content) in one linear scan.
+    Indentation is leading whitespace followed by any number of '│   ' or
+    four-whitespace groups, then an optional connector.
+    """
+    n = len(line)
+    i = n - len(line.lstrip())
+    while i < n:
+        if line[i] == "│" and i + 4 <= n and line[i + 1:i + 4].isspace():
+            i += 4
+        elif i + 4 <= n and line[i:i + 4].isspace():
+            i += 4
+        else:
+            break
+    depth = _depth_from_indent(line[:i])
+    for conn in _CONNECTORS:
+        if line.startswith(conn, i):
+            i += len(conn)
+            break
+    return depth, line[i:].lstrip()
+
+
+def _parse_tree_style(lines: Iterable[str], builder=_NodeBuilder) -> Any:
+    tree = builder("")
+    root = tree.top
+    stack: List[tuple[int, Any]] = [(0, root)]
+    root_label: Optional[str] = None
+    first_line: Optional[str] = None
+    # Lines are kept only until the first child exists, for the indent fallback
+    pending: Optional[List[str]] = []
+    count = 0
     for line in lines:
-        m = re.match(r"^(\s*(?:│\s{3}|\s{4})*)(├──|└──|\|\-|\+\-|\-|\+)?\s*(.*)$", line)
-        if not m:
-            continue
-        indent_str, _, content = m.groups()
+        count += 1
+        if first_line is None:
+            first_line = line
+        if root_label is None:
+            s = line.strip()
+            if s and not _CONNECTOR_ONLY.match(s):
+                root_label = _clean_line(s)
+        if pending is not None:
+            pending.append(line)
+        depth, content = _tokenize(line)
         if not content.strip():
             continue
-        depth = _depth_from_indent(indent_str)
-        node = Node(content)
         while stack and stack[-1][0] >= depth:
             stack.pop()
         parent = stack[-1][1] if stack else root
-        parent.add_child(node)
+        node = tree.add(parent, content)
         stack.append((depth, node))
-    if not root.children and len(lines) > 1:
-        return _parse_indent_style(lines)
-    return root
-
-
-def _parse_indent_style(lines: List[str]) -> Node:
-    root = Node(_clean_line(lines[0]))
-    stack: List[tuple[int, Node]] = [(0, root)]
-    for line in lines[1:]:
+        pending = None
+    if not tree.has_children() and count > 1:
+        return _parse_indent_style(pending, builder)
+    tree.set_root_label(root_label if root_label is not None else _clean_line(first_line or ""))
+    return tree.result()
+
+
+def _parse_indent_style(lines: Iterable[str], builder=_NodeBuilder) -> Any:
+    lines = iter(lines)
+    tree = builder(_clean_line(next(lines)))
+    root = tree.top
+    stack: List[tuple[int, Any]] = [(0, root)]
+    for line in lines:
         if not line.strip():
             continue
         indent = len(line) - len(line.lstrip(" "))
         content = _clean_line(line)
         depth = indent // 2 if indent >= 2 else (1 if indent > 0 else 0)
-        node = Node(content)
         while stack and stack[-1][0] >= depth:
             stack.pop()
         parent = stack[-1][1] if stack else root
-        parent.add_child(node)
+        node = tree.add(parent, content)
         stack.append((depth, node))
-    return root
-
-
-def _extract_root_label(lines: List[str]) -> str:
-    for l in lines:
-        s = l.strip()
-        if s and not re.match(r"^[\|\-\+\s│├└─]+$", s):
-            return _clean_line(s)
-    return _clean_line(lines[0])
+    return tree.result()
 
 
 def _depth_from_indent(indent_str: str) -> int:
@@ -99,5 +194,5 @@ def _depth_from_indent(indent_str: str) -> int:
 
 
 def _clean_line(line: str) -> str:
-    s = re.sub(r"^[\|\-\+\s│├└─]+", "", line)
+    s = _LEADING_CONNECTORS.sub("", line)
     return s.strip()
@@ -0,0 +1,148 @@
+import struct
+import zlib
+from PIL import Image, ImageChops
+
+_COLOR_TYPES = {"L": (0, 1), "RGB": (2, 3), "RGBA": (6, 4)}
+
+
+def _chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+
+class PNGStreamWriter:
+    """
+    Incremental PNG encoder. Rows are appended in strips with write_rows()
+    and compressed as they arrive, so the full image never has to exist
+    in memory. Every row uses the PNG "Up" filter, computed per strip
+    with ImageChops.
+    """
+
+    def __init__(self, fileobj, width: int, height: int, mode: str = "RGB", compress_level: int = 6):
+        if mode not in _COLOR_TYPES:
+            raise ValueError(f"Unsupported mode for streaming PNG: {mode}")
+        self.fileobj = fileobj
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.rows_written = 0
+        color_type, self._bpp = _COLOR_TYPES[mode]
+        self._compressor = zlib.compressobj(compress_level)
+        self._prev = Image.new(mode, (width, 1), 0)
+        self._pending = []
+        self._pending_size = 0
+        fileobj.write(b"\x89PNG\r\n\x1a\n")
+        fileobj.write(_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)))
+
+    def write_rows(self, img: Image.Image):
+        if img.mode != self.mode or img.width != self.width:
+            raise ValueError("Strip does not match the image mode/width")
+        h = img.height
+        if self.rows_written + h > self.height:
+            raise ValueError("More rows than declared height")
+        # Up filter: each row minus the row above it, modulo 256
+        above = Image.new(self.mode, (self.width, h))
+        above.paste(self._prev, (0, 0))
+        if h > 1:
+            above.paste(img.crop((0, 0, self.width, h - 1)), (0, 1))
+        data = ImageChops.subtract_modulo(img, above).tobytes()
+        stride = self.width * self._bpp
+        raw = b"".join(b"\x02" + data[i:i + stride] for i in range(0, len(data), stride))
+        self._emit(self._compressor.compress(raw))
+        self._prev = img.crop((0, h - 1, self.width, h))
+        self.rows_written += h
+
+    def close(self):
+        if self.rows_written != self.height:
+            raise ValueError(f"Wrote {self.rows_written} of {self.height} rows")
+        self._emit(self._compressor.flush(), final=True)
+        self.fileobj.write(_chunk(b"IEND", b""))
+
+    def _emit(self, data: bytes, final: bool = False):
+        if data:
+            self._pending.append(data)
+            self._pending_size += len(data)
+        # Batch compressor output into IDAT chunks of at least 64 KB
+        if self._pending and (final or self._pending_size >= 65536):
+            self.fileobj.write(_chunk(b"IDAT", b"".join(self._pending)))
+            self._pending = []
+            self._pending_size = 0
+
+
+_ADLER_MOD = 65521
+
+
+def adler32_combine(adler1: int, adler2: int, len2: int) -> int:
+    """Adler-32 of A + B from adler32(A), adler32(B) and len(B) (as zlib's adler32_combine)."""
+    rem = len2 % _ADLER_MOD
+    sum1 = adler1 & 0xFFFF
+    sum2 = (rem * sum1) % _ADLER_MOD
+    sum1 += (adler2 & 0xFFFF) + _ADLER_MOD - 1
+    sum2 += ((adler1 >> 16) & 0xFFFF) + ((adler2 >> 16) & 0xFFFF) + _ADLER_MOD - rem
+    if sum1 >= _ADLER_MOD:
+        sum1 -= _ADLER_MOD
+    if sum1 >= _ADLER_MOD:
+        sum1 -= _ADLER_MOD
+    if sum2 >= _ADLER_MOD << 1:
+        sum2 -= _ADLER_MOD << 1
+    if sum2 >= _ADLER_MOD:
+        sum2 -= _ADLER_MOD
+    return sum1 | (sum2 << 16)
+
+
+class EncodedBand:
+    """
+    One horizontal strip of a PNG, compressed independently of its
+    neighbours so it can be re-encoded alone and spliced back in.
+    """
+
+    __slots__ = ("chunk", "adler", "raw_len", "rows")
+
+    def __init__(self, chunk: bytes, adler: int, raw_len: int, rows: int):
+        self.chunk = chunk
+        self.adler = adler
+        self.raw_len = raw_len
+        self.rows = rows
+
+
+def encode_band(img: Image.Image, compress_level: int = 6) -> EncodedBand:
+    """
+    Filter and deflate a strip. The first row uses filter None so the strip
+    does not depend on the row above it; the rest use Up. The deflate data
+    ends on a sync flush, so strips concatenate into one valid stream.
+    """
+    mode = img.mode
+    if mode not in _COLOR_TYPES:
+        raise ValueError(f"Unsupported mode for streaming PNG: {mode}")
+    w, h = img.size
+    above = Image.new(mode, (w, h))
+    if h > 1:
+        above.paste(img.crop((0, 0, w, h - 1)), (0, 1))
+    data = ImageChops.subtract_modulo(img, above).tobytes()
+    stride = w * _COLOR_TYPES[mode][1]
+    raw = b"".join((b"\x00" if i == 0 else b"\x02") + data[i:i + stride] for i in range(0, len(data), stride))
+    compressor = zlib.compressobj(compress_level, zlib.DEFLATED, -15)
+    body = compressor.compress(raw) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    return EncodedBand(_chunk(b"IDAT", body), zlib.adler32(raw), len(raw), h)
+
+
+def assemble_png(width: int, height: int, mode: str, bands) -> bytes:
+    """Join EncodedBands (top to bottom, covering every row) into a PNG."""
+    color_type = _COLOR_TYPES[mode][0]
+    adler = 1
+    rows = 0
+    for band in bands:
+        adler = adler32_combine(adler, band.adler, band.raw_len)
+        rows += band.rows
+    if rows != height:
+        raise ValueError(f"Bands cover {rows} of {height} rows")
+    # zlib header, the band chunks, then a final empty block and the checksum
+    tail = b"\x03\x00" + struct.pack(">I", adler)
+    parts = [
+        b"\x89PNG\r\n\x1a\n",
+        _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)),
+        _chunk(b"IDAT", b"\x78\x9c"),
+    ]
+    parts.extend(band.chunk for band in bands)
+    parts.append(_chunk(b"IDAT", tail))
+    parts.append(_chunk(b"IEND", b""))
+    return b"".join(parts)
@@ -0,0 +1,185 @@
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from .core import CoreService
+from .layout import Scene
+from .pngstream import EncodedBand, assemble_png, encode_band
+from .render import DEFAULT_SUPERSAMPLE, _check_scale, _rasterize_region
+from .spatial import SceneIndex, line_extent, text_extent
+from .workers import RenderTimeout
+
+# Backgrounds whose pixels depend on the canvas height
+_HEIGHT_DEPENDENT_BG = ("gradient_green", "circle")
+
+
+def _text_sig(t) -> Tuple:
+    return ("t", t.text, t.x, t.y, t.size, t.color, getattr(t, "font_style", "sans"), getattr(t, "spacing", 0))
+
+
+def _line_sig(l) -> Tuple:
+    return ("l", l.x1, l.y1, l.x2, l.y2, l.width, l.color, getattr(l, "style", "solid"))
+
+
+class PreviewSession:
+    """
+    Live preview of one diagram under fixed render options.
+
+    The last scene and the last image, kept as independently compressed
+    row bands, are cached. update() lays out the new text, diffs its items
+    against the previous scene and re-rasterizes and re-encodes only the
+    bands the changed items touch; untouched bands are spliced into the
+    new PNG as they are.
+    """
+
+    def __init__(
+        self,
+        width: int = 1080,
+        theme: str = "wechat",
+        font_size: int = 24,
+        custom_colors: Optional[Dict[str, Any]] = None,
+        layout_options: Optional[Dict[str, Any]] = None,
+        font_path: Optional[str] = None,
+        supersample: float = DEFAULT_SUPERSAMPLE,
+        band_height: int = 64,
+        margin: int = 8,
+        compress_level: int = 1,
+    ):
+        self.width = width
+        self.scene_options = {
+            "width": width,
+            "theme": theme,
+            "font_size": font_size,
+            "custom_colors": custom_colors,
+            "layout_options": layout_options,
+        }
+        self.font_path = font_path
+        self.scale = _check_scale(supersample)
+        self.band_height = band_height
+        self.margin = margin
+        self.compress_level = compress_level
+        self.text: Optional[str] = None
+        self.png: Optional[bytes] = None
+        self.last_used = time.time()
+        # Rows repainted by the last update, for diagnostics
+        self.repainted_rows = 0
+        self.lock = threading.Lock()
+        self._scene: Optional[Scene] = None
+        self._height = 0
+        self._bands: List[EncodedBand] = []
+
+    def update(self, text: str, deadline: Optional[float] = None) -> bytes:
+        """
+        Render text, reusing every band the edit did not touch. Past the
+        deadline (a time.time() value) the update stops between bands with
+        RenderTimeout and the session keeps its previous image.
+        """
+        self.last_used = time.time()
+        if text == self.text and self.png is not None:
+            self.repainted_rows = 0
+            return self.png
+        scene = CoreService.build_scene(text, **self.scene_options)
+        h = max(scene.height, 400)
+        dirty = self._dirty_bands(scene, h)
+
+        index = SceneIndex(scene, self.band_height)
+        bands = []
+        repainted = 0
+        bh = self.band_height
+        for i, y0 in enumerate(range(0, h, bh)):
+            y1 = min(h, y0 + bh)
+            old = self._bands[i] if i < len(self._bands) else None
+            if old is not None and i not in dirty and old.rows == y1 - y0:
+                bands.append(old)
+                continue
+            if deadline is not None and time.time() > deadline:
+                raise RenderTimeout("Preview timed out")
+            top, bottom = max(0, y0 - self.margin), min(h, y1 + self.margin)
+            texts, lines = index.query(top, bottom)
+            region = _rasterize_region(scene, self.width, h, self.scale, top, bottom, texts, lines, self.font_path)
+            bands.append(encode_band(region.crop((0, y0 - top, self.width, y1 - top)), self.compress_level))
+            repainted += y1 - y0
+
+        self.png = assemble_png(self.width, h, "RGB", bands)
+        self.text = text
+        self._scene = scene
+        self._height = h
+        self._bands = bands
+        self.repainted_rows = repainted
+        return self.png
+
+    def _dirty_bands(self, scene: Scene, h: int) -> set:
+        """Band indices whose pixels may differ from the cached image."""
+        n = (h + self.band_height - 1) // self.band_height
+        old = self._scene
+        if old is None or (h != self._height and scene.bg_style in _HEIGHT_DEPENDENT_BG):
+            return set(range(n))
+
+        vertical = scene.extra_config.get("layout_mode", "horizontal") == "vertical"
+        spans = []
+        for items, other, sig, extent in (
+            (old.texts, scene.texts, _text_sig, lambda t: text_extent(t, vertical)),
+            (old.lines, scene.lines, _line_sig, line_extent),
+        ):
+            before = Counter(sig(x) for x in items)
+            after = Counter(sig(x) for x in other)
+            removed = before - after
+            added = after - before
+            for x in items:
+                if removed.get(sig(x)):
+                    spans.append(extent(x))
+            for x in other:
+                if added.get(sig(x)):
+                    spans.append(extent(x))
+        if h != self._height:
+            # Rows around the old bottom edge and everything past it
+            spans.append((min(h, self._height) - self.margin, max(h, self._height)))
+
+        dirty = set()
+        bh = self.band_height
+        for top, bottom in spans:
+            # Resampling spreads an item over a few rows beyond its extent
+            first = max(0, int(top) - self.margin) // bh
+            last = min(n - 1, (int(bottom) + self.margin + 1) // bh)
+            dirty.update(range(first, last + 1))
+        return dirty
+
+
+class PreviewSessions:
+    """
+    Bounded LRU of PreviewSessions keyed by an opaque session id; idle
+    sessions expire after ttl seconds.
+    """
+
+    def __init__(self, max_sessions: int = 64, ttl: float = 900):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, Tuple[Tuple, PreviewSession]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: Optional[str], **options: Any) -> Tuple[str, PreviewSession]:
+        """
+        The session for session_id if it exists and was created with the
+        same options, otherwise a fresh one under a new id.
+        """
+        key = tuple(sorted((k, repr(v)) for k, v in options.items()))
+        now = time.time()
+        with self._lock:
+            for sid in [s for s, (_, sess) in self._sessions.items() if now - sess.last_used > self.ttl]:
+                del self._sessions[sid]
+            entry = self._sessions.get(session_id) if session_id else None
+            if entry is not None and entry[0] == key:
+                self._sessions.move_to_end(session_id)
+                return session_id, entry[1]
+            if entry is not None:
+                del self._sessions[session_id]
+            session_id = uuid.uuid4().hex
+            session = PreviewSession(**options)
+            self._sessions[session_id] = (key, session)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return session_id, session
+
+    def __len__(self) -> int:
+        return len(self._sessions)
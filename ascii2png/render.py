@@ -7,10 +7,49 @@ from typing import Tuple
 from PIL import Image, ImageDraw, ImageFont
 from .layout import Scene
 from .fonts import get_font, get_title_font, get_body_font
+from .store import atomic_write, atomic_write_bytes
+from .encoder import encode_png, get_profile, DEFAULT_MAX_BYTES
+from .pngstream import PNGStreamWriter
+from .spatial import SceneIndex
+from .parallel import rasterize_parallel
+from .background import draw_background
+from .glyphs import get_atlas
+from .lines import draw_lines, wave_offsets
+from .palette import palette_supported, render_palette
 
-def draw_line_styled(draw, start, end, style="solid", width=2, color="black"):
+# Drawing scale before downsampling; 2x keeps text and diagonals smooth
+DEFAULT_SUPERSAMPLE = 2
+
+class _ShiftedDraw:
+    """
+    Proxy that translates coordinates by -origin at draw time, so geometry
+    is computed in absolute coordinates and a band matches the full canvas.
+    """
+
+    def __init__(self, draw, origin):
+        self._draw = draw
+        self._ox, self._oy = origin
+
+    def _shift(self, xy):
+        ox, oy = self._ox, self._oy
+        if xy and isinstance(xy[0], (tuple, list)):
+            return [(x - ox, y - oy) for x, y in xy]
+        return [v - (ox if i % 2 == 0 else oy) for i, v in enumerate(xy)]
+
+    def line(self, xy, **kwargs):
+        self._draw.line(self._shift(xy), **kwargs)
+
+    def ellipse(self, xy, **kwargs):
+        self._draw.ellipse(self._shift(xy), **kwargs)
+
+    def arc(self, xy, start, end, **kwargs):
+        self._draw.arc(self._shift(xy), start, end, **kwargs)
+
+def draw_line_styled(draw, start, end, style="solid", width=2, color="black", origin=(0, 0)):
     x1, y1 = start
     x2, y2 = end
+    if origin != (0, 0):
+        draw = _ShiftedDraw(draw, origin)
     
     if style == "solid":
         draw.line([start, end], fill=color, width=width)
@@ -35,12 +74,14 @@ def draw_line_styled(draw, start, end, style="solid", width=2, color="black"):
         gap_len = width * 2
         total_cycle = dash_len + gap_len
         
+        # Unit direction keeps dash ends exact on axis-aligned lines,
+        # so the pattern is the same wherever the line starts
+        ux, uy = dx / length, dy / length
         current = 0
         while current < length:
-            t1 = current / length
-            t2 = min(current + dash_len, length) / length
-            p1 = (x1 + dx * t1, y1 + dy * t1)
-            p2 = (x1 + dx * t2, y1 + dy * t2)
+            end = min(current + dash_len, length)
+            p1 = (x1 + ux * current, y1 + uy * current)
+            p2 = (x1 + ux * end, y1 + uy * end)
             draw.line([p1, p2], fill=color, width=width)
             current += total_cycle
     elif style == "wave":
@@ -49,17 +90,9 @@ def draw_line_styled(draw, start, end, style="solid", width=2, color="black"):
         length = math.hypot(dx, dy)
         angle = math.atan2(dy, dx)
         steps = int(length / 2)
-        amplitude = width * 2
-        frequency = 0.3
-        points = []
-        for i in range(steps):
-            dist = i * 2
-            offset = math.sin(dist * frequency) * amplitude
-            ox = -math.sin(angle) * offset
-            oy = math.cos(angle) * offset
-            px = x1 + math.cos(angle) * dist + ox
-            py = y1 + math.sin(angle) * dist + oy
-            points.append((px, py))
+        c, s = math.cos(angle), math.sin(angle)
+        points = [(x1 + c * dist - s * offset, y1 + s * dist + c * offset)
+                  for dist, offset in wave_offsets(width, steps)]
         if len(points) > 1:
             draw.line(points, fill=color, width=width)
     elif style == "cloud":
@@ -85,15 +118,15 @@ def draw_line_styled(draw, start, end, style="solid", width=2, color="black"):
 def draw_text_vertical(draw, xy, text, font, fill, spacing=4):
     x, y = xy
     current_y = y
+    atlas = get_atlas()
     for char in text:
-        bbox = font.getbbox(char)
+        bbox, _ = atlas.metrics(font, char)
         # bbox: left, top, right, bottom relative to anchor
         # width = right - left
         w = bbox[2] - bbox[0]
-        h = bbox[3] - bbox[1]
         
         # Draw centered horizontally at x
-        draw.text((x - w/2, current_y), char, font=font, fill=fill)
+        atlas.draw(draw, (x - w/2, current_y), char, font, fill)
         current_y += font.size + spacing
 
 def draw_text_horizontal_spaced(draw, xy, text, font, fill, spacing=0):
@@ -102,27 +135,81 @@ def draw_text_horizontal_spaced(draw, xy, text, font, fill, spacing=0):
         return
     x, y = xy
     current_x = x
+    atlas = get_atlas()
     for char in text:
-        draw.text((current_x, y), char, font=font, fill=fill)
-        w = font.getlength(char)
+        atlas.draw(draw, (current_x, y), char, font, fill)
+        _, w = atlas.metrics(font, char)
         current_x += w + spacing
 
 def _font(font_size: int, font_path: str = None) -> ImageFont.FreeTypeFont:
     # Legacy wrapper for backward compatibility
-    if font_path:
-        try:
-            return ImageFont.truetype(font_path, font_size)
-        except:
-            pass
-    return get_font("sans", font_size)
+    return get_font("sans", font_size, font_path)
 
-def render_scene(scene: Scene, width: int, text_for_summary: str, output_dir: str, font_path: str = None) -> str:
-    scale = 2.0
-    w = width
+def render_scene(scene: Scene, width: int, text_for_summary: str, output_dir: str, font_path: str = None, filename: str = None, max_bytes: int = DEFAULT_MAX_BYTES, supersample: float = DEFAULT_SUPERSAMPLE, banded: bool = False, workers: int = None, profile: str = "png") -> str:
+    """
+    Render the scene to a file in output_dir. banded streaming applies to
+    the default "png" profile only; other profiles encode in memory.
+    """
+    path = _output_path(text_for_summary, output_dir, filename, get_profile(profile).ext)
+    if banded and profile == "png":
+        return _render_banded_file(scene, width, path, font_path, max_bytes, supersample)
+    data = render_scene_to_bytes(scene, width, font_path, max_bytes, supersample, workers, profile)
+    return atomic_write_bytes(path, data)
+
+def _render_banded_file(scene: Scene, width: int, path: str, font_path: str, max_bytes: int, supersample: float) -> str:
+    def write(tmp: str):
+        with open(tmp, "wb") as f:
+            render_scene_banded(scene, width, f, font_path, supersample)
+        if max_bytes and os.path.getsize(tmp) > max_bytes:
+            # Over budget: fall back to the in-memory size-targeted encoder
+            with Image.open(tmp) as img:
+                data = encode_png(img.convert("RGB"), max_bytes)
+            with open(tmp, "wb") as f:
+                f.write(data)
+    return atomic_write(path, write)
+
+def render_scene_to_bytes(scene: Scene, width: int, font_path: str = None, max_bytes: int = DEFAULT_MAX_BYTES, supersample: float = DEFAULT_SUPERSAMPLE, workers: int = None, profile: str = "png") -> bytes:
+    """
+    Render the scene and return the encoded image without touching disk.
+    profile names an encoder profile (see encoder.PROFILES).
+    max_bytes is the output size budget (None disables it).
+    supersample is the drawing scale before downsampling; 1 draws at native
+    resolution and relies on FreeType and edge-coverage antialiasing.
+    workers > 1 rasterizes tiles in parallel on a process pool.
+    The "png-palette" profile at supersample=1 draws flat-color scenes
+    straight into a palette image (see palette.render_palette).
+    """
+    if profile == "png-palette" and _check_scale(supersample) == 1 and palette_supported(scene):
+        img = render_palette(scene, width, font_path)
+    elif workers and workers > 1:
+        img = rasterize_parallel(scene, width, font_path, supersample, workers)
+    else:
+        img = _rasterize(scene, width, font_path, supersample)
+    return get_profile(profile).encode(img, max_bytes)
+
+def _rasterize(scene: Scene, width: int, font_path: str = None, supersample: float = DEFAULT_SUPERSAMPLE) -> Image.Image:
+    scale = _check_scale(supersample)
     h = max(scene.height, 400)
+    return _rasterize_region(scene, width, h, scale, 0, h, scene.texts, scene.lines, font_path)
+
+def _check_scale(supersample: float) -> float:
+    scale = float(supersample)
+    if scale < 1:
+        raise ValueError("supersample must be >= 1")
+    return scale
+
+def _rasterize_region(scene: Scene, w: int, h: int, scale: float, top: int, bottom: int, texts, lines, font_path: str = None) -> Image.Image:
+    """
+    Rasterize output rows [top, bottom) of a w x h image.
+    Only the given texts/lines are drawn, translated so the region lines up
+    with the full-size supersampled canvas.
+    """
     W = int(w * scale)
     H = int(h * scale)
-    img = Image.new("RGB", (W, H), scene.bg)
+    # Supersampled rows covering the region, in full-canvas coordinates
+    oy = int(math.floor(top * H / h))
+    Hr = min(H, int(math.ceil(bottom * H / h))) - oy
+    img = Image.new("RGB", (W, Hr), scene.bg)
     draw = ImageDraw.Draw(img)
     
     # Check layout mode
@@ -131,60 +218,21 @@ def render_scene(scene: Scene, width: int, text_for_summary: str, output_dir: st
     
     # --- Background Decoration ---
     if hasattr(scene, "bg_style"):
-        style = scene.bg_style
-        
-        if style == "grid":
-            grid_color = cfg.get("grid_color", (220, 220, 220))
-            step = int(40 * scale)
-            for x in range(0, W, step):
-                draw.line([(x, 0), (x, H)], fill=grid_color, width=1)
-            for y in range(0, H, step):
-                draw.line([(0, y), (W, y)], fill=grid_color, width=1)
-                
-        elif style == "dots":
-            dot_color = cfg.get("dot_color", (200, 200, 200))
-            step = int(30 * scale)
-            radius = int(2 * scale)
-            for x in range(step // 2, W, step):
-                for y in range(step // 2, H, step):
-                    draw.ellipse([(x-radius, y-radius), (x+radius, y+radius)], fill=dot_color)
-                    
-        elif style == "circle":
-            colors = cfg.get("circle_colors", [(240, 240, 240)])
-            import random
-            rng = random.Random(42)
-            for _ in range(5):
-                cx = rng.randint(0, W)
-                cy = rng.randint(0, H)
-                r = rng.randint(int(100 * scale), int(400 * scale))
-                c = colors[rng.randint(0, len(colors)-1)]
-                draw.ellipse([(cx-r, cy-r), (cx+r, cy+r)], fill=c)
-        
-        elif style == "gradient_green":
-            top_c = (240, 253, 244)
-            bot_c = (220, 252, 231)
-            for y in range(H):
-                ratio = y / H
-                r = int(top_c[0] + (bot_c[0] - top_c[0]) * ratio)
-                g = int(top_c[1] + (bot_c[1] - top_c[1]) * ratio)
-                b = int(top_c[2] + (bot_c[2] - top_c[2]) * ratio)
-                draw.line([(0, y), (W, y)], fill=(r, g, b), width=1)
+        draw_background(img, scene.bg_style, cfg, scene.bg, W, H, oy, scale)
     # --- End Background ---
 
     # Draw Lines
-    for line in scene.lines:
+    batched = []
+    for line in lines:
         style = getattr(line, "style", "solid")
-        draw_line_styled(
-            draw,
-            (line.x1 * scale, line.y1 * scale),
-            (line.x2 * scale, line.y2 * scale),
-            style=style,
-            width=max(1, int(line.width * scale)),
-            color=line.color
-        )
+        if scale == 1 and style == "solid" and (line.x1 == line.x2 or line.y1 == line.y2):
+            _draw_axis_line_aa(img, line.x1, line.y1 - oy, line.x2, line.y2 - oy, max(1, line.width), line.color)
+            continue
+        batched.append(line)
+    draw_lines(img, batched, scale, oy)
 
     # Draw Texts
-    for t in scene.texts:
+    for t in texts:
         size = int(t.size * scale)
         if font_path:
             f = _font(size, font_path)
@@ -192,7 +240,7 @@ def render_scene(scene: Scene, width: int, text_for_summary: str, output_dir: st
             font_style = getattr(t, "font_style", "sans")
             f = get_font(font_style, size)
             
-        xy = (int(t.x * scale), int(t.y * scale))
+        xy = (int(t.x * scale), int(t.y * scale) - oy)
         
         if layout_mode == "vertical":
             s = int(getattr(t, "spacing", 4) * scale)
@@ -201,61 +249,92 @@ def render_scene(scene: Scene, width: int, text_for_summary: str, output_dir: st
             s = int(getattr(t, "spacing", 0) * scale)
             draw_text_horizontal_spaced(draw, xy, t.text, f, t.color, spacing=s)
 
-    out = img.resize((w, H // int(scale)), resample=Image.LANCZOS)
-    path = _save_png(out, text_for_summary, output_dir)
-    
-    if os.path.getsize(path) > 1_000_000:
-        path = _shrink_png(out, text_for_summary, output_dir)
-    return path
+    if scale == 1:
+        return img
+    if scale.is_integer():
+        # Integer factors: box-filter reduce is much cheaper than LANCZOS
+        return img.reduce(int(scale))
+    # Sample the same source rows the full-canvas resize would use
+    box = (0, top * H / h - oy, W, bottom * H / h - oy)
+    return img.resize((w, bottom - top), resample=Image.LANCZOS, box=box)
 
-def _save_png(img: Image.Image, text: str, output_dir: str) -> str:
-    os.makedirs(output_dir, exist_ok=True)
-    ts = time.strftime("%Y%m%d_%H%M%S")
-    summary = _summary(text)
-    name = f"{ts}_{summary}.png"
-    path = os.path.join(output_dir, name)
-    img.save(path, format="PNG", optimize=True, compress_level=9)
-    return path
+def render_scene_banded(scene: Scene, width: int, fileobj, font_path: str = None, supersample: float = DEFAULT_SUPERSAMPLE, band_height: int = 256, margin: int = 8):
+    """
+    Render the scene strip by strip into a streaming PNG written to fileobj.
 
-def _shrink_png(img: Image.Image, text: str, output_dir: str) -> str:
-    target = 1_000_000
-    os.makedirs(output_dir, exist_ok=True)
+    Each band is drawn from only the items that intersect it (plus an
+    overlap margin for resampling), so peak memory is bounded by the band
+    height rather than the diagram length.
+    """
+    scale = _check_scale(supersample)
+    h = max(scene.height, 400)
+    index = SceneIndex(scene, band_height)
+    writer = PNGStreamWriter(fileobj, width, h, "RGB")
+    for y0 in range(0, h, band_height):
+        y1 = min(h, y0 + band_height)
+        top, bottom = max(0, y0 - margin), min(h, y1 + margin)
+        texts, lines = index.query(top, bottom)
+        region = _rasterize_region(scene, width, h, scale, top, bottom, texts, lines, font_path)
+        writer.write_rows(region.crop((0, y0 - top, width, y1 - top)))
+    writer.close()
+
+def _draw_axis_line_aa(img: Image.Image, x1: float, y1: float, x2: float, y2: float, width: float, color):
+    """
+    Draw an axis-aligned line at native resolution as a filled rectangle,
+    blending partially covered edge pixels by their coverage.
+    """
+    half = width / 2
+    if y1 == y2:
+        left, right = min(x1, x2), max(x1, x2)
+        top, bottom = y1 - half, y1 + half
+    else:
+        left, right = x1 - half, x1 + half
+        top, bottom = min(y1, y2), max(y1, y2)
+    _fill_rect_aa(img, left, top, right, bottom, color)
+
+def _fill_rect_aa(img: Image.Image, left: float, top: float, right: float, bottom: float, color):
+    """Fill a fractional rectangle; each pixel gets its covered area as alpha."""
+    x0, x1 = int(math.floor(left)), int(math.ceil(right))
+    y0, y1 = int(math.floor(top)), int(math.ceil(bottom))
+    if x1 <= x0 or y1 <= y0:
+        return
+    # Coverage of the first/last column and row
+    cols = [(x0, min(x0 + 1, right) - left)]
+    if x1 - x0 > 1:
+        cols.append((x1 - 1, right - (x1 - 1)))
+    rows = [(y0, min(y0 + 1, bottom) - top)]
+    if y1 - y0 > 1:
+        rows.append((y1 - 1, bottom - (y1 - 1)))
+    # Fully covered interior
+    ix0, ix1 = x0 + (cols[0][1] < 1), x1 - (len(cols) > 1 and cols[-1][1] < 1)
+    iy0, iy1 = y0 + (rows[0][1] < 1), y1 - (len(rows) > 1 and rows[-1][1] < 1)
+    if ix1 > ix0 and iy1 > iy0:
+        img.paste(color, (ix0, iy0, ix1, iy1))
+    # Partially covered edge strips
+    for cx, cov in cols:
+        if cov < 1:
+            _blend_box(img, (cx, iy0, cx + 1, iy1), color, cov)
+    for ry, cov in rows:
+        if cov < 1:
+            _blend_box(img, (ix0, ry, ix1, ry + 1), color, cov)
+    for cx, ccov in cols:
+        for ry, rcov in rows:
+            if ccov < 1 and rcov < 1:
+                _blend_box(img, (cx, ry, cx + 1, ry + 1), color, ccov * rcov)
+
+def _blend_box(img: Image.Image, box, color, coverage: float):
+    w, h = box[2] - box[0], box[3] - box[1]
+    alpha = int(round(coverage * 255))
+    if w <= 0 or h <= 0 or alpha <= 0:
+        return
+    img.paste(color, box, Image.new("L", (w, h), alpha))
+
+def _output_path(text: str, output_dir: str, filename: str = None, ext: str = ".png") -> str:
+    if filename:
+        return os.path.join(output_dir, filename)
     ts = time.strftime("%Y%m%d_%H%M%S")
     summary = _summary(text)
-    base = f"{ts}_{summary}"
-    attempt = 0
-    current = img
-    while attempt < 5:
-        palette = current.convert("P", palette=Image.ADAPTIVE, colors=max(32, 256 // (attempt + 1)))
-        path = os.path.join(output_dir, f"{base}_opt{attempt}.png")
-        palette.save(path, format="PNG", optimize=True, compress_level=9)
-        if os.path.getsize(path) <= target:
-            # Clean up other attempts if any
-            _cleanup_attempts(output_dir, base, attempt)
-            return path
-        
-        # Failed this attempt, remove it
-        try:
-            os.remove(path)
-        except OSError:
-            pass
-            
-        current = current.resize((int(current.width * 0.9), int(current.height * 0.9)), Image.LANCZOS)
-        attempt += 1
-    path = os.path.join(output_dir, f"{base}_final.png")
-    current.save(path, format="PNG", optimize=True, compress_level=9)
-    # Clean up all attempts as we generated a final one
-    _cleanup_attempts(output_dir, base, attempt)
-    return path
-
-def _cleanup_attempts(output_dir: str, base: str, max_attempt: int):
-    for i in range(max_attempt + 1):
-        p = os.path.join(output_dir, f"{base}_opt{i}.png")
-        if os.path.exists(p):
-            try:
-                os.remove(p)
-            except OSError:
-                pass
+    return os.path.join(output_dir, f"{ts}_{summary}{ext}")
 
 def _summary(text: str) -> str:
     s = "".join(ch for ch in text.strip().splitlines()[0] if ch.isalnum() or ch in ("-", "_"))
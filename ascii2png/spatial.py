@@ -0,0 +1,58 @@
+from typing import Dict, List, Tuple
+from .layout import Scene, VecText, VecLine
+
+
+def text_extent(t: VecText, vertical: bool) -> Tuple[float, float]:
+    """Conservative vertical extent (top, bottom) of a text item in scene units."""
+    if vertical:
+        return t.y - t.size, t.y + len(t.text) * (t.size + t.spacing) + t.size
+    return t.y - t.size * 0.5, t.y + t.size * 2
+
+
+def line_extent(l: VecLine) -> Tuple[float, float]:
+    """Vertical extent of a line, padded for dot/wave/cloud decorations."""
+    pad = l.width * 5 + 2
+    return min(l.y1, l.y2) - pad, max(l.y1, l.y2) + pad
+
+
+class SceneIndex:
+    """
+    Bucket index over scene.texts and scene.lines by vertical extent.
+    query() returns the items intersecting a row range in their original
+    drawing order.
+    """
+
+    def __init__(self, scene: Scene, bucket: int = 256):
+        self.scene = scene
+        self.bucket = max(1, int(bucket))
+        vertical = scene.extra_config.get("layout_mode", "horizontal") == "vertical"
+        self._text_extents = [text_extent(t, vertical) for t in scene.texts]
+        self._line_extents = [line_extent(l) for l in scene.lines]
+        self._texts = self._build(self._text_extents)
+        self._lines = self._build(self._line_extents)
+
+    def _build(self, extents: List[Tuple[float, float]]) -> Dict[int, List[int]]:
+        buckets: Dict[int, List[int]] = {}
+        b = self.bucket
+        for i, (top, bottom) in enumerate(extents):
+            for k in range(int(top // b), int(bottom // b) + 1):
+                buckets.setdefault(k, []).append(i)
+        return buckets
+
+    def _query(self, buckets: Dict[int, List[int]], extents: List[Tuple[float, float]], top: float, bottom: float) -> List[int]:
+        b = self.bucket
+        found = set()
+        for k in range(int(top // b), int((bottom - 1e-9) // b) + 1):
+            for i in buckets.get(k, ()):
+                lo, hi = extents[i]
+                if hi >= top and lo < bottom:
+                    found.add(i)
+        return sorted(found)
+
+    def query(self, top: float, bottom: float) -> Tuple[List[VecText], List[VecLine]]:
+        texts = self.scene.texts
+        lines = self.scene.lines
+        return (
+            [texts[i] for i in self._query(self._texts, self._text_extents, top, bottom)],
+            [lines[i] for i in self._query(self._lines, self._line_extents, top, bottom)],
+        )
@@ -0,0 +1,103 @@
+import os
+import json
+import hashlib
+import tempfile
+from typing import Optional, Dict, Any, Callable
+from PIL import Image
+
+# Bump when a renderer change alters pixels for the same inputs
+KEY_VERSION = 6
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form of the input text: the non-blank lines the parser sees,
+    joined with '\\n'. Line-ending and blank-line differences do not change it.
+    """
+    return "\n".join(l for l in text.splitlines() if l.strip())
+
+
+def render_key(text: str, **options: Any) -> str:
+    """
+    Content address for a render: hash of the normalized text plus every
+    option that affects pixels (theme, width, font size, colors, ...).
+    """
+    payload = json.dumps(
+        {"v": KEY_VERSION, "text": normalize_text(text), "options": options},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def slug(text: str) -> str:
+    lines = text.strip().splitlines() if text else []
+    s = "".join(ch for ch in lines[0] if ch.isalnum() or ch in ("-", "_")) if lines else ""
+    return s[:24] if s else "diagram"
+
+
+def atomic_write(path: str, write: Callable[[str], None]) -> str:
+    """
+    Run write(tmp_path) on a temp file next to path, then rename it into place.
+    Readers on a shared volume never observe a partially written file.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.splitext(path)[1])
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+def atomic_write_bytes(path: str, data: bytes) -> str:
+    def write(tmp: str):
+        with open(tmp, "wb") as f:
+            f.write(data)
+    return atomic_write(path, write)
+
+
+def atomic_save(img: Image.Image, path: str, **params: Any) -> str:
+    return atomic_write(path, lambda tmp: img.save(tmp, **params))
+
+
+class OutputStore:
+    """
+    Content-addressed directory of rendered images.
+
+    File names embed the render key, so identical requests map to the same
+    artifact and concurrent writers converge on one file via atomic rename.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path_for(self, key: str, hint: str = "", ext: str = ".png") -> str:
+        name = f"{slug(hint)}_{key}{ext}" if hint else f"{key}{ext}"
+        return os.path.join(self.root, name)
+
+    @staticmethod
+    def key_of(filename: str) -> Optional[str]:
+        """Render key embedded in an artifact name from path_for, or None."""
+        stem = os.path.splitext(os.path.basename(filename))[0]
+        key = stem.rsplit("_", 1)[-1]
+        if len(key) == 32 and all(c in "0123456789abcdef" for c in key):
+            return key
+        return None
+
+    def lookup(self, path: str) -> Optional[str]:
+        """Return path if the artifact exists, refreshing its mtime for quota LRU."""
+        try:
+            os.utime(path, None)
+        except OSError:
+            return None
+        return path
@@ -0,0 +1,204 @@
+import math
+import re
+from itertools import groupby
+from typing import List, Optional
+from xml.sax.saxutils import escape, quoteattr
+from .background import GRADIENT_GREEN, _draw_circles
+from .fonts import get_font
+from .layout import Scene, VecLine, VecText
+from .lines import wave_offsets
+from .render import DEFAULT_SUPERSAMPLE
+
+# Families matching the faces fonts.py loads for each style on Windows / macOS
+FONT_FAMILIES = {
+    "sans": "'Microsoft YaHei', 'PingFang SC', Helvetica, Arial, sans-serif",
+    "serif": "'Times New Roman', SimSun, 'Songti SC', serif",
+    "mono": "Consolas, Menlo, 'Courier New', monospace",
+}
+
+
+# Characters outside XML 1.0's Char production, e.g. ESC from `tree -C` output
+_XML_ILLEGAL = re.compile("[^\t\n\r\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]")
+
+
+def _xml_text(s: str) -> str:
+    """Escaped character data with XML-illegal characters dropped."""
+    return escape(_XML_ILLEGAL.sub("", s))
+
+
+def _num(v: float) -> str:
+    """Coordinate with at most two decimals and no trailing zeros."""
+    s = f"{v:.2f}".rstrip("0").rstrip(".")
+    return "0" if s == "-0" else s
+
+
+def _rgb(color) -> str:
+    return "#%02x%02x%02x" % tuple(color[:3])
+
+
+class _EllipseRecorder:
+    """
+    Stands in for ImageDraw so the raster circle decoration can be reused;
+    geometry drawn on a canvas scale times larger is scaled back down.
+    """
+
+    def __init__(self, scale: float = 1.0):
+        self.scale = scale
+        self.out: List[str] = []
+
+    def ellipse(self, xy, fill=None):
+        (x0, y0), (x1, y1) = ((x / self.scale, y / self.scale) for x, y in xy)
+        self.out.append(
+            f'<circle cx="{_num((x0 + x1) / 2)}" cy="{_num((y0 + y1) / 2)}" r="{_num((x1 - x0) / 2)}" fill="{_rgb(fill)}"/>'
+        )
+
+
+def _background(scene: Scene, w: int, h: int) -> List[str]:
+    cfg = scene.extra_config
+    style = scene.bg_style
+    out = [f'<rect width="{w}" height="{h}" fill="{_rgb(scene.bg)}"/>']
+    if style == "grid":
+        c = _rgb(cfg.get("grid_color", (220, 220, 220)))
+        out.append(
+            '<defs><pattern id="bg" width="40" height="40" patternUnits="userSpaceOnUse">'
+            f'<path d="M0 0.5H40M0.5 0V40" stroke="{c}" stroke-width="1" fill="none"/></pattern></defs>'
+            f'<rect width="{w}" height="{h}" fill="url(#bg)"/>'
+        )
+    elif style == "dots":
+        c = _rgb(cfg.get("dot_color", (200, 200, 200)))
+        out.append(
+            '<defs><pattern id="bg" width="30" height="30" patternUnits="userSpaceOnUse">'
+            f'<circle cx="15" cy="15" r="2" fill="{c}"/></pattern></defs>'
+            f'<rect width="{w}" height="{h}" fill="url(#bg)"/>'
+        )
+    elif style == "circle":
+        # The seeded placement depends on the canvas size, so draw on the
+        # default supersampled canvas to land where the raster output does
+        scale = float(DEFAULT_SUPERSAMPLE)
+        recorder = _EllipseRecorder(scale)
+        colors = [tuple(c) for c in cfg.get("circle_colors", [(240, 240, 240)])]
+        _draw_circles(recorder, int(w * scale), int(h * scale), scale, colors)
+        out.extend(recorder.out)
+    elif style == "gradient_green":
+        top, bottom = GRADIENT_GREEN
+        out.append(
+            '<defs><linearGradient id="bg" x1="0" y1="0" x2="0" y2="1">'
+            f'<stop offset="0" stop-color="{_rgb(top)}"/><stop offset="1" stop-color="{_rgb(bottom)}"/>'
+            '</linearGradient></defs>'
+            f'<rect width="{w}" height="{h}" fill="url(#bg)"/>'
+        )
+    return out
+
+
+def _line(l: VecLine) -> str:
+    x1, y1, x2, y2 = l.x1, l.y1, l.x2, l.y2
+    style = l.style
+    if style == "wave":
+        dx, dy = x2 - x1, y2 - y1
+        length = math.hypot(dx, dy)
+        angle = math.atan2(dy, dx)
+        c, s = math.cos(angle), math.sin(angle)
+        points = " ".join(
+            f"{_num(x1 + c * dist - s * offset)},{_num(y1 + s * dist + c * offset)}"
+            for dist, offset in wave_offsets(l.width, int(length / 2))
+        )
+        return f'<polyline points="{points}"/>'
+    if style == "cloud":
+        # Half-circle bumps along the line, as draw_line_styled's arcs
+        dx, dy = x2 - x1, y2 - y1
+        length = math.hypot(dx, dy)
+        if length == 0:
+            return ""
+        angle = math.atan2(dy, dx)
+        ca, sa = math.cos(angle), math.sin(angle)
+        radius = l.width * 4
+        step = radius * 1.5
+        r = _num(radius / 2)
+        d = []
+        for i in range(int(length / step) + 1):
+            t = i * step
+            if t >= length:
+                break
+            cx = x1 + ca * (t + radius / 2) - sa * radius * 0.2
+            cy = y1 + sa * (t + radius / 2) + ca * radius * 0.2
+            d.append(
+                f"M{_num(cx - ca * radius / 2)} {_num(cy - sa * radius / 2)}"
+                f"A{r} {r} 0 0 1 {_num(cx + ca * radius / 2)} {_num(cy + sa * radius / 2)}"
+            )
+        return f'<path d="{"".join(d)}"/>'
+    return f'<line x1="{_num(x1)}" y1="{_num(y1)}" x2="{_num(x2)}" y2="{_num(y2)}"/>'
+
+
+def _line_group(color, width: int, style: str) -> str:
+    attrs = f'stroke="{_rgb(color)}" stroke-width="{width}" fill="none"'
+    if style == "dotted":
+        # Zero-length dashes with round caps are dots of diameter width
+        attrs += f' stroke-linecap="round" stroke-dasharray="0 {width * 3}"'
+    elif style == "dashed":
+        attrs += f' stroke-dasharray="{width * 4} {width * 2}"'
+    elif style in ("wave", "cloud"):
+        attrs += ' stroke-linejoin="round"'
+    return f"<g {attrs}>"
+
+
+def _text(t: VecText, vertical: bool, ascent: float) -> str:
+    if vertical:
+        # One glyph per row, centred on x, as draw_text_vertical
+        step = t.size + t.spacing
+        spans = "".join(
+            f'<tspan x="{_num(t.x)}" y="{_num(t.y + i * step + ascent)}">{_xml_text(ch)}</tspan>'
+            for i, ch in enumerate(t.text)
+            if not _XML_ILLEGAL.match(ch)
+        )
+        return f'<text text-anchor="middle">{spans}</text>'
+    spacing = f' letter-spacing="{t.spacing}"' if t.spacing else ""
+    return f'<text x="{_num(t.x)}" y="{_num(t.y + ascent)}"{spacing} xml:space="preserve">{_xml_text(t.text)}</text>'
+
+
+def _font_family(style: str, size: int, font_path: Optional[str]) -> str:
+    families = FONT_FAMILIES.get(style, FONT_FAMILIES["sans"])
+    font = get_font(style, size, font_path)
+    # Only when font_path actually loaded; a failed path falls back to the style's face
+    if font_path and getattr(font, "path", None) == font_path:
+        name = font.getname()[0]
+        if name:
+            families = "'%s', %s" % (name.replace("'", ""), families)
+    return families
+
+
+def render_scene_svg(scene: Scene, width: int, font_path: Optional[str] = None) -> bytes:
+    """
+    Render the scene as a standalone SVG document (UTF-8 bytes) with the
+    same canvas size and geometry as the raster output. Text is left as
+    text, so the viewer's fonts draw it; consecutive items sharing a style
+    are grouped so the attributes are written once.
+
+    The circle decoration matches the raster output at the default
+    supersample. A custom font_path is not embedded: its family name is
+    listed first, so it is used only where the viewer has it installed.
+    """
+    h = max(scene.height, 400)
+    vertical = scene.extra_config.get("layout_mode", "horizontal") == "vertical"
+    out = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{h}" viewBox="0 0 {width} {h}">',
+    ]
+    out.extend(_background(scene, width, h))
+
+    for (color, lw, style), lines in groupby(scene.lines, key=lambda l: (l.color, l.width, l.style)):
+        out.append(_line_group(color, lw, style))
+        out.extend(_line(l) for l in lines)
+        out.append("</g>")
+
+    ascents = {}
+    for (color, size, font_style), texts in groupby(scene.texts, key=lambda t: (t.color, t.size, t.font_style)):
+        if (size, font_style) not in ascents:
+            # The raster anchors text at its top; SVG positions the baseline
+            ascents[size, font_style] = get_font(font_style, size, font_path).getmetrics()[0]
+        family = quoteattr(_font_family(font_style, size, font_path))
+        out.append(f'<g fill="{_rgb(color)}" font-size="{size}" font-family={family}>')
+        out.extend(_text(t, vertical, ascents[size, font_style]) for t in texts)
+        out.append("</g>")
+
+    out.append("</svg>")
+    return "\n".join(out).encode("utf-8")
@@ -1,4 +1,20 @@
-from typing import Dict, Tuple, Any
+from typing import Dict, Tuple, Any, Optional
+
+# Accepted theme names mapped to their canonical name. wechat and light
+# predate the named themes and have always rendered as minimal.
+THEMES = {
+    "minimal": "minimal", "简约": "minimal", "wechat": "minimal", "light": "minimal",
+    "business": "business", "商务": "business",
+    "art": "art", "艺术": "art",
+    "dark": "dark", "暗黑": "dark",
+}
+
+
+def canonical_theme(name: str) -> Optional[str]:
+    """Canonical name of a theme, or None when it is unknown."""
+    if name is not None and not isinstance(name, str):
+        return None
+    return THEMES.get((name or "minimal").strip().lower())
 
 
 def get_theme(name: str, font_size: int) -> Dict[str, Any]:
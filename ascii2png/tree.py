@@ -0,0 +1,161 @@
+from array import array
+from typing import List, Optional, Tuple
+
+
+class CompactTree:
+    """
+    Array-backed tree: parallel int arrays for parent, depth and
+    first-child/next-sibling links, with labels stored as offsets into a
+    single string buffer. Uses a few machine words per node instead of a
+    Python object with a __dict__ and a children list.
+    """
+
+    def __init__(self, root_label: str = ""):
+        self.parent = array("i")
+        self.depth = array("i")
+        self.first_child = array("i")
+        self.next_sibling = array("i")
+        self._last_child = array("i")
+        self.label_start = array("q")
+        self.label_len = array("i")
+        self._parts: List[str] = []
+        self._length = 0
+        self._buffer: Optional[str] = None
+        self._append(-1, 0, root_label)
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    @property
+    def root(self) -> "NodeView":
+        return NodeView(self, 0)
+
+    def add(self, parent: int, label: str) -> int:
+        """Append a node as the last child of parent; returns its index."""
+        i = self._append(parent, self.depth[parent] + 1, label)
+        last = self._last_child[parent]
+        if last < 0:
+            self.first_child[parent] = i
+        else:
+            self.next_sibling[last] = i
+        self._last_child[parent] = i
+        return i
+
+    def set_label(self, i: int, label: str):
+        label = label.strip()
+        self.label_start[i] = self._length
+        self.label_len[i] = len(label)
+        self._parts.append(label)
+        self._length += len(label)
+        self._buffer = None
+
+    def label(self, i: int) -> str:
+        start = self.label_start[i]
+        return self.buffer[start:start + self.label_len[i]]
+
+    def children(self, i: int) -> List[int]:
+        out = []
+        c = self.first_child[i]
+        while c >= 0:
+            out.append(c)
+            c = self.next_sibling[c]
+        return out
+
+    @property
+    def buffer(self) -> str:
+        if self._buffer is None:
+            self._buffer = "".join(self._parts)
+            self._parts = [self._buffer]
+        return self._buffer
+
+    def freeze(self) -> "CompactTree":
+        """Join pending labels into the shared buffer, releasing the per-label strings."""
+        self.buffer
+        return self
+
+    def preorder(self, start: int = 0) -> List[int]:
+        """Node indices of the subtree at start, in pre-order, without recursion."""
+        order = []
+        first_child = self.first_child
+        next_sibling = self.next_sibling
+        stack = [start]
+        while stack:
+            i = stack.pop()
+            order.append(i)
+            c = first_child[i]
+            if c < 0:
+                continue
+            kids = []
+            while c >= 0:
+                kids.append(c)
+                c = next_sibling[c]
+            # Push in reverse so the first child is visited next
+            kids.reverse()
+            stack.extend(kids)
+        return order
+
+    def flatten(self, start: int = 0) -> Tuple[List[str], List[int], List[int], List[int]]:
+        """
+        Pre-order labels, depths and first-child/next-sibling links, with
+        links expressed as positions in that order (-1 for none).
+        """
+        order = self.preorder(start)
+        buf = self.buffer
+        ls, ll = self.label_start, self.label_len
+        labels = [buf[ls[i]:ls[i] + ll[i]] for i in order]
+        base = self.depth[start]
+        depths = [self.depth[i] - base for i in order]
+        if order == list(range(start, start + len(order))):
+            # Built in pre-order (the parser always does): links map directly
+            fc = [c - start if c >= 0 else -1 for c in self.first_child[start:start + len(order)]]
+            ns = [s - start if s >= 0 else -1 for s in self.next_sibling[start:start + len(order)]]
+            ns[0] = -1
+            return labels, depths, fc, ns
+        pos = {i: p for p, i in enumerate(order)}
+        fc = [pos[self.first_child[i]] if self.first_child[i] >= 0 else -1 for i in order]
+        ns = [pos[self.next_sibling[i]] if self.next_sibling[i] >= 0 else -1 for i in order]
+        ns[0] = -1
+        return labels, depths, fc, ns
+
+    def _append(self, parent: int, depth: int, label: str) -> int:
+        label = label.strip()
+        i = len(self.parent)
+        self.parent.append(parent)
+        self.depth.append(depth)
+        self.first_child.append(-1)
+        self.next_sibling.append(-1)
+        self._last_child.append(-1)
+        self.label_start.append(self._length)
+        self.label_len.append(len(label))
+        self._parts.append(label)
+        self._length += len(label)
+        self._buffer = None
+        return i
+
+
+class NodeView:
+    """
+    Read-only parser.Node-compatible view of one CompactTree node.
+    """
+    __slots__ = ("tree", "index")
+
+    def __init__(self, tree: CompactTree, index: int):
+        self.tree = tree
+        self.index = index
+
+    @property
+    def label(self) -> str:
+        return self.tree.label(self.index)
+
+    @property
+    def children(self) -> List["NodeView"]:
+        return [NodeView(self.tree, c) for c in self.tree.children(self.index)]
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, NodeView) and other.tree is self.tree and other.index == self.index
+
+    def __hash__(self) -> int:
+        return hash((id(self.tree), self.index))
+
+    def __repr__(self) -> str:
+        return f"NodeView({self.label!r})"
@@ -0,0 +1,170 @@
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FuturesTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+from .fonts import warm_fonts
+
+try:
+    import resource
+except ImportError:  # Windows: no per-worker memory cap
+    resource = None
+
+# Extra time the caller waits beyond the worker-side deadline
+_GRACE_SECONDS = 2.0
+
+
+class PoolBusy(RuntimeError):
+    """Every worker is busy and the queue is full (HTTP 429)."""
+
+
+class RenderUnavailable(RuntimeError):
+    """The render could not complete: timed out or its worker died (HTTP 503)."""
+
+
+class RenderTimeout(RenderUnavailable):
+    """The render exceeded the per-request time limit."""
+
+
+def _init_worker(font_sizes, memory_limit_mb: Optional[int]):
+    if memory_limit_mb and resource is not None:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    warm_fonts(font_sizes)
+
+
+def _on_deadline(signum, frame):
+    raise RenderTimeout("Render timed out")
+
+
+def _call_with_deadline(timeout: Optional[float], fn: Callable, args, kwargs):
+    """Run fn in the worker, aborting it once timeout seconds have passed."""
+    armed = bool(timeout) and hasattr(signal, "setitimer")
+    if armed:
+        signal.signal(signal.SIGALRM, _on_deadline)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        if armed:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _noop():
+    return os.getpid()
+
+
+class RenderPool:
+    """
+    Bounded pool of pre-started render processes.
+
+    At most workers + queue_depth calls are admitted at once; further calls
+    are rejected immediately with PoolBusy instead of queueing without
+    bound. Each call is aborted inside its worker after `timeout` seconds,
+    and a pool whose worker died (e.g. killed by the memory cap) is
+    replaced, so one pathological input only costs its own request.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        queue_depth: int = 8,
+        timeout: Optional[float] = 30.0,
+        font_sizes=(24,),
+        memory_limit_mb: Optional[int] = None,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+        self.font_sizes = tuple(font_sizes)
+        self.memory_limit_mb = memory_limit_mb
+        self.rejected = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self._slots = threading.BoundedSemaphore(self.workers + queue_depth)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a threaded web server can copy held locks
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.font_sizes, self.memory_limit_mb),
+                )
+            return self._executor
+
+    def _reset(self, broken: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+                self.restarts += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def start(self):
+        """Start and warm every worker now rather than on the first request."""
+        executor = self._get_executor()
+        for future in [executor.submit(_noop) for _ in range(self.workers)]:
+            future.result()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Queue fn(*args, **kwargs) on a worker; raises PoolBusy when saturated."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PoolBusy("Render queue is full")
+        executor = self._get_executor()
+        try:
+            future = executor.submit(_call_with_deadline, self.timeout, fn, args, kwargs)
+        except BrokenProcessPool as e:
+            self._slots.release()
+            self._reset(executor)
+            raise RenderUnavailable("Render worker crashed") from e
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda f: self._slots.release())
+        future.add_done_callback(lambda f: self._check_broken(f, executor))
+        return future
+
+    def _check_broken(self, future: Future, executor: ProcessPoolExecutor):
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._reset(executor)
+
+    def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn on a worker and wait for its result."""
+        future = self.submit(fn, *args, **kwargs)
+        wait = self.timeout + _GRACE_SECONDS if self.timeout else None
+        try:
+            return future.result(timeout=wait)
+        except RenderTimeout:
+            with self._lock:
+                self.timeouts += 1
+            raise
+        except FuturesTimeout as e:
+            with self._lock:
+                self.timeouts += 1
+            raise RenderTimeout("Render timed out") from e
+        except BrokenProcessPool as e:
+            raise RenderUnavailable("Render worker crashed") from e
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queue_depth,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "restarts": self.restarts,
+            }
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,60 @@
+"""
+Layout scaling benchmark.
+
+Builds synthetic trees (mixed fan-out plus one long chain) and times
+layout_tree for both layout modes. Per-node time should stay roughly flat
+as the tree grows.
+
+    python benchmarks/bench_layout.py [--max 1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ascii2png.parser import Node
+from ascii2png.layout import layout_tree
+from ascii2png.theme import get_theme
+
+
+def build_tree(n: int, seed: int = 0) -> Node:
+    rng = random.Random(seed)
+    root = Node("root")
+    nodes = [root]
+    chain = root
+    for i in range(1, n):
+        if i % 10 == 0:
+            # Keep a deep chain so recursion depth would be a problem
+            child = Node(f"deep_{i}")
+            chain.add_child(child)
+            chain = child
+        else:
+            child = Node(f"node_{i}")
+            rng.choice(nodes[-50:]).add_child(child)
+        nodes.append(child)
+    return root
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--max", type=int, default=1_000_000, help="largest tree size")
+    args = ap.parse_args()
+
+    sizes = [n for n in (1_000, 10_000, 100_000, 1_000_000) if n <= args.max]
+    print(f"{'nodes':>10} {'mode':>10} {'seconds':>10} {'us/node':>10}")
+    for n in sizes:
+        root = build_tree(n)
+        for mode in ("horizontal", "vertical"):
+            colors = get_theme("minimal", 24)
+            colors["layout_mode"] = mode
+            t0 = time.perf_counter()
+            layout_tree(root, 1080, 24, colors)
+            dt = time.perf_counter() - t0
+            print(f"{n:>10} {mode:>10} {dt:>10.3f} {dt / n * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Parallel rasterization benchmark.
+
+Renders a large synthetic tree serially and with rasterize_parallel on
+thread and process pools of increasing size, and prints wall-clock time
+and speedup against the serial path.
+
+    python benchmarks/bench_parallel.py [--nodes 10000] [--max-workers 32]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ascii2png.core import CoreService
+from ascii2png.render import _rasterize
+from ascii2png.parallel import rasterize_parallel, shutdown_pools
+
+
+def build_text(n: int) -> str:
+    lines = ["monorepo"]
+    for i in range(n):
+        lines.append("│   " * (i % 6) + f"├── package_{i}/module.py")
+    return "\n".join(lines)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--nodes", type=int, default=10_000)
+    ap.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--theme", default="business")
+    args = ap.parse_args()
+
+    scene = CoreService.build_scene(build_text(args.nodes), width=1080, theme=args.theme)
+    print(f"{args.nodes} nodes, {scene.height} px tall, {os.cpu_count()} CPUs")
+
+    t0 = time.perf_counter()
+    _rasterize(scene, 1080)
+    serial = time.perf_counter() - t0
+    print(f"{'executor':>10} {'workers':>8} {'seconds':>10} {'speedup':>8}")
+    print(f"{'serial':>10} {1:>8} {serial:>10.2f} {1.0:>8.2f}")
+
+    counts = []
+    w = 1
+    while w <= args.max_workers:
+        counts.append(w)
+        w *= 2
+    for executor in ("thread", "process"):
+        for workers in counts:
+            # Warm the pool (process start-up, font loading) outside the timing
+            rasterize_parallel(scene, 1080, workers=workers, executor=executor, tile_height=4096)
+            t0 = time.perf_counter()
+            rasterize_parallel(scene, 1080, workers=workers, executor=executor)
+            dt = time.perf_counter() - t0
+            print(f"{executor:>10} {workers:>8} {dt:>10.2f} {serial / dt:>8.2f}")
+    shutdown_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+"""
+gunicorn settings, read automatically from the working directory
+(the Docker image runs gunicorn from /app).
+"""
+
+
+def post_worker_init(worker):
+    # Render processes are spawned per server worker, after the fork
+    import web_app
+    web_app.start_services()
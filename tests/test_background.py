@@ -0,0 +1,39 @@
+import unittest
+from unittest import mock
+from PIL import Image, ImageDraw
+from ascii2png import background
+from ascii2png.background import LayerCache, draw_background
+
+class TestBackground(unittest.TestCase):
+    def test_gradient_fallback_matches_numpy(self):
+        expected = background._gradient_column(997, *background.GRADIENT_GREEN).tobytes()
+        with mock.patch.object(background, "np", None):
+            self.assertEqual(background._gradient_column(997, *background.GRADIENT_GREEN).tobytes(), expected)
+
+    def test_grid_matches_per_line_drawing(self):
+        W, H, step = 300, 500, 80
+        reference = Image.new("RGB", (W, H), (1, 2, 3))
+        draw = ImageDraw.Draw(reference)
+        for x in range(0, W, step):
+            draw.line([(x, 0), (x, H)], fill=(9, 9, 9), width=1)
+        for y in range(0, H, step):
+            draw.line([(0, y), (W, y)], fill=(9, 9, 9), width=1)
+        img = Image.new("RGB", (W, H), (1, 2, 3))
+        draw_background(img, "grid", {"grid_color": (9, 9, 9)}, (1, 2, 3), W, H, 0, 2.0)
+        self.assertEqual(img.tobytes(), reference.tobytes())
+        # A band is a crop of the full layer
+        band = Image.new("RGB", (W, 130), (1, 2, 3))
+        draw_background(band, "grid", {"grid_color": (9, 9, 9)}, (1, 2, 3), W, H, 170, 2.0)
+        self.assertEqual(band.tobytes(), reference.crop((0, 170, W, 300)).tobytes())
+
+    def test_layer_cache_lru(self):
+        cache = LayerCache(max_bytes=3 * 10 * 10 * 2)
+        cache.get("a", lambda: Image.new("RGB", (10, 10)))
+        cache.get("a", lambda: Image.new("RGB", (10, 10)))
+        cache.get("b", lambda: Image.new("RGB", (10, 10)))
+        cache.get("c", lambda: Image.new("RGB", (10, 10)))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (1, 3, 2))
+
+if __name__ == '__main__':
+    unittest.main()
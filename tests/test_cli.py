@@ -0,0 +1,87 @@
+import os
+import shutil
+import subprocess
+import sys
+import unittest
+from ascii2png.cli import MANIFEST_NAME, collect_inputs, main
+
+TREE = "root\n├── a\n└── b\n"
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.src = "tests_output_cli_src"
+        self.out = "tests_output_cli_out"
+        os.makedirs(os.path.join(self.src, "sub"), exist_ok=True)
+        for rel in ("one.txt", os.path.join("sub", "two.txt")):
+            with open(os.path.join(self.src, rel), "w", encoding="utf-8") as f:
+                f.write(TREE + rel)
+        with open(os.path.join(self.src, "notes.md"), "w") as f:
+            f.write("ignored")
+
+    def tearDown(self):
+        for d in (self.src, self.out):
+            if os.path.exists(d):
+                shutil.rmtree(d)
+
+    def test_collect_inputs_mirrors_directories(self):
+        names = sorted(name for _, name in collect_inputs([self.src], "*.txt"))
+        self.assertEqual(names, ["one.png", "sub/two.png"])
+        names = [name for _, name in collect_inputs([os.path.join(self.src, "**", "*.txt")], "*.txt")]
+        self.assertEqual(sorted(names), ["one.png", "two.png"])
+
+    def test_incremental_reruns(self):
+        argv = [self.src, "-o", self.out, "-j", "1", "-q", "--supersample", "1"]
+        self.assertEqual(main(argv), 0)
+        one = os.path.join(self.out, "one.png")
+        two = os.path.join(self.out, "sub", "two.png")
+        self.assertTrue(os.path.exists(one) and os.path.exists(two))
+        self.assertTrue(os.path.exists(os.path.join(self.out, MANIFEST_NAME)))
+        mtimes = (os.stat(one).st_mtime_ns, os.stat(two).st_mtime_ns)
+
+        # Unchanged: nothing is rewritten
+        self.assertEqual(main(argv), 0)
+        self.assertEqual((os.stat(one).st_mtime_ns, os.stat(two).st_mtime_ns), mtimes)
+
+        # One input edited: only it is converted again
+        with open(os.path.join(self.src, "one.txt"), "a", encoding="utf-8") as f:
+            f.write("\n└── c")
+        self.assertEqual(main(argv), 0)
+        self.assertNotEqual(os.stat(one).st_mtime_ns, mtimes[0])
+        self.assertEqual(os.stat(two).st_mtime_ns, mtimes[1])
+
+        # Changed options invalidate everything
+        self.assertEqual(main(argv + ["--theme", "dark"]), 0)
+        self.assertNotEqual(os.stat(two).st_mtime_ns, mtimes[1])
+
+    def test_svg_format(self):
+        self.assertEqual(main([self.src, "-o", self.out, "-j", "1", "-q", "--format", "svg"]), 0)
+        with open(os.path.join(self.out, "sub", "two.svg"), "rb") as f:
+            self.assertIn(b"<svg", f.read())
+
+    def test_parallel_and_failures(self):
+        with open(os.path.join(self.src, "empty.txt"), "w") as f:
+            f.write("   ")
+        code = main([self.src, "-o", self.out, "-j", "2", "-q", "--supersample", "1"])
+        self.assertEqual(code, 1)
+        self.assertTrue(os.path.exists(os.path.join(self.out, "sub", "two.png")))
+        self.assertFalse(os.path.exists(os.path.join(self.out, "empty.png")))
+
+    def test_unreadable_input_fails_alone(self):
+        with open(os.path.join(self.src, "binary.txt"), "wb") as f:
+            f.write(b"\xff\xfe\x00garbage")
+        code = main([self.src, "-o", self.out, "-j", "1", "-q", "--supersample", "1"])
+        self.assertEqual(code, 1)
+        self.assertTrue(os.path.exists(os.path.join(self.out, "one.png")))
+        self.assertTrue(os.path.exists(os.path.join(self.out, MANIFEST_NAME)))
+        self.assertFalse(os.path.exists(os.path.join(self.out, "binary.png")))
+
+    def test_stdin_to_stdout(self):
+        proc = subprocess.run(
+            [sys.executable, "-m", "ascii2png", "-", "--supersample", "1"],
+            input=TREE.encode("utf-8"), capture_output=True, timeout=60,
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertTrue(proc.stdout.startswith(b"\x89PNG"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -49,5 +49,60 @@ class TestCoreService(unittest.TestCase):
         )
         self.assertTrue(os.path.exists(path))
 
+    def test_convert_bytes_matches_file_output(self):
+        text = "root\n├── a\n└── b"
+        data = CoreService.convert_bytes(text=text)
+        self.assertTrue(data.startswith(b"\x89PNG"))
+        path = CoreService.convert(text=text, output_dir=self.test_dir)
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), data)
+
+    def test_output_formats(self):
+        text = "root\n├── a\n└── b"
+        png = CoreService.convert(text=text, output_dir=self.test_dir)
+        fast = CoreService.convert(text=text, output_dir=self.test_dir, output_format="png-fast")
+        jpeg = CoreService.convert(text=text, output_dir=self.test_dir, output_format="jpeg")
+        self.assertTrue(fast.endswith(".png") and fast != png)
+        self.assertTrue(jpeg.endswith(".jpg"))
+        with open(jpeg, "rb") as f:
+            self.assertEqual(f.read(), CoreService.convert_bytes(text=text, output_format="jpeg"))
+
+    def test_convert_many_reports_per_item_errors(self):
+        items = [
+            {"text": "root\n├── a\n└── b"},
+            {"text": "   "},
+            {"text": "root\n└── c", "theme": "dark"},
+        ]
+        results = sorted(CoreService.convert_many(items, workers=1, output_dir=self.test_dir), key=lambda r: r["index"])
+        self.assertEqual([r["index"] for r in results], [0, 1, 2])
+        self.assertTrue(os.path.exists(results[0]["path"]))
+        self.assertIsNone(results[1]["path"])
+        self.assertTrue(results[1]["error"])
+        self.assertTrue(os.path.exists(results[2]["path"]))
+
+    def test_convert_many_shares_layout(self):
+        calls = []
+        original = CoreService.build_scene
+        def counting(*args, **kwargs):
+            calls.append(1)
+            return original(*args, **kwargs)
+        CoreService.build_scene = staticmethod(counting)
+        try:
+            text = "root\n├── a\n└── b"
+            items = [{"text": text, "supersample": s} for s in (1, 2, 3)]
+            results = list(CoreService.convert_many(items, workers=1, output_dir=self.test_dir))
+        finally:
+            CoreService.build_scene = staticmethod(original)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len({r["path"] for r in results}), 3)
+
+    def test_convert_many_process_pool(self):
+        items = [{"text": f"root\n└── item{i}"} for i in range(4)]
+        results = list(CoreService.convert_many(items, workers=2, output_dir=self.test_dir))
+        self.assertEqual(sorted(r["index"] for r in results), [0, 1, 2, 3])
+        for r in results:
+            self.assertIsNone(r["error"])
+            self.assertEqual(r["path"], CoreService.convert(items[r["index"]]["text"], output_dir=self.test_dir))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import io
+import random
+from PIL import Image, ImageDraw
+from ascii2png.encoder import PROFILES, encode_png, get_profile
+
+def _noisy_image(width, height):
+    img = Image.new("RGB", (width, height), (255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    rng = random.Random(1)
+    for y in range(0, height, 6):
+        for x in range(0, width, 40):
+            draw.text((x, y), str(rng.randint(0, 99)), fill=(rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255)))
+    return img
+
+class TestEncoder(unittest.TestCase):
+    def test_small_image_is_lossless(self):
+        img = Image.new("RGB", (50, 40), (10, 20, 30))
+        data = encode_png(img)
+        out = Image.open(io.BytesIO(data))
+        self.assertEqual(out.mode, "RGB")
+        self.assertEqual(out.size, (50, 40))
+
+    def test_respects_budget(self):
+        img = _noisy_image(600, 2000)
+        budget = 60_000
+        data = encode_png(img, max_bytes=budget)
+        self.assertLessEqual(len(data), budget)
+        out = Image.open(io.BytesIO(data))
+        self.assertLessEqual(out.height, 2000)
+
+    def test_uses_most_of_budget(self):
+        img = _noisy_image(600, 2000)
+        for budget in (30_000, 150_000):
+            data = encode_png(img, max_bytes=budget)
+            self.assertLessEqual(len(data), budget)
+            # Downscaled output should not waste the budget it was given
+            self.assertGreaterEqual(len(data), budget * 0.6, budget)
+
+    def test_budget_disabled(self):
+        img = _noisy_image(200, 200)
+        out = Image.open(io.BytesIO(encode_png(img, max_bytes=None)))
+        self.assertEqual(out.mode, "RGB")
+
+    def test_profiles_decode(self):
+        img = _noisy_image(300, 200)
+        formats = {"png": "PNG", "png-fast": "PNG", "png-palette": "PNG", "webp": "WEBP", "webp-lossy": "WEBP", "jpeg": "JPEG"}
+        for name, fmt in formats.items():
+            out = Image.open(io.BytesIO(PROFILES[name].encode(img)))
+            self.assertEqual((out.format, out.size), (fmt, img.size), name)
+        self.assertEqual(Image.open(io.BytesIO(get_profile("png-palette").encode(img))).mode, "P")
+        with self.assertRaises(ValueError):
+            get_profile("gif")
+
+    def test_flat_image_palette_is_exact(self):
+        img = Image.new("RGB", (64, 64), (250, 250, 250))
+        ImageDraw.Draw(img).rectangle((8, 8, 40, 40), fill=(30, 60, 90))
+        out = Image.open(io.BytesIO(get_profile("png-palette").encode(img))).convert("RGB")
+        self.assertEqual(out.tobytes(), img.tobytes())
+
+    def test_palette_downscale_is_antialiased(self):
+        rng = random.Random(2)
+        img = Image.new("RGB", (400, 400))
+        img.putdata([(0, 0, 0) if rng.random() < 0.5 else (255, 255, 255) for _ in range(400 * 400)])
+        for src in (img, img.convert("P")):
+            out = Image.open(io.BytesIO(get_profile("png-palette").encode(src, max_bytes=5000)))
+            self.assertEqual(out.mode, "P")
+            self.assertLess(out.width, 400)
+            # Resampled from full color: grays between the two source colors
+            self.assertGreater(len(out.getcolors(256)), 2, src.mode)
+
+    def test_webp_size_limit(self):
+        with self.assertRaises(ValueError):
+            get_profile("webp").encode(Image.new("RGB", (10, 20000)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+from ascii2png.fonts import FontRegistry, get_font, get_registry
+
+class TestFontRegistry(unittest.TestCase):
+    def test_hit_and_miss_counters(self):
+        reg = FontRegistry(max_faces=4)
+        f1 = reg.get("sans", 20)
+        f2 = reg.get("sans", 20)
+        self.assertIs(f1, f2)
+        stats = reg.stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+
+    def test_lru_eviction(self):
+        reg = FontRegistry(max_faces=2)
+        reg.get("sans", 10)
+        reg.get("sans", 11)
+        reg.get("sans", 10)  # refresh 10
+        reg.get("sans", 12)  # evicts 11
+        self.assertEqual(reg.stats()["size"], 2)
+        reg.get("sans", 10)
+        self.assertEqual(reg.stats()["hits"], 2)
+
+    def test_warm(self):
+        reg = FontRegistry()
+        reg.warm([16, 32], styles=("sans",))
+        self.assertEqual(reg.stats()["misses"], 2)
+        reg.get("sans", 16)
+        self.assertEqual(reg.stats()["hits"], 1)
+
+    def test_missing_custom_path_falls_back(self):
+        reg = FontRegistry()
+        self.assertIsNotNone(reg.get("sans", 20, "/nonexistent/font.ttf"))
+
+    def test_get_font_uses_shared_registry(self):
+        self.assertIs(get_font("sans", 21), get_font("sans", 21))
+        self.assertGreaterEqual(get_registry().stats()["hits"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+from unittest import mock
+from PIL import Image, ImageDraw
+from ascii2png import glyphs
+from ascii2png.fonts import get_font
+from ascii2png.glyphs import GlyphAtlas, render_mask
+
+class TestGlyphAtlas(unittest.TestCase):
+    def setUp(self):
+        self.font = get_font("regular", 32)
+
+    def test_matches_draw_text(self):
+        atlas = GlyphAtlas()
+        for mode, fill in (("RGB", (20, 120, 200)), ("L", 200)):
+            for xy in ((3, 4), (10.5, 7), (17.25, 2.75)):
+                for ch in "Ag中─":
+                    expected = Image.new(mode, (80, 60), 0)
+                    ImageDraw.Draw(expected).text(xy, ch, font=self.font, fill=fill)
+                    actual = Image.new(mode, (80, 60), 0)
+                    atlas.draw(ImageDraw.Draw(actual), xy, ch, self.font, fill)
+                    self.assertEqual(expected.tobytes(), actual.tobytes(), (mode, xy, ch))
+
+    def test_render_mask_fallback(self):
+        for start in ((0, 0), (0.5, 0.25), (0.9, 0.7)):
+            mask, offset = render_mask(self.font, "Wj中", "L", start)
+            with mock.patch.object(glyphs, "_wrap_core", None):
+                fallback, fallback_offset = render_mask(self.font, "Wj中", "L", start)
+            self.assertEqual(offset, fallback_offset)
+            self.assertEqual(mask.tobytes(), fallback.tobytes(), start)
+
+    def test_masks_are_reused(self):
+        atlas = GlyphAtlas()
+        img = Image.new("RGB", (200, 60), "white")
+        draw = ImageDraw.Draw(img)
+        for x in range(0, 150, 10):
+            atlas.draw(draw, (x, 5), "a", self.font, "black")
+        stats = atlas.stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 14)
+
+    def test_bounded(self):
+        atlas = GlyphAtlas(max_glyphs=3)
+        for ch in "abcdef":
+            atlas.mask(self.font, ch)
+        self.assertEqual(atlas.stats()["size"], 3)
+
+if __name__ == '__main__':
+    unittest.main()
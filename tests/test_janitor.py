@@ -0,0 +1,74 @@
+import os
+import shutil
+import time
+import unittest
+from ascii2png.janitor import OutputCatalog, OutputJanitor
+
+class TestOutputCatalog(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "tests_output_janitor"
+        os.makedirs(self.test_dir, exist_ok=True)
+        now = time.time()
+        self.paths = []
+        for i in range(5):
+            path = os.path.join(self.test_dir, f"f{i}_opt.png")
+            with open(path, "wb") as f:
+                f.write(b"x" * 100)
+            os.utime(path, (now - 100 + i, now - 100 + i))  # f0 is oldest
+            self.paths.append(path)
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_rebuild_indexes_all_files(self):
+        catalog = OutputCatalog(self.test_dir)
+        self.assertEqual(catalog.rebuild(), 5)
+        self.assertEqual(catalog.total_bytes, 500)
+        self.assertEqual(catalog.oldest()[2], self.paths[0])
+
+    def test_count_and_byte_quotas_remove_oldest(self):
+        catalog = OutputCatalog(self.test_dir)
+        catalog.rebuild()
+        self.assertEqual(catalog.enforce(max_files=3), 2)
+        self.assertEqual(sorted(os.listdir(self.test_dir)), ["f2_opt.png", "f3_opt.png", "f4_opt.png"])
+        self.assertEqual(catalog.enforce(max_total_bytes=150), 2)
+        self.assertEqual(os.listdir(self.test_dir), ["f4_opt.png"])
+
+    def test_age_quota(self):
+        catalog = OutputCatalog(self.test_dir)
+        catalog.rebuild()
+        self.assertEqual(catalog.enforce(max_age_seconds=97.5), 3)
+        self.assertEqual(len(catalog), 2)
+
+    def test_recorded_touch_protects_file(self):
+        catalog = OutputCatalog(self.test_dir)
+        catalog.rebuild()
+        os.utime(self.paths[0], None)
+        catalog.record(self.paths[0])
+        catalog.enforce(max_files=4)
+        self.assertTrue(os.path.exists(self.paths[0]))
+        self.assertFalse(os.path.exists(self.paths[1]))
+
+    def test_touch_by_other_process_is_noticed(self):
+        catalog = OutputCatalog(self.test_dir)
+        catalog.rebuild()
+        os.utime(self.paths[0], None)  # not recorded in this catalogue
+        catalog.enforce(max_files=4)
+        self.assertTrue(os.path.exists(self.paths[0]))
+        self.assertEqual(len(os.listdir(self.test_dir)), 4)
+
+    def test_janitor_thread(self):
+        janitor = OutputJanitor(OutputCatalog(self.test_dir), max_files=2, interval=0.01)
+        janitor.start()
+        try:
+            deadline = time.time() + 5
+            while len(os.listdir(self.test_dir)) > 2 and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            janitor.stop(timeout=5)
+        self.assertEqual(len(os.listdir(self.test_dir)), 2)
+        self.assertEqual(janitor.removed, 3)
+
+if __name__ == '__main__':
+    unittest.main()
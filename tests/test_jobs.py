@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from ascii2png.jobs import CANCELLED, DONE, FAILED, QUEUED, RUNNING, JobQueue
+
+def _wait(queue, job_id, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job.status in (DONE, FAILED, CANCELLED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.state_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.executor.shutdown(wait=True)
+        shutil.rmtree(self.state_dir)
+
+    def test_job_lifecycle(self):
+        queue = JobQueue(self.executor, state_dir=self.state_dir)
+        job = queue.submit(sum, [1, 2, 3])
+        job = _wait(queue, job.id)
+        self.assertEqual(job.status, DONE)
+        self.assertEqual(job.result, 6)
+        self.assertIsNotNone(job.started_at)
+        self.assertGreaterEqual(job.finished_at, job.started_at)
+
+    def test_running_only_once_started(self):
+        queue = JobQueue(self.executor, state_dir=self.state_dir)
+        blocker = queue.submit(time.sleep, 0.3)
+        job = queue.submit(sum, [1])
+        deadline = time.time() + 5
+        while queue.get(blocker.id).status != RUNNING and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertIsNotNone(queue.get(blocker.id).started_at)
+        self.assertEqual(queue.get(job.id).status, QUEUED)
+        # Another process sees the same state without writing it
+        self.assertEqual(JobQueue(self.executor, state_dir=self.state_dir).get(blocker.id).status, RUNNING)
+        self.assertEqual(_wait(queue, job.id).status, DONE)
+        self.assertEqual(sorted(os.listdir(self.state_dir)), sorted(f"{j.id}.json" for j in (blocker, job)))
+
+    def test_failure_is_reported(self):
+        queue = JobQueue(self.executor)
+        job = _wait(queue, queue.submit(int, "not a number").id)
+        self.assertEqual(job.status, FAILED)
+        self.assertIn("invalid literal", job.error)
+
+    def test_cancel_queued_job(self):
+        queue = JobQueue(self.executor)
+        blocker = queue.submit(time.sleep, 0.3)
+        job = queue.submit(sum, [1])
+        self.assertEqual(queue.cancel(job.id).status, CANCELLED)
+        _wait(queue, blocker.id)
+        self.assertEqual(queue.get(job.id).status, CANCELLED)
+        self.assertIsNone(queue.get(job.id).result)
+
+    def test_state_visible_to_other_process(self):
+        owner = JobQueue(self.executor, state_dir=self.state_dir)
+        job = _wait(owner, owner.submit(sum, [2, 2]).id)
+        other = JobQueue(self.executor, state_dir=self.state_dir)
+        seen = other.get(job.id)
+        self.assertEqual(seen.status, DONE)
+        self.assertEqual(seen.result, 4)
+        self.assertIsNone(other.get("../../etc/passwd"))
+
+    def test_ttl_expiry(self):
+        queue = JobQueue(self.executor, ttl=0.05, state_dir=self.state_dir)
+        job = _wait(queue, queue.submit(sum, [1]).id)
+        time.sleep(0.1)
+        self.assertIsNone(queue.get(job.id))
+        queue.sweep(min_interval=0)
+        self.assertEqual(os.listdir(self.state_dir), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import pickle
+import sys
+import unittest
+from ascii2png.parser import Node
+from ascii2png.layout import Scene, layout_tree
+from ascii2png.theme import get_theme
+
+def _chain(depth):
+    root = Node("root")
+    node = root
+    for i in range(depth):
+        child = Node(f"n{i}")
+        node.add_child(child)
+        node = child
+    return root
+
+class TestLayout(unittest.TestCase):
+    def test_horizontal_positions(self):
+        root = Node("root")
+        a, b = Node("a"), Node("b")
+        root.add_child(a)
+        root.add_child(b)
+        a.add_child(Node("a1"))
+        colors = get_theme("minimal", 20)
+        scene = layout_tree(root, 1080, 20, colors)
+        ys = [t.y for t in scene.texts]
+        self.assertEqual([t.text for t in scene.texts], ["root", "a", "a1", "b"])
+        self.assertEqual(ys, [40.0, 94.0, 130.0, 166.0])
+        # Root backbone spans first to last child
+        backbone = scene.lines[0]
+        self.assertEqual((backbone.y1, backbone.y2), (94.0 + 10, 166.0 + 10))
+
+    def test_deep_tree_does_not_recurse(self):
+        depth = sys.getrecursionlimit() + 500
+        for mode in ("horizontal", "vertical"):
+            colors = get_theme("minimal", 12)
+            colors["layout_mode"] = mode
+            scene = layout_tree(_chain(depth), 1080, 12, colors)
+            self.assertEqual(len(scene.texts), depth + 1)
+
+    def test_scene_bytes_round_trip(self):
+        root = Node("根目录")
+        root.add_child(Node("a"))
+        root.add_child(Node("b ✓"))
+        for mode in ("horizontal", "vertical"):
+            colors = get_theme("art", 20)
+            colors["layout_mode"] = mode
+            colors["line_style"] = "wave"
+            scene = layout_tree(root, 800, 20, colors)
+            for copy in (Scene.from_bytes(scene.to_bytes()), pickle.loads(pickle.dumps(scene))):
+                self.assertEqual((copy.width, copy.height, copy.bg, copy.bg_style), (scene.width, scene.height, scene.bg, scene.bg_style))
+                self.assertEqual(copy.extra_config, scene.extra_config)
+                for a, b in zip(copy.texts + copy.lines, scene.texts + scene.lines):
+                    self.assertEqual([getattr(a, k) for k in a.__slots__], [getattr(b, k) for k in b.__slots__])
+                self.assertEqual((len(copy.texts), len(copy.lines)), (len(scene.texts), len(scene.lines)))
+                # Colors are shared, not one tuple per item
+                self.assertIs(copy.lines[0].color, copy.lines[-1].color)
+
+    def test_scene_bytes_rejects_garbage(self):
+        with self.assertRaises(ValueError):
+            Scene.from_bytes(b"not a scene")
+
+if __name__ == '__main__':
+    unittest.main()
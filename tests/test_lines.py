@@ -0,0 +1,42 @@
+import unittest
+from PIL import Image, ImageDraw
+from ascii2png.core import CoreService
+from ascii2png.lines import STAMPED_STYLES, LineSpriteCache, draw_lines, get_line_cache
+from ascii2png.render import draw_line_styled
+
+TREE = "root\n" + "\n".join(f"├── dir{i}\n│   ├── a.txt\n│   └── b.txt" for i in range(6))
+
+class TestDrawLines(unittest.TestCase):
+    def test_matches_per_line_drawing(self):
+        for scale in (1.0, 1.5, 2.0):
+            for style in STAMPED_STYLES:
+                scene = CoreService.build_scene(TREE, 600, "wechat", 24, None, None)
+                size = (int(600 * scale), int(scene.height * scale))
+                expected = Image.new("RGB", size, "white")
+                draw = ImageDraw.Draw(expected)
+                for l in scene.lines:
+                    l.style = style
+                    draw_line_styled(draw, (l.x1 * scale, l.y1 * scale), (l.x2 * scale, l.y2 * scale),
+                                     style=style, width=max(1, int(l.width * scale)), color=l.color)
+                actual = Image.new("RGB", size, "white")
+                draw_lines(actual, scene.lines, scale)
+                self.assertEqual(expected.tobytes(), actual.tobytes(), (scale, style))
+
+    def test_repeated_shapes_hit_cache(self):
+        scene = CoreService.build_scene(TREE, 600, "wechat", 24, None, None)
+        for l in scene.lines:
+            l.style = "dotted"
+        cache = get_line_cache()
+        cache.clear()
+        draw_lines(Image.new("RGB", (1200, scene.height * 2), "white"), scene.lines, 2.0)
+        self.assertGreater(cache.stats()["hits"], cache.stats()["misses"])
+
+    def test_cache_bounded_by_bytes(self):
+        cache = LineSpriteCache(max_bytes=100)
+        for i in range(5):
+            cache.get(i, lambda: (Image.new("L", (5, 5)), (0, 0)))
+        self.assertLessEqual(cache.stats()["bytes"], 100)
+        self.assertEqual(cache.stats()["size"], 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import io
+import unittest
+from PIL import Image, ImageChops
+from ascii2png.core import CoreService
+from ascii2png.palette import IndexPalette, palette_supported, render_palette
+from ascii2png.render import _rasterize, render_scene_to_bytes
+
+TEXT = "root\n├── src\n│   ├── main.py\n│   └── util.py\n└── README.md"
+
+
+class TestPalette(unittest.TestCase):
+    def test_ramp_ends_at_background_and_color(self):
+        palette = IndexPalette((255, 255, 255))
+        index, level = palette.ramp((0, 0, 0))
+        self.assertEqual(index[0], 0)
+        self.assertEqual(level[0], 0)
+        self.assertEqual(palette.colors[index[255]], (0, 0, 0))
+        self.assertEqual(palette.flat((0, 0, 0)), index[255])
+        # Pattern colors never outrank antialiased edges
+        self.assertEqual(palette.strength[palette.flat((220, 220, 220), strength=0)], 0)
+
+    def test_matches_rgb_render(self):
+        for theme in ("minimal", "business", "dark"):
+            scene = CoreService.build_scene(TEXT, width=600, theme=theme)
+            self.assertTrue(palette_supported(scene))
+            img = render_palette(scene, 600)
+            self.assertEqual(img.mode, "P")
+            diff = ImageChops.difference(img.convert("RGB"), _rasterize(scene, 600, supersample=1)).convert("L")
+            # Edges take the nearest ramp shade; grid pixels under text edges are approximated
+            self.assertLessEqual(diff.getextrema()[1], 32, theme)
+
+    def test_render_bytes_uses_palette_for_flat_themes(self):
+        scene = CoreService.build_scene(TEXT, width=600, theme="minimal")
+        data = render_scene_to_bytes(scene, 600, max_bytes=None, supersample=1, profile="png-palette")
+        out = Image.open(io.BytesIO(data))
+        self.assertEqual(out.mode, "P")
+
+    def test_unsupported_background_falls_back(self):
+        scene = CoreService.build_scene(TEXT, width=600, theme="art")
+        self.assertFalse(palette_supported(scene))
+        data = render_scene_to_bytes(scene, 600, max_bytes=None, supersample=1, profile="png-palette")
+        self.assertEqual(Image.open(io.BytesIO(data)).size, (600, max(scene.height, 400)))
+
+
+if __name__ == "__main__":
+    unittest.main()
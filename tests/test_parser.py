@@ -0,0 +1,129 @@
+import io
+import random
+import re
+import time
+import unittest
+from ascii2png import parser
+
+
+# Reference copy of the previous regex-based parser, used as the fuzz oracle
+class _RefNode:
+    def __init__(self, label):
+        self.label = label.strip()
+        self.children = []
+
+def _legacy_parse(text):
+    lines = [l.rstrip("\n") for l in text.splitlines() if l.strip()]
+    if any(re.search(r"[├└│─┴┬┼]+", l) for l in lines) or any(
+        ("├" in l or "└" in l or "│" in l or "──" in l) for l in lines
+    ) or any(re.search(r"^\s*[\|\+\-]+", l) for l in lines):
+        return _legacy_tree(lines)
+    return _legacy_indent(lines)
+
+def _legacy_tree(lines):
+    root_label = _legacy_clean(lines[0])
+    for l in lines:
+        s = l.strip()
+        if s and not re.match(r"^[\|\-\+\s│├└─]+$", s):
+            root_label = _legacy_clean(s)
+            break
+    root = _RefNode(root_label)
+    stack = [(0, root)]
+    for line in lines:
+        m = re.match(r"^(\s*(?:│\s{3}|\s{4})*)(├──|└──|\|\-|\+\-|\-|\+)?\s*(.*)$", line)
+        if not m:
+            continue
+        indent_str, _, content = m.groups()
+        if not content.strip():
+            continue
+        depth = parser._depth_from_indent(indent_str)
+        node = _RefNode(content)
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        (stack[-1][1] if stack else root).children.append(node)
+        stack.append((depth, node))
+    if not root.children and len(lines) > 1:
+        return _legacy_indent(lines)
+    return root
+
+def _legacy_indent(lines):
+    root = _RefNode(_legacy_clean(lines[0]))
+    stack = [(0, root)]
+    for line in lines[1:]:
+        indent = len(line) - len(line.lstrip(" "))
+        depth = indent // 2 if indent >= 2 else (1 if indent > 0 else 0)
+        node = _RefNode(_legacy_clean(line))
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        (stack[-1][1] if stack else root).children.append(node)
+        stack.append((depth, node))
+    return root
+
+def _legacy_clean(line):
+    return re.sub(r"^[\|\-\+\s│├└─]+", "", line).strip()
+
+def _shape(node):
+    return (node.label, [_shape(c) for c in node.children])
+
+_PIECES = ["│   ", "│  ", "    ", "  ", " ", "\t", "　", "├── ", "└── ", "├──", "|-", "+-",
+           "-", "+", "|", "─", "┬", "┼", "a", "b c", "名称", "x.py", "\r", "\x0c"]
+
+def _random_text(rng, max_lines):
+    lines = []
+    for _ in range(rng.randint(1, max_lines)):
+        lines.append("".join(rng.choice(_PIECES) for _ in range(rng.randint(0, 6))))
+    return rng.choice(["\n", "\r\n"]).join(lines)
+
+
+class TestParser(unittest.TestCase):
+    def test_fuzz_matches_legacy(self):
+        rng = random.Random(20240601)
+        checked = 0
+        for _ in range(3000):
+            text = _random_text(rng, parser._LOOKAHEAD)
+            if not text.strip():
+                continue
+            expected = _shape(_legacy_parse(text))
+            self.assertEqual(_shape(parser.parse(text)), expected, repr(text))
+            self.assertEqual(_shape(parser.parse(text, compact=True).root), expected, repr(text))
+            checked += 1
+        self.assertGreater(checked, 2000)
+
+    def test_streaming_sources(self):
+        text = "project\n├── src\n│   └── main.py\n└── README.md\n"
+        expected = _shape(parser.parse(text))
+        self.assertEqual(_shape(parser.parse(io.StringIO(text))), expected)
+        self.assertEqual(_shape(parser.parse(iter(text.splitlines(True)))), expected)
+
+    def test_rejects_empty(self):
+        for bad in ("", "   \n  ", None, b"root"):
+            with self.assertRaises(ValueError):
+                parser.parse(bad)
+        with self.assertRaises(ValueError):
+            parser.parse(iter(["  ", "\n"]))
+
+    def test_whitespace_heavy_lines_are_linear(self):
+        line = " \t" * 100_000 + "│   " * 20_000 + "├── x"
+        text = "root\n" + "\n".join([line] * 5)
+        start = time.perf_counter()
+        root = parser.parse(text)
+        self.assertLess(time.perf_counter() - start, 2.0)
+        count, stack = 0, [root]
+        while stack:
+            node = stack.pop()
+            count += 1
+            stack.extend(node.children)
+        self.assertEqual(count, 7)
+
+    def test_scales_linearly(self):
+        def run(n):
+            text = "root\n" + "\n".join("│   " * (i % 8) + "├── item" for i in range(n))
+            start = time.perf_counter()
+            parser.parse(text, compact=True)
+            return time.perf_counter() - start
+        run(2_000)
+        small, large = run(10_000), run(40_000)
+        self.assertLess(large, small * 12)
+
+if __name__ == '__main__':
+    unittest.main()
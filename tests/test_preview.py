@@ -0,0 +1,63 @@
+import io
+import unittest
+from PIL import Image, ImageChops
+from ascii2png.core import CoreService
+from ascii2png.preview import PreviewSession, PreviewSessions
+from ascii2png.render import _rasterize
+from ascii2png.workers import RenderTimeout
+
+TEXT = "root\n" + "\n".join("│   " * (i % 4) + f"├── item {i}" for i in range(60))
+
+
+class TestPreviewSession(unittest.TestCase):
+    def _check(self, session, text, **options):
+        png = session.update(text)
+        scene = CoreService.build_scene(text, width=session.width, **options)
+        full = _rasterize(scene, session.width, supersample=session.scale)
+        img = Image.open(io.BytesIO(png)).convert("RGB")
+        self.assertIsNone(ImageChops.difference(full, img).getbbox())
+        return img
+
+    def test_edits_match_full_render(self):
+        options = {"theme": "business", "layout_options": {"line_style": "dashed"}}
+        session = PreviewSession(width=500, supersample=2, band_height=48, **options)
+        self._check(session, TEXT, **options)
+        h = Image.open(io.BytesIO(session.png)).size[1]
+        self.assertEqual(session.repainted_rows, h)
+
+        edited = TEXT.replace("item 30", "item thirty")
+        self._check(session, edited, **options)
+        self.assertLess(session.repainted_rows, h // 4)
+
+        inserted = edited.replace("├── item 50\n", "├── item 50\n├── new\n")
+        self._check(session, inserted, **options)
+        deleted = inserted.replace("├── item 10\n", "")
+        self._check(session, deleted, **options)
+
+    def test_unchanged_text_is_cached(self):
+        session = PreviewSession(width=400, supersample=1)
+        first = session.update(TEXT)
+        self.assertIs(session.update(TEXT), first)
+        self.assertEqual(session.repainted_rows, 0)
+
+    def test_deadline_keeps_previous_image(self):
+        session = PreviewSession(width=400, supersample=1)
+        first = session.update(TEXT)
+        with self.assertRaises(RenderTimeout):
+            session.update(TEXT + "\n└── late", deadline=0)
+        self.assertIs(session.png, first)
+        self.assertEqual(session.text, TEXT)
+
+    def test_sessions_reuse_and_expire(self):
+        store = PreviewSessions(max_sessions=2)
+        sid, session = store.get(None, width=400, theme="dark")
+        self.assertIs(store.get(sid, width=400, theme="dark")[1], session)
+        other_sid, other = store.get(sid, width=400, theme="art")
+        self.assertNotEqual(other_sid, sid)
+        store.get(None, width=300)
+        store.get(None, width=200)
+        self.assertEqual(len(store), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import io
+import shutil
+import unittest
+from PIL import Image
+from ascii2png.core import CoreService
+from PIL import ImageChops
+from ascii2png.render import render_scene_to_bytes, render_scene_banded, _rasterize, _fill_rect_aa
+from ascii2png.parallel import rasterize_parallel
+
+TEXT = "project\n├── src\n│   ├── main.py\n│   └── util.py\n└── README.md"
+
+class TestRender(unittest.TestCase):
+    def _size(self, data):
+        return Image.open(io.BytesIO(data)).size
+
+    def test_supersample_factors_keep_output_size(self):
+        scene = CoreService.build_scene(TEXT, width=600, theme="business")
+        sizes = {self._size(render_scene_to_bytes(scene, 600, supersample=f)) for f in (1, 1.5, 2, 3)}
+        self.assertEqual(sizes, {(600, max(scene.height, 400))})
+
+    def test_invalid_supersample(self):
+        scene = CoreService.build_scene(TEXT, width=600)
+        with self.assertRaises(ValueError):
+            render_scene_to_bytes(scene, 600, supersample=0.5)
+
+    def test_native_mode_draws_lines(self):
+        scene = CoreService.build_scene(TEXT, width=600, theme="minimal")
+        img = Image.open(io.BytesIO(render_scene_to_bytes(scene, 600, supersample=1))).convert("RGB")
+        line = scene.lines[0]
+        x, y = int(line.x1), int((line.y1 + line.y2) / 2)
+        self.assertNotEqual(img.getpixel((x, y)), (255, 255, 255))
+
+    def test_fill_rect_aa_coverage(self):
+        img = Image.new("L", (4, 3), 0)
+        _fill_rect_aa(img, 0.5, 1.0, 3.0, 2.0, 255)
+        self.assertEqual([img.getpixel((x, 1)) for x in range(4)], [128, 255, 255, 0])
+        self.assertEqual(img.getpixel((1, 0)), 0)
+
+    def test_banded_matches_monolithic(self):
+        text = "root\n" + "\n".join("│   " * (i % 4) + f"├── item {i}" for i in range(60))
+        for theme, style in (("business", "dashed"), ("art", "wave"), ("dark", "dotted")):
+            scene = CoreService.build_scene(text, width=500, theme=theme, layout_options={"line_style": style})
+            for factor in (1, 2):
+                buf = io.BytesIO()
+                render_scene_banded(scene, 500, buf, supersample=factor, band_height=70)
+                banded = Image.open(io.BytesIO(buf.getvalue())).convert("RGB")
+                full = _rasterize(scene, 500, supersample=factor)
+                self.assertIsNone(ImageChops.difference(full, banded).getbbox(), (theme, factor))
+
+    def test_parallel_matches_serial(self):
+        text = "root\n" + "\n".join("│   " * (i % 4) + f"├── item {i}" for i in range(60))
+        scene = CoreService.build_scene(text, width=500, theme="business", layout_options={"line_style": "dotted"})
+        full = _rasterize(scene, 500)
+        for executor in ("thread", "process"):
+            tiled = rasterize_parallel(scene, 500, workers=2, executor=executor, tile_height=90)
+            self.assertIsNone(ImageChops.difference(full, tiled).getbbox(), executor)
+
+    def test_banded_convert(self):
+        path = CoreService.convert(text=TEXT, output_dir="tests_output_render", banded=True)
+        try:
+            with Image.open(path) as img:
+                self.assertEqual(img.width, 1080)
+        finally:
+            shutil.rmtree("tests_output_render", ignore_errors=True)
+
+if __name__ == '__main__':
+    unittest.main()
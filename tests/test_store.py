@@ -0,0 +1,50 @@
+import unittest
+import os
+import shutil
+from PIL import Image
+from ascii2png.core import CoreService
+from ascii2png.store import OutputStore, render_key, normalize_text, atomic_save
+
+class TestOutputStore(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "tests_output_store"
+        os.makedirs(self.test_dir, exist_ok=True)
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_render_key_normalizes_text(self):
+        self.assertEqual(normalize_text("a\r\n\n  b\n"), "a\n  b")
+        self.assertEqual(render_key("a\r\nb", width=1080), render_key("a\n\nb\n", width=1080))
+        self.assertNotEqual(render_key("a\nb", width=1080), render_key("a\nb", width=720))
+        self.assertNotEqual(
+            render_key("a", layout_options={"line_style": "solid"}),
+            render_key("a", layout_options={"line_style": "dotted"}),
+        )
+
+    def test_key_of_inverts_path_for(self):
+        store = OutputStore(self.test_dir)
+        key = render_key("a", width=1080)
+        self.assertEqual(store.key_of(store.path_for(key, "my_tree", ".svg")), key)
+        self.assertEqual(store.key_of(store.path_for(key)), key)
+        self.assertIsNone(store.key_of("tree_notakey.png"))
+
+    def test_atomic_save_leaves_no_temp_files(self):
+        path = os.path.join(self.test_dir, "x.png")
+        atomic_save(Image.new("RGB", (4, 4)), path, format="PNG")
+        self.assertEqual(os.listdir(self.test_dir), ["x.png"])
+
+    def test_convert_dedups_identical_requests(self):
+        text = "root\n├── a\n└── b"
+        p1 = CoreService.convert(text=text, output_dir=self.test_dir, filename_hint="dedup")
+        mtime = os.path.getmtime(p1)
+        p2 = CoreService.convert(text=text + "\n", output_dir=self.test_dir, filename_hint="dedup")
+        self.assertEqual(p1, p2)
+        self.assertEqual(len(os.listdir(self.test_dir)), 1)
+        self.assertGreaterEqual(os.path.getmtime(p2), mtime)
+        p3 = CoreService.convert(text=text, theme="dark", output_dir=self.test_dir, filename_hint="dedup")
+        self.assertNotEqual(p1, p3)
+
+if __name__ == '__main__':
+    unittest.main()
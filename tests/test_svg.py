@@ -0,0 +1,84 @@
+import shutil
+import unittest
+import xml.etree.ElementTree as ET
+from unittest import mock
+from PIL import ImageDraw
+from ascii2png.background import get_layer_cache
+from ascii2png.core import CoreService
+from ascii2png.render import DEFAULT_SUPERSAMPLE
+from ascii2png.svg import render_scene_svg
+
+TEXT = "root <&>\n├── src\n│   ├── main.py\n│   └── util.py\n└── README.md"
+NS = "{http://www.w3.org/2000/svg}"
+
+
+class TestSvg(unittest.TestCase):
+    def _svg(self, **options):
+        scene = CoreService.build_scene(TEXT, width=600, **options)
+        return scene, ET.fromstring(render_scene_svg(scene, 600))
+
+    def test_canvas_and_items(self):
+        scene, root = self._svg(theme="business")
+        self.assertEqual((root.get("width"), root.get("height")), ("600", str(max(scene.height, 400))))
+        self.assertEqual(len(root.findall(f".//{NS}line")), len(scene.lines))
+        texts = [t.text for t in root.iter(f"{NS}text")]
+        self.assertEqual(texts, [t.text for t in scene.texts])
+        # Grid background is a pattern fill
+        self.assertIsNotNone(root.find(f".//{NS}pattern"))
+
+    def test_line_styles_and_vertical_text(self):
+        for style, tag in (("wave", "polyline"), ("cloud", "path"), ("dashed", "line"), ("dotted", "line")):
+            scene, root = self._svg(theme="art", layout_options={"line_style": style, "layout_mode": "vertical"})
+            self.assertEqual(len(root.findall(f".//{NS}{tag}")), len(scene.lines), style)
+            # One tspan per glyph, stacked downwards
+            spans = root.findall(f".//{NS}tspan")
+            self.assertEqual(len(spans), sum(len(t.text) for t in scene.texts))
+
+    def test_circles_match_raster(self):
+        drawn = []
+        ellipse = ImageDraw.ImageDraw.ellipse
+
+        def record(draw, xy, *args, **kwargs):
+            drawn.append([v / DEFAULT_SUPERSAMPLE for point in xy for v in point])
+            return ellipse(draw, xy, *args, **kwargs)
+
+        with mock.patch.object(ImageDraw.ImageDraw, "ellipse", record):
+            get_layer_cache().clear()
+            CoreService.convert_bytes("a", width=600, theme="art", max_bytes=None)
+        scene = CoreService.build_scene("a", width=600, theme="art")
+        root = ET.fromstring(render_scene_svg(scene, 600))
+        circles = [[float(c.get(k)) for k in ("cx", "cy", "r")] for c in root.findall(f"{NS}circle")]
+        self.assertEqual(circles, [[(x0 + x1) / 2, (y0 + y1) / 2, (x1 - x0) / 2] for x0, y0, x1, y1 in drawn])
+
+    def test_custom_font_family_listed_first(self):
+        font = mock.Mock(path="/fonts/custom.ttf")
+        font.getmetrics.return_value = (20, 5)
+        font.getname.return_value = ("Custom Sans", "Regular")
+        scene = CoreService.build_scene(TEXT, width=600, theme="minimal")
+        with mock.patch("ascii2png.svg.get_font", return_value=font):
+            root = ET.fromstring(render_scene_svg(scene, 600, font_path="/fonts/custom.ttf"))
+        self.assertTrue(root.find(f"{NS}g[@font-family]").get("font-family").startswith("'Custom Sans', "))
+
+    def test_control_characters_dropped(self):
+        # Colourised `tree -C` output carries ESC, which XML 1.0 forbids
+        for mode in ("horizontal", "vertical"):
+            scene = CoreService.build_scene("\x1b[01;34mdir\x1b[0m", width=600, theme="minimal",
+                                            layout_options={"layout_mode": mode})
+            root = ET.fromstring(render_scene_svg(scene, 600))
+            self.assertIn("dir", "".join(root.itertext()), mode)
+
+    def test_convert_writes_svg(self):
+        out = "tests_output_svg"
+        try:
+            path = CoreService.convert(TEXT, output_dir=out, output_format="svg")
+            self.assertTrue(path.endswith(".svg"))
+            self.assertEqual(CoreService.convert(TEXT, output_dir=out, output_format="svg"), path)
+            self.assertNotEqual(CoreService.artifact_path(TEXT, output_dir=out), path)
+            with self.assertRaises(ValueError):
+                CoreService.convert(TEXT, output_dir=out, output_format="gif")
+        finally:
+            shutil.rmtree(out, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
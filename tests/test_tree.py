@@ -0,0 +1,44 @@
+import unittest
+from ascii2png import parser
+from ascii2png.tree import CompactTree
+
+TEXT = """project
+├── src
+│   ├── main.py
+│   └── util.py
+└── README.md
+"""
+
+def _shape(node):
+    return (node.label, [_shape(c) for c in node.children])
+
+class TestCompactTree(unittest.TestCase):
+    def test_matches_node_parse(self):
+        tree = parser.parse(TEXT, compact=True)
+        self.assertIsInstance(tree, CompactTree)
+        self.assertEqual(_shape(tree.root), _shape(parser.parse(TEXT)))
+
+    def test_indent_style(self):
+        text = "root\n  a\n    b\n  c"
+        self.assertEqual(_shape(parser.parse(text, compact=True).root), _shape(parser.parse(text)))
+
+    def test_arrays(self):
+        tree = CompactTree("root")
+        a = tree.add(0, " a ")
+        b = tree.add(0, "b")
+        a1 = tree.add(a, "a1")
+        self.assertEqual(len(tree), 4)
+        self.assertEqual(tree.label(a), "a")
+        self.assertEqual(list(tree.parent), [-1, 0, 0, a])
+        self.assertEqual(list(tree.depth), [0, 1, 1, 2])
+        self.assertEqual(tree.children(0), [a, b])
+        # Insertion order differs from pre-order here
+        self.assertEqual(tree.preorder(), [0, a, a1, b])
+        labels, depths, first_child, next_sibling = tree.flatten()
+        self.assertEqual(labels, ["root", "a", "a1", "b"])
+        self.assertEqual(depths, [0, 1, 2, 1])
+        self.assertEqual(first_child, [1, 2, -1, -1])
+        self.assertEqual(next_sibling, [-1, 3, -1, -1])
+
+if __name__ == '__main__':
+    unittest.main()
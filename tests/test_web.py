@@ -1,7 +1,23 @@
 import unittest
 import json
 import os
+import shutil
+import tempfile
+import time
+import web_app
 from web_app import app
+from ascii2png.workers import PoolBusy, RenderTimeout
+
+def setUpModule():
+    # Job state goes to a scratch directory instead of the repo's jobs/
+    web_app.JOBS_DIR = tempfile.mkdtemp()
+    web_app._job_queue = None
+
+def tearDownModule():
+    if web_app._job_queue is not None:
+        web_app._job_queue.executor.shutdown()
+        web_app._job_queue = None
+    shutil.rmtree(web_app.JOBS_DIR, ignore_errors=True)
 
 class TestWebApp(unittest.TestCase):
     def setUp(self):
@@ -36,5 +52,207 @@ class TestWebApp(unittest.TestCase):
                                   content_type='application/json')
         self.assertEqual(response.status_code, 400)
 
+    def test_render_api_streams_png(self):
+        payload = {"text": "root\n├── a\n└── b", "theme": "dark", "line_color": "#ff0000"}
+        response = self.client.post('/render',
+                                  data=json.dumps(payload),
+                                  content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'image/png')
+        self.assertTrue(response.data.startswith(b'\x89PNG'))
+        self.assertEqual(response.content_length, len(response.data))
+
+    def test_render_api_formats(self):
+        payload = {"text": "root\n├── a\n└── b", "format": "svg"}
+        response = self.client.post('/render', data=json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'image/svg+xml')
+        self.assertIn(b'<svg', response.data)
+        payload["format"] = "webp"
+        response = self.client.post('/render', data=json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.mimetype, 'image/webp')
+        self.assertTrue(response.data.startswith(b'RIFF'))
+        payload["format"] = "gif"
+        response = self.client.post('/render', data=json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_render_api_empty_text(self):
+        response = self.client.post('/render',
+                                  data=json.dumps({"text": ""}),
+                                  content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_generate_batch(self):
+        payload = {"items": [{"text": "root\n└── a"}, {"text": ""}, {"text": "root\n└── b", "theme": "dark"}]}
+        response = self.client.post('/generate_batch',
+                                  data=json.dumps(payload),
+                                  content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        results = json.loads(response.data)['results']
+        self.assertEqual(len(results), 3)
+        self.assertIn('image_url', results[0])
+        self.assertIn('error', results[1])
+        self.assertIn('image_url', results[2])
+
+    def test_generate_batch_requires_items(self):
+        response = self.client.post('/generate_batch',
+                                  data=json.dumps({"items": []}),
+                                  content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_saturated_pool_returns_429(self):
+        class BusyPool:
+            def run(self, *args, **kwargs):
+                raise PoolBusy("Render queue is full")
+        original = web_app._render_pool
+        web_app._render_pool = BusyPool()
+        try:
+            response = self.client.post('/render',
+                                      data=json.dumps({"text": "root\n└── busy"}),
+                                      content_type='application/json')
+        finally:
+            web_app._render_pool = original
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response.headers)
+
+    def test_render_timeout_returns_503(self):
+        class SlowPool:
+            def run(self, *args, **kwargs):
+                raise RenderTimeout("Render timed out")
+        original = web_app._render_pool
+        web_app._render_pool = SlowPool()
+        try:
+            response = self.client.post('/generate',
+                                      data=json.dumps({"text": "root\n└── slow 503"}),
+                                      content_type='application/json')
+        finally:
+            web_app._render_pool = original
+        self.assertEqual(response.status_code, 503)
+
+    def _wait_job(self, job_id):
+        for _ in range(600):
+            status = json.loads(self.client.get(f"/jobs/{job_id}").data)
+            if status['status'] not in ('queued', 'running'):
+                return status
+            time.sleep(0.05)
+        return status
+
+    def test_job_api(self):
+        payload = {"text": "root\n├── job\n└── api"}
+        response = self.client.post('/jobs',
+                                  data=json.dumps(payload),
+                                  content_type='application/json')
+        self.assertEqual(response.status_code, 202)
+        job = json.loads(response.data)
+        status = self._wait_job(job['id'])
+        self.assertEqual(status['status'], 'done')
+        self.assertIn('image_url', status)
+        result = self.client.get(f"/jobs/{job['id']}/result")
+        self.assertEqual(result.status_code, 200)
+        self.assertTrue(result.data.startswith(b'\x89PNG'))
+        result.close()
+
+    def test_preview_session(self):
+        payload = {"text": "root\n├── a\n└── b", "supersample": 1}
+        first = self.client.post('/preview', data=json.dumps(payload), content_type='application/json')
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.data.startswith(b'\x89PNG'))
+        payload.update(text="root\n├── a\n└── c", session=first.headers['X-Preview-Session'])
+        second = self.client.post('/preview', data=json.dumps(payload), content_type='application/json')
+        self.assertEqual(second.headers['X-Preview-Session'], payload['session'])
+        self.assertLess(int(second.headers['X-Preview-Repainted']), int(first.headers['X-Preview-Repainted']))
+
+    def test_serve_image_caching(self):
+        payload = {"text": "root\n├── cached", "supersample": 1}
+        url = self.client.post('/generate', data=json.dumps(payload), content_type='application/json').json['image_url']
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        self.assertIn(etag.strip('"'), url)
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        response.close()
+        head = self.client.head(url)
+        self.assertEqual((head.status_code, head.data), (200, b''))
+        self.assertEqual(head.headers['ETag'], etag)
+        cached = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual((cached.status_code, cached.data), (304, b''))
+        self.assertEqual(self.client.get('/output/missing.png').status_code, 404)
+
+        # A job for the same input serves the same file with the same headers
+        job = self.client.post('/jobs', data=json.dumps(payload), content_type='application/json').json
+        self.assertEqual(self._wait_job(job['id'])['status'], 'done')
+        result_url = f"/jobs/{job['id']}/result"
+        response = self.client.get(result_url)
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        response.close()
+        cached = self.client.get(result_url, headers={'If-None-Match': etag})
+        self.assertEqual((cached.status_code, cached.data), (304, b''))
+
+    def test_render_url(self):
+        d = web_app.encode_text_param("root\r\n├── a\n\n└── b")
+        self.assertEqual(web_app.decode_text_param(d), "root\n├── a\n└── b")
+        response = self.client.get(f'/render.png?d={d}&theme=dark')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data.startswith(b'\x89PNG'))
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        cached = self.client.get(f'/render.png?d={d}&theme=dark', headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(cached.status_code, 304)
+        response.close()
+
+    def test_render_url_redirects_to_canonical_form(self):
+        d = web_app.encode_text_param("root\n└── a")
+        response = self.client.get(f'/render.png?line_color=%23FF8800&width=1080&theme=Dark&utm=x&d={d}')
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(response.headers['Location'], f'/render.png?d={d}&theme=dark&line_color=ff8800')
+        for query in ('', 'd=%21%21', f'd={d}&width=wide', f'd={d}&line_style=zigzag'):
+            self.assertEqual(self.client.get(f'/render.png?{query}').status_code, 400, query)
+        # Aliases redirect to the canonical theme name
+        response = self.client.get(f'/render.png?d={d}&theme=%E6%9A%97%E9%BB%91')
+        self.assertEqual(response.headers['Location'], f'/render.png?d={d}&theme=dark')
+
+    def test_rejects_unknown_theme_and_bad_width(self):
+        d = web_app.encode_text_param("root\n└── a")
+        for query in ('theme=neon', 'width=0', 'width=-5', 'width=100000'):
+            self.assertEqual(self.client.get(f'/render.png?d={d}&{query}').status_code, 400, query)
+        for body in ({'theme': 'neon'}, {'width': 0}, {'width': 10 ** 9}, {'width': None}):
+            payload = dict({"text": "+---+\n| A |\n+---+"}, **body)
+            response = self.client.post('/render', data=json.dumps(payload), content_type='application/json')
+            self.assertEqual(response.status_code, 400, body)
+
+    def test_post_rejects_invalid_fields(self):
+        text = "root\n└── a"
+        bodies = [[text], {"text": 5}, {"text": text, "theme": "neon"}, {"text": text, "theme": 5},
+                  {"text": text, "supersample": [1]}, {"text": text, "layout_mode": "diagonal"},
+                  {"text": text, "line_style": "zigzag"}, {"text": text, "line_color": 7}]
+        for route in ('/generate', '/render', '/jobs', '/preview'):
+            for body in bodies:
+                response = self.client.post(route, data=json.dumps(body), content_type='application/json')
+                self.assertEqual(response.status_code, 400, (route, body))
+        # In a batch, each bad item fails on its own
+        response = self.client.post('/generate_batch', data=json.dumps({"items": bodies + [{"text": text}]}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        results = json.loads(response.data)['results']
+        self.assertTrue(all('error' in r for r in results[:-1]))
+        self.assertIn('image_url', results[-1])
+
+    def test_preview_limits(self):
+        payload = {"text": "root\n" + "├── x\n" * web_app.PREVIEW_MAX_LINES}
+        response = self.client.post('/preview', data=json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.status_code, 413)
+        original = web_app.PREVIEW_TIMEOUT
+        web_app.PREVIEW_TIMEOUT = -1
+        try:
+            payload = {"text": "root\n└── preview deadline", "supersample": 1}
+            response = self.client.post('/preview', data=json.dumps(payload), content_type='application/json')
+        finally:
+            web_app.PREVIEW_TIMEOUT = original
+        self.assertEqual(response.status_code, 503)
+
+    def test_unknown_job(self):
+        self.assertEqual(self.client.get('/jobs/0123abcd').status_code, 404)
+        self.assertEqual(self.client.delete('/jobs/0123abcd').status_code, 404)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,53 @@
+import os
+import time
+import unittest
+from ascii2png.core import CoreService
+from ascii2png.workers import PoolBusy, RenderPool, RenderTimeout, RenderUnavailable
+
+class TestRenderPool(unittest.TestCase):
+    def test_runs_render_in_worker(self):
+        pool = RenderPool(workers=1, queue_depth=1, timeout=30)
+        try:
+            data = pool.run(CoreService.convert_bytes, "root\n└── a")
+            self.assertTrue(data.startswith(b"\x89PNG"))
+        finally:
+            pool.shutdown()
+
+    def test_rejects_when_saturated(self):
+        pool = RenderPool(workers=1, queue_depth=0, timeout=30)
+        try:
+            pool.start()
+            future = pool.submit(time.sleep, 1)
+            with self.assertRaises(PoolBusy):
+                pool.submit(time.sleep, 0)
+            future.result()
+            pool.run(time.sleep, 0)  # slot released again
+            self.assertEqual(pool.stats()["rejected"], 1)
+        finally:
+            pool.shutdown()
+
+    def test_timeout_aborts_in_worker(self):
+        pool = RenderPool(workers=1, queue_depth=0, timeout=0.5)
+        try:
+            pool.start()
+            started = time.monotonic()
+            with self.assertRaises(RenderTimeout):
+                pool.run(time.sleep, 10)
+            self.assertLess(time.monotonic() - started, 5)
+            # The worker is free again right away
+            pool.run(time.sleep, 0)
+        finally:
+            pool.shutdown()
+
+    def test_recovers_from_crashed_worker(self):
+        pool = RenderPool(workers=1, queue_depth=1, timeout=30)
+        try:
+            with self.assertRaises(RenderUnavailable):
+                pool.run(os._exit, 1)
+            self.assertEqual(pool.run(abs, -3), 3)
+            self.assertEqual(pool.stats()["restarts"], 1)
+        finally:
+            pool.shutdown()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,22 @@
-from flask import Flask, render_template, request, send_file, jsonify
+from flask import Flask, Response, redirect, render_template, request, send_file, jsonify
+from urllib.parse import urlencode
+import base64
+import multiprocessing
 import os
 import sys
+import threading
 import time
-import glob
-from ascii2png.core import CoreService
+import zlib
+from ascii2png.core import CoreService, MIMETYPES, OUTPUT_FORMATS
 from ascii2png.utils import hex_to_rgb
+from ascii2png.fonts import warm_fonts
+from ascii2png.theme import THEMES, canonical_theme, get_theme
+from ascii2png.render import DEFAULT_SUPERSAMPLE
+from ascii2png.store import OutputStore, normalize_text
+from ascii2png.janitor import OutputCatalog, OutputJanitor
+from ascii2png.workers import PoolBusy, RenderPool, RenderTimeout, RenderUnavailable
+from ascii2png.jobs import DONE, JobQueue
+from ascii2png.preview import PreviewSessions
 
 def resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller"""
@@ -29,86 +41,520 @@ OUTPUT_DIR = os.path.join(BASE_DIR, "output")
 if not os.path.exists(OUTPUT_DIR):
     os.makedirs(OUTPUT_DIR)
 
-def cleanup_old_files(max_age_seconds=3600):
-    """Delete files older than max_age_seconds in OUTPUT_DIR"""
+# Pre-load the faces used by the fixed web font size
+WEB_FONT_SIZE = 24
+warm_fonts([WEB_FONT_SIZE])
+
+# Output quotas: files unused for an hour, beyond the size budget or the
+# file-count budget are evicted by a background janitor, oldest first
+OUTPUT_MAX_AGE = int(os.environ.get("ASCII2PNG_OUTPUT_MAX_AGE", 3600))
+OUTPUT_MAX_BYTES = int(os.environ.get("ASCII2PNG_OUTPUT_MAX_BYTES", 512 * 1024 * 1024))
+OUTPUT_MAX_FILES = int(os.environ.get("ASCII2PNG_OUTPUT_MAX_FILES", 10000))
+JANITOR_INTERVAL = float(os.environ.get("ASCII2PNG_JANITOR_INTERVAL", 30))
+output_store = OutputStore(OUTPUT_DIR)
+output_catalog = OutputCatalog(OUTPUT_DIR)
+janitor = OutputJanitor(
+    output_catalog,
+    max_age_seconds=OUTPUT_MAX_AGE,
+    max_total_bytes=OUTPUT_MAX_BYTES,
+    max_files=OUTPUT_MAX_FILES,
+    interval=JANITOR_INTERVAL,
+)
+
+# Cache lifetime of content-addressed output files (one year)
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# GET /render.png: query parameters in canonical order with their defaults,
+# and the largest text (decompressed, in bytes) a URL may carry
+RENDER_URL_PARAMS = (
+    ('theme', 'minimal'),
+    ('width', '1080'),
+    ('layout_mode', 'horizontal'),
+    ('line_style', 'solid'),
+    ('line_color', ''),
+)
+RENDER_URL_MAX_TEXT = int(os.environ.get("ASCII2PNG_RENDER_URL_MAX_TEXT", 64 * 1024))
+LAYOUT_MODES = ('horizontal', 'vertical')
+LINE_STYLES = ('solid', 'dotted', 'dashed', 'wave', 'cloud')
+
+# Accepted output widths in pixels
+MIN_WIDTH = 200
+MAX_WIDTH = int(os.environ.get("ASCII2PNG_MAX_WIDTH", 4096))
+
+# Upper bound on the supersampling factor a request may ask for
+MAX_SUPERSAMPLE = 4
+
+# Batch endpoint limit
+MAX_BATCH_ITEMS = 100
+
+# Render worker pool: renders run in separate processes, at most
+# RENDER_WORKERS at a time plus RENDER_QUEUE_DEPTH waiting; anything beyond
+# that is rejected with 429, and a render over RENDER_TIMEOUT seconds with 503
+RENDER_WORKERS = int(os.environ.get("ASCII2PNG_RENDER_WORKERS", 0)) or None
+RENDER_QUEUE_DEPTH = int(os.environ.get("ASCII2PNG_RENDER_QUEUE_DEPTH", 8))
+RENDER_TIMEOUT = float(os.environ.get("ASCII2PNG_RENDER_TIMEOUT", 30))
+WORKER_MEMORY_MB = int(os.environ.get("ASCII2PNG_WORKER_MEMORY_MB", 0)) or None
+RETRY_AFTER_SECONDS = 2
+
+_render_pool = None
+_pool_lock = threading.Lock()
+
+def get_render_pool():
+    """Created on first use, so WSGI servers fork before any render process starts"""
+    global _render_pool
+    with _pool_lock:
+        if _render_pool is None:
+            _render_pool = RenderPool(
+                workers=RENDER_WORKERS,
+                queue_depth=RENDER_QUEUE_DEPTH,
+                timeout=RENDER_TIMEOUT,
+                font_sizes=(WEB_FONT_SIZE,),
+                memory_limit_mb=WORKER_MEMORY_MB,
+            )
+        return _render_pool
+
+def start_services():
+    """
+    Start the output janitor thread, and start and warm the render workers
+    now instead of on the first request. Call once per server process,
+    after it has forked: gunicorn.conf.py does so from post_worker_init,
+    __main__ before serving. Importing web_app starts nothing.
+    """
+    janitor.start()
+    get_render_pool().start()
+    get_job_queue().executor.start()
+
+# Asynchronous jobs get their own pool so long renders do not starve /generate.
+# The UI's Generate button goes through /jobs too, so by default the job pool
+# is as wide as the render pool
+JOB_WORKERS = int(os.environ.get("ASCII2PNG_JOB_WORKERS", 0)) or RENDER_WORKERS
+JOB_QUEUE_DEPTH = int(os.environ.get("ASCII2PNG_JOB_QUEUE_DEPTH", 32))
+JOB_TIMEOUT = float(os.environ.get("ASCII2PNG_JOB_TIMEOUT", 600))
+JOB_TTL = float(os.environ.get("ASCII2PNG_JOB_TTL", 3600))
+JOBS_DIR = os.path.join(BASE_DIR, "jobs")
+
+_job_queue = None
+
+def get_job_queue():
+    global _job_queue
+    with _pool_lock:
+        if _job_queue is None:
+            pool = RenderPool(
+                workers=JOB_WORKERS,
+                queue_depth=JOB_QUEUE_DEPTH,
+                timeout=JOB_TIMEOUT,
+                font_sizes=(WEB_FONT_SIZE,),
+                memory_limit_mb=WORKER_MEMORY_MB,
+            )
+            _job_queue = JobQueue(pool, ttl=JOB_TTL, state_dir=JOBS_DIR)
+        return _job_queue
+
+# Live preview sessions keep their last scene and image in this process and
+# repaint only the rows an edit touches. Previews render on the request
+# thread, outside the RenderPool's timeout and memory cap, so they are
+# bounded here instead: PREVIEW_CONCURRENCY previews at once (beyond that
+# 429), inputs up to PREVIEW_MAX_LINES / PREVIEW_MAX_CHARS (beyond that
+# 413, use Generate) and PREVIEW_TIMEOUT seconds per update (beyond that 503)
+PREVIEW_SESSIONS = int(os.environ.get("ASCII2PNG_PREVIEW_SESSIONS", 64))
+PREVIEW_TTL = float(os.environ.get("ASCII2PNG_PREVIEW_TTL", 900))
+PREVIEW_CONCURRENCY = int(os.environ.get("ASCII2PNG_PREVIEW_CONCURRENCY", 2))
+PREVIEW_MAX_LINES = int(os.environ.get("ASCII2PNG_PREVIEW_MAX_LINES", 500))
+PREVIEW_MAX_CHARS = int(os.environ.get("ASCII2PNG_PREVIEW_MAX_CHARS", 50000))
+PREVIEW_TIMEOUT = float(os.environ.get("ASCII2PNG_PREVIEW_TIMEOUT", 5))
+preview_sessions = PreviewSessions(max_sessions=PREVIEW_SESSIONS, ttl=PREVIEW_TTL)
+_preview_slots = threading.BoundedSemaphore(PREVIEW_CONCURRENCY)
+
+def _unavailable(error, status):
+    response = jsonify({'error': str(error)})
+    response.status_code = status
+    response.headers['Retry-After'] = str(RETRY_AFTER_SECONDS)
+    return response
+
+def cleanup_old_files():
+    """Run one janitor pass now (normally it runs in the background)"""
     try:
-        now = time.time()
-        for f in glob.glob(os.path.join(OUTPUT_DIR, "web_*.png")):
-            if os.path.isfile(f):
-                if now - os.path.getmtime(f) > max_age_seconds:
-                    try:
-                        os.remove(f)
-                    except OSError:
-                        pass
+        janitor.run_once()
     except Exception:
         pass
 
+def _served(path):
+    """Keep the janitor's catalogue current for a file handed to a client"""
+    output_catalog.record(path)
+    return os.path.basename(path)
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
+def _parse_theme(value):
+    theme_name = canonical_theme(value)
+    if theme_name is None:
+        raise ValueError(f'theme must be one of {", ".join(dict.fromkeys(THEMES.values()))}')
+    return theme_name
+
+def _parse_width(value):
+    try:
+        width = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('width must be an integer')
+    if not MIN_WIDTH <= width <= MAX_WIDTH:
+        raise ValueError(f'width must be between {MIN_WIDTH} and {MAX_WIDTH}')
+    return width
+
+def _render_options(data):
+    """
+    Translate a request body into CoreService keyword arguments. Every
+    invalid field, including one of the wrong JSON type, raises ValueError.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Request body must be a JSON object')
+    text = data.get('text', '')
+    if not isinstance(text, str):
+        raise ValueError('text must be a string')
+    theme_name = _parse_theme(data.get('theme', 'minimal'))
+    width = _parse_width(data.get('width', 1080))
+    
+    # Extended options
+    layout_mode = data.get('layout_mode', 'horizontal')
+    line_style = data.get('line_style', 'solid')
+    line_color = data.get('line_color')
+    try:
+        supersample = float(data.get('supersample', DEFAULT_SUPERSAMPLE))
+    except (TypeError, ValueError):
+        raise ValueError('supersample must be a number')
+    output_format = data.get('format', 'png')
+    
+    if not text.strip():
+        raise ValueError('Input text cannot be empty')
+    if layout_mode not in LAYOUT_MODES:
+        raise ValueError(f'layout_mode must be one of {", ".join(LAYOUT_MODES)}')
+    if line_style not in LINE_STYLES:
+        raise ValueError(f'line_style must be one of {", ".join(LINE_STYLES)}')
+    if line_color is not None and not isinstance(line_color, str):
+        raise ValueError('line_color must be a string')
+    if not 1 <= supersample <= MAX_SUPERSAMPLE:
+        raise ValueError(f'supersample must be between 1 and {MAX_SUPERSAMPLE}')
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f'format must be one of {", ".join(OUTPUT_FORMATS)}')
+
+    # Prepare options
+    layout_options = {
+        "layout_mode": layout_mode,
+        "line_style": line_style
+    }
+    
+    custom_colors = None
+    if line_color:
+        try:
+            rgb = hex_to_rgb(line_color)
+            # Override only the line color on top of the selected theme
+            custom_colors = get_theme(theme_name, WEB_FONT_SIZE)
+            custom_colors["line"] = rgb
+        except ValueError:
+            pass
+    
+    return {
+        "text": text,
+        "width": width,
+        "theme": theme_name,
+        "font_size": WEB_FONT_SIZE, # Fixed for web demo as per original
+        "custom_colors": custom_colors,
+        "layout_options": layout_options,
+        "supersample": int(supersample) if supersample.is_integer() else supersample,
+        "output_format": output_format,
+    }
+
 @app.route('/generate', methods=['POST'])
 def generate():
-    # Cleanup old files on every request (simple approach)
-    # Ideally this should be a background task
-    cleanup_old_files()
-
     try:
-        data = request.json
-        text = data.get('text', '')
-        theme_name = data.get('theme', 'minimal')
-        width = int(data.get('width', 1080))
-        
-        # Extended options
-        layout_mode = data.get('layout_mode', 'horizontal')
-        line_style = data.get('line_style', 'solid')
-        line_color = data.get('line_color')
-        
-        if not text.strip():
-            return jsonify({'error': 'Input text cannot be empty'}), 400
-
-        # Prepare options
-        layout_options = {
-            "layout_mode": layout_mode,
-            "line_style": line_style
-        }
-        
-        custom_colors = {}
-        if line_color:
-             try:
-                rgb = hex_to_rgb(line_color)
-                custom_colors["line"] = rgb
-             except ValueError:
-                pass
-        
-        # We need a unique filename for the web session
-        timestamp = int(time.time() * 1000)
-        filename_hint = f"web_{timestamp}"
+        try:
+            options = _render_options(request.json)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Use CoreService
-        path = CoreService.convert(
-            text=text,
-            width=width,
-            theme=theme_name,
-            font_size=24, # Fixed for web demo as per original
-            output_dir=OUTPUT_DIR,
-            custom_colors=custom_colors if custom_colors else None,
-            layout_options=layout_options,
-            filename_hint=filename_hint
-        )
+        # Outputs are content-addressed, so identical requests share one file
+        # and a cached one is answered without occupying a render worker
+        path = CoreService.artifact_path(output_dir=OUTPUT_DIR, filename_hint="web", **options)
+        if not output_store.lookup(path):
+            path = get_render_pool().run(CoreService.convert, output_dir=OUTPUT_DIR, filename_hint="web", **options)
         
         # Return the filename to be served
-        filename = os.path.basename(path)
+        filename = _served(path)
         return jsonify({'image_url': f'/output/{filename}', 'filename': filename})
 
+    except PoolBusy as e:
+        return _unavailable(e, 429)
+    except RenderUnavailable as e:
+        return _unavailable(e, 503)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/generate_batch', methods=['POST'])
+def generate_batch():
+    """Convert several requests at once; each item reports its own result"""
+    items = (request.json or {}).get('items')
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'items must be a non-empty list'}), 400
+    if len(items) > MAX_BATCH_ITEMS:
+        return jsonify({'error': f'At most {MAX_BATCH_ITEMS} items per batch'}), 400
+
+    results = [None] * len(items)
+    jobs = []
+    for index, item in enumerate(items):
+        try:
+            options = _render_options(item)
+        except ValueError as e:
+            results[index] = {'error': str(e)}
+            continue
+        jobs.append((index, dict(options, filename_hint="web")))
+
+    # Each distinct text is one pool task; items the pool rejects report the error
+    jobs_opts = [opts for _, opts in jobs]
+    for result in CoreService.convert_many(jobs_opts, output_dir=OUTPUT_DIR, executor=get_render_pool()):
+        index = jobs[result["index"]][0]
+        if result["error"]:
+            results[index] = {'error': result["error"]}
+        else:
+            filename = _served(result["path"])
+            results[index] = {'image_url': f'/output/{filename}', 'filename': filename}
+
+    return jsonify({'results': results})
+
+@app.route('/render', methods=['POST'])
+def render_png():
+    """Render and stream the image back directly, without an output file"""
+    try:
+        try:
+            options = _render_options(request.json)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        data = get_render_pool().run(CoreService.convert_bytes, **options)
+        response = Response(data, mimetype=MIMETYPES[options['output_format']])
+        response.content_length = len(data)
+        return response
+
+    except PoolBusy as e:
+        return _unavailable(e, 429)
+    except RenderUnavailable as e:
+        return _unavailable(e, 503)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def encode_text_param(text):
+    """The d= value of /render.png for text: base64url of its zlib-compressed UTF-8, unpadded"""
+    data = zlib.compress(normalize_text(text).encode('utf-8'), 9)
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+def decode_text_param(value):
+    """Inverse of encode_text_param; stops inflating at RENDER_URL_MAX_TEXT bytes"""
+    invalid = ValueError('d must be base64url-encoded, zlib-compressed UTF-8 text')
+    inflater = zlib.decompressobj()
+    try:
+        raw = inflater.decompress(base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)), RENDER_URL_MAX_TEXT)
+    except (ValueError, zlib.error):
+        raise invalid
+    if inflater.unconsumed_tail:
+        raise ValueError(f'Text is longer than {RENDER_URL_MAX_TEXT} bytes')
+    if not inflater.eof:
+        raise invalid
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        raise invalid
+
+def _canonical_render_query(args):
+    """
+    Decoded text and the canonical query string for /render.png: fixed
+    parameter order, defaults and unknown parameters dropped, the text
+    re-encoded in normal form and the line color as lowercase hex.
+    """
+    if not args.get('d'):
+        raise ValueError('d (the encoded text) is required')
+    text = decode_text_param(args['d'])
+    if not text.strip():
+        raise ValueError('Input text cannot be empty')
+    values = {name: args.get(name, default).strip().lower() or default for name, default in RENDER_URL_PARAMS}
+    values['theme'] = _parse_theme(values['theme'])
+    values['width'] = str(_parse_width(values['width']))
+    if values['layout_mode'] not in LAYOUT_MODES:
+        raise ValueError(f'layout_mode must be one of {", ".join(LAYOUT_MODES)}')
+    if values['line_style'] not in LINE_STYLES:
+        raise ValueError(f'line_style must be one of {", ".join(LINE_STYLES)}')
+    if values['line_color']:
+        try:
+            values['line_color'] = '%02x%02x%02x' % tuple(hex_to_rgb(values['line_color'])[:3])
+        except ValueError:
+            raise ValueError('line_color must be a color such as ff8800')
+    query = [('d', encode_text_param(text))]
+    query += [(name, values[name]) for name, default in RENDER_URL_PARAMS if values[name] != default]
+    return text, values, urlencode(query)
+
+@app.route('/render.png', methods=['GET'])
+def render_url():
+    """
+    Render from the URL alone, so proxies and CDNs can cache by URL.
+    Requests whose query is not in canonical form are redirected to it,
+    so one diagram has exactly one URL.
+    """
+    try:
+        text, values, query = _canonical_render_query(request.args)
+        if query != request.query_string.decode('ascii', 'replace'):
+            response = redirect(f'/render.png?{query}', code=301)
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            return response
+        options = _render_options(dict(values, text=text, line_color=values['line_color'] and f"#{values['line_color']}"))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    path = CoreService.artifact_path(output_dir=OUTPUT_DIR, filename_hint="web", **options)
+    key = output_store.key_of(path)
+    if request.if_none_match.contains(key):
+        # Answered from the key alone, even if the file was evicted
+        response = Response(status=304)
+        response.set_etag(key)
+        return _immutable(response)
+    try:
+        if not output_store.lookup(path):
+            path = get_render_pool().run(CoreService.convert, output_dir=OUTPUT_DIR, filename_hint="web", **options)
+    except PoolBusy as e:
+        return _unavailable(e, 429)
+    except RenderUnavailable as e:
+        return _unavailable(e, 503)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    _served(path)
+    return _send_output(path)
+
+@app.route('/preview', methods=['POST'])
+def preview():
+    """
+    Render for live preview. Pass back the X-Preview-Session header value
+    as "session" and only the part of the image the edit changed is redrawn.
+    """
+    data = request.json or {}
+    try:
+        options = _render_options(data)
+        if not isinstance(data.get('session') or '', str):
+            raise ValueError('session must be a string')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if options.pop('output_format') != 'png':
+        return jsonify({'error': 'Previews are always PNG'}), 400
+    text = options.pop('text')
+    if len(text) > PREVIEW_MAX_CHARS or text.count('\n') >= PREVIEW_MAX_LINES:
+        return jsonify({'error': 'Too large for live preview; use Generate'}), 413
+
+    if not _preview_slots.acquire(blocking=False):
+        return _unavailable(PoolBusy('Too many previews in progress'), 429)
+    try:
+        session_id, session = preview_sessions.get(data.get('session'), **options)
+        with session.lock:
+            png = session.update(text, deadline=time.time() + PREVIEW_TIMEOUT)
+            repainted = session.repainted_rows
+    except RenderTimeout as e:
+        return _unavailable(e, 503)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        _preview_slots.release()
+
+    response = Response(png, mimetype='image/png')
+    response.content_length = len(png)
+    response.headers['X-Preview-Session'] = session_id
+    response.headers['X-Preview-Repainted'] = str(repainted)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+def _job_response(job):
+    data = job.to_dict()
+    path = data.pop('result')
+    if job.status == DONE and path:
+        filename = _served(path)
+        data['image_url'] = f'/output/{filename}'
+        data['result_url'] = f'/jobs/{job.id}/result'
+    return jsonify(data)
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """Queue a render and return its job id immediately"""
+    try:
+        options = _render_options(request.json)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    queue = get_job_queue()
+    path = CoreService.artifact_path(output_dir=OUTPUT_DIR, filename_hint="web", **options)
+    try:
+        if output_store.lookup(path):
+            job = queue.completed(path)
+        else:
+            job = queue.submit(CoreService.convert, output_dir=OUTPUT_DIR, filename_hint="web", **options)
+    except PoolBusy as e:
+        return _unavailable(e, 429)
+    except RenderUnavailable as e:
+        return _unavailable(e, 503)
+
+    response = _job_response(job)
+    response.status_code = 202
+    response.headers['Location'] = f'/jobs/{job.id}'
+    return response
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return _job_response(job)
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    job = get_job_queue().cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return _job_response(job)
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job.status != DONE:
+        return jsonify({'error': f'Job is {job.status}', 'status': job.status}), 409
+    if not os.path.exists(job.result):
+        return jsonify({'error': 'Result has expired'}), 410
+    return _send_output(job.result)
+
 @app.route('/output/<filename>')
 def serve_image(filename):
-    return send_file(os.path.join(OUTPUT_DIR, filename))
+    """
+    Serve an output file. Content-addressed names never change meaning, so
+    they get a strong ETag from the render key and an immutable lifetime;
+    If-None-Match is answered with 304 and HEAD without a body.
+    """
+    path = os.path.join(OUTPUT_DIR, filename)
+    if not os.path.isfile(path):
+        return jsonify({'error': 'Image not found'}), 404
+    return _send_output(path)
+
+def _send_output(path):
+    key = output_store.key_of(path)
+    if key is None:
+        response = send_file(path, max_age=0)
+        response.cache_control.no_cache = True
+        return response
+    return _immutable(send_file(path, etag=key, max_age=IMMUTABLE_MAX_AGE))
+
+def _immutable(response):
+    response.cache_control.public = True
+    response.cache_control.max_age = IMMUTABLE_MAX_AGE
+    response.cache_control.immutable = True
+    return response
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    start_services()
     port = 5000
     url = f"http://localhost:{port}"
     print(f"Starting Web GUI at {url}")
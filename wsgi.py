@@ -0,0 +1,16 @@
+"""
+Production entry point for a WSGI server, e.g.
+
+    gunicorn -w 2 --threads 8 -b 0.0.0.0:5000 wsgi:app
+
+Rendering runs in each server worker's own RenderPool, so keep server
+workers few and raise ASCII2PNG_RENDER_WORKERS instead. gunicorn.conf.py
+starts each worker's pool as soon as the worker has booted.
+
+Live preview sessions (/preview) live in the memory of the worker that
+created them; with several workers or instances, route each client to
+the same one (sticky sessions) or every edit is a full cold render.
+"""
+from web_app import app
+
+application = app